@@ -1,20 +1,28 @@
+import time
+_IMPORT_START = time.perf_counter()
+
 import tkinter as tk
 from tkinter import ttk, messagebox
 import sys
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
-from matplotlib.ticker import FuncFormatter
 import datetime
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 # Add project root to path to allow imports
 current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(os.path.dirname(current_dir))
 sys.path.append(project_root)
 
-from src.model.inference import PricePredictor
 from src.utils.config_loader import ConfigLoader
+from src.utils.startup_timer import StartupTimer
+
+# matplotlib and the model (numpy, pandas, sklearn) are imported on first use,
+# so the window appears before they are loaded.
+STARTUP_TIMER = StartupTimer(start=_IMPORT_START)
+STARTUP_TIMER.mark("import")
+
+# How often (ms) the Tk loop checks for results from the background thread
+POLL_INTERVAL_MS = 50
 
 class ApartmentPriceApp:
     """
@@ -25,11 +33,14 @@ class ApartmentPriceApp:
         full_config (dict): Complete configuration loaded from JSON.
         app_config (dict): App-specific configuration.
         theme (dict): UI theme configuration.
-        predictor (PricePredictor): Instance of the ML model wrapper.
+        predictor (PricePredictor): Instance of the ML model wrapper (None while loading).
+        executor (ThreadPoolExecutor): Single background worker used for model loading
+            and predictions, so the Tk loop never blocks on the model.
     """
-    def __init__(self, root):
+    def __init__(self, root, timer=None):
         """Initialize the application."""
         self.root = root
+        self.timer = timer or StartupTimer()
         
         # Load Config
         try:
@@ -39,20 +50,100 @@ class ApartmentPriceApp:
         except Exception as e:
             messagebox.showerror("Config Error", f"Failed to load configuration:\n{e}")
             sys.exit(1)
+        self.timer.mark("config")
 
         self.root.title(self.app_config.get("title", "Apartment Market Analyzer"))
         self.root.geometry(self.app_config.get("window_size", "850x900"))
         self.root.resizable(True, True)
 
-        # 1. Load Model (Mock or Real)
-        self.predictor = PricePredictor()
+        # 1. Start loading the model in the background
+        self.predictor = None
+        self.regions = []
+        self.dispositions = []
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self._model_future = self.executor.submit(self._create_predictor)
+        self._first_render_done = False
+
+        # Graph objects are created on the first analysis and reused afterwards
+        self.figure = None
+        self.ax = None
+        self.canvas = None
+        self.trend_line = None
+        self.scenario_lines = {}
+        self.band_fill = None
+        self.band_median = None
+
+        # Analysis requests: only the result of the latest request is shown
+        self._request_id = 0
+        self._pending = None
+        self._submitted_inputs = None
+
+        # 2. Create Design (options are filled in once the model is ready)
+        self.create_widgets()
+        self.set_loading_state(True)
+        self.timer.mark("widgets")
+
+        self.root.bind("<Map>", self._on_first_render, add="+")
+        self.root.after(POLL_INTERVAL_MS, self._poll_model_loaded)
+
+    def _create_predictor(self):
+        """Import and load the model. Runs on the background thread."""
+        start = time.perf_counter()
+        from src.model.inference import PricePredictor
+        predictor = PricePredictor()
+        # The GUI prices single apartments, so export the fast single-row model here
+        predictor.prepare_single_predictions()
+        self.timer.record("model load", time.perf_counter() - start)
+        return predictor
+
+    @staticmethod
+    def _preload_plotting():
+        """Import matplotlib in the background so the first analysis does not pay for it."""
+        import matplotlib.figure
+        import matplotlib.backends.backend_tkagg
+
+    def _on_first_render(self, event):
+        """Record the time until the main window is first mapped on screen."""
+        if self._first_render_done or event.widget is not self.root:
+            return
+        self._first_render_done = True
+        self.timer.mark("first render")
+        if self.predictor is not None:
+            self.timer.report()
+
+    def _poll_model_loaded(self):
+        """Check (on the Tk loop) whether the background model load has finished."""
+        if not self._model_future.done():
+            self.root.after(POLL_INTERVAL_MS, self._poll_model_loaded)
+            return
+
+        try:
+            self.predictor = self._model_future.result()
+        except Exception as e:
+            self.result_label.config(text="Model se nepodařilo načíst")
+            messagebox.showerror("Model Error", f"Model se nepodařilo načíst.\n{e}")
+            return
 
-        # 2. Define Options
         self.regions = self.predictor.get_regions()
         self.dispositions = self.predictor.get_dispositions()
+        self.region_cb.config(values=self.regions)
+        self.disp_cb.config(values=self.dispositions)
+        if self.regions: self.region_cb.current(0)
+        if self.dispositions: self.disp_cb.current(0)
+        self.set_loading_state(False)
+        self.executor.submit(self._preload_plotting)
 
-        # 3. Create Design
-        self.create_widgets()
+        if self._first_render_done:
+            self.timer.report()
+
+    def set_loading_state(self, loading):
+        """Disable the analysis button and show a notice while the model is loading."""
+        if loading:
+            self.analyze_btn.state(["disabled"])
+            self.result_label.config(text="Načítám model...")
+        else:
+            self.analyze_btn.state(["!disabled"])
+            self.result_label.config(text="Zadejte parametry nemovitosti")
 
     def create_widgets(self):
         """Create and arrange all UI widgets."""
@@ -93,7 +184,7 @@ class ApartmentPriceApp:
             lbl.pack(side=tk.LEFT)
 
             if is_entry:
-                widget = ttk.Entry(container, width=30)
+                widget = ttk.Entry(container, textvariable=variable, width=30)
                 widget.pack(side=tk.LEFT, padx=10)
                 return widget
             else:
@@ -112,15 +203,23 @@ class ApartmentPriceApp:
         if self.dispositions: self.disp_cb.current(0)
 
         # 3. Area
-        self.area_entry = add_field("Plocha (m²):", None, is_entry=True)
-        self.area_entry.insert(0, "65")
+        self.area_var = tk.StringVar(value="65")
+        self.area_entry = add_field("Plocha (m²):", self.area_var, is_entry=True)
+
+        # Changing any input invalidates an analysis that is still running
+        self.region_var.trace_add("write", self._on_inputs_changed)
+        self.disp_var.trace_add("write", self._on_inputs_changed)
+        self.area_var.trace_add("write", self._on_inputs_changed)
 
         # --- BUTTON ---
         btn_frame = tk.Frame(self.root, bg=bg_primary, pady=20)
         btn_frame.pack(fill=tk.X)
         
-        btn = ttk.Button(btn_frame, text="ANALYZOVAT TRŽNÍ CENU", command=self.calculate_all, style="TButton", cursor="hand2")
-        btn.pack(ipady=10, ipadx=20)
+        self.analyze_btn = ttk.Button(btn_frame, text="ANALYZOVAT TRŽNÍ CENU", command=self.calculate_all, style="TButton", cursor="hand2")
+        self.analyze_btn.pack(ipady=10, ipadx=20)
+
+        # --- PROGRESS (shown only while an analysis is running) ---
+        self.progress = ttk.Progressbar(self.root, mode="indeterminate", length=240)
 
         # --- RESULT ---
         self.result_label = tk.Label(self.root, text="Zadejte parametry nemovitosti",
@@ -159,28 +258,135 @@ class ApartmentPriceApp:
         """
         Trigger the prediction process and update the UI with results.
         Called when the analysis button is clicked.
+
+        Inputs are validated on the Tk loop, then the prediction and projection
+        run on the background worker. The result is picked up by polling.
         """
+        inputs = self.get_inputs()
+        if inputs is None: return
+
+        area, disp, region = inputs
+        self._cancel_pending()
+        self._submitted_inputs = self._input_values()
+        self._request_id += 1
+        future = self.executor.submit(self._run_analysis, self._request_id, area, disp, region)
+        self._pending = future
+
+        self.set_busy(True)
+        self.root.after(POLL_INTERVAL_MS, self._poll_analysis, self._request_id, future)
+
+    def _is_stale(self, request_id):
+        """Whether a newer request (or an input edit) replaced this analysis."""
+        return request_id != self._request_id
+
+    def _run_analysis(self, request_id, area, disp, region):
+        """
+        Predict the price and its future trends. Runs on the background worker.
+
+        Stops early (returning None) once the request is stale, so the single
+        worker is free for the next click instead of finishing unwanted work.
+        """
+        trend_cfg = self.app_config.get("future_trend", {})
+        n_years = trend_cfg.get("years", 10)
+        g_rate = trend_cfg.get("growth_rate", 0.04)
+
+        extra = trend_cfg.get("scenarios", [])
+
+        price = self.predictor.predict_price(area, disp, region)
+        if self._is_stale(request_id):
+            return None
+        # All scenarios are projected in one vectorized call; index 0 is the main line
+        projection = self.predictor.project_future_values(
+            price, [g_rate] + [sc["growth_rate"] for sc in extra], years=n_years)
+        future_data = self.predictor.projection_to_records(projection, scenario=0)
+        scenarios = {
+            sc["label"]: self.predictor.projection_to_records(projection, scenario=i + 1)
+            for i, sc in enumerate(extra)
+        }
+
+        bands = None
+        sim_cfg = trend_cfg.get("simulation", {})
+        if sim_cfg.get("enabled", False) and not self._is_stale(request_id):
+            from src.model.simulation import SimulationCancelled
+
+            try:
+                bands = self.predictor.simulate_future_value(
+                    price, years=n_years,
+                    drift=sim_cfg.get("drift", g_rate),
+                    volatility=sim_cfg.get("volatility", 0.05),
+                    n_paths=sim_cfg.get("n_paths", 100_000),
+                    n_workers=sim_cfg.get("n_workers", 1),
+                    seed=sim_cfg.get("seed"),
+                    should_stop=lambda: self._is_stale(request_id))
+            except SimulationCancelled:
+                return None
+        return price, future_data, scenarios, bands
+
+    def _poll_analysis(self, request_id, future):
+        """Show the analysis result once it is ready, unless a newer request replaced it."""
+        if request_id != self._request_id:
+            return
+        if not future.done():
+            self.root.after(POLL_INTERVAL_MS, self._poll_analysis, request_id, future)
+            return
+
+        self._pending = None
+        self.set_busy(False)
         try:
-            current_price = self.get_prediction()
-            if current_price is None: return
+            current_price, future_data, scenarios, bands = future.result()
+        except Exception as e:
+            messagebox.showerror("Model Error", f"Model není připraven na tato data nebo nebyl nalezen.\n{e}")
+            return
 
+        try:
             formatted = f"{int(current_price):,}".replace(",", " ")
             self.result_label.config(text=f"Odhadovaná cena: {formatted} Kč")
 
-            self.plot_future_trend(current_price)
+            self.plot_future_trend(current_price, future_data, scenarios, bands)
 
         except Exception as e:
             messagebox.showerror("Chyba", str(e))
 
-    def get_prediction(self):
+    def _cancel_pending(self):
+        """Invalidate the running analysis (if any) so its result is ignored."""
+        if self._pending is None:
+            return
+        self._pending.cancel()
+        self._pending = None
+        self._request_id += 1
+        self.set_busy(False)
+
+    def _input_values(self):
+        """Raw values of the input widgets."""
+        return self.area_var.get(), self.disp_var.get(), self.region_var.get()
+
+    def _on_inputs_changed(self, *args):
+        """Drop a stale analysis when the user edits the inputs mid-computation."""
+        # Re-selecting the same option or retyping the same area keeps the analysis
+        if self._input_values() != self._submitted_inputs:
+            self._cancel_pending()
+
+    def set_busy(self, busy):
+        """Show or hide the progress indicator for a running analysis."""
+        if busy:
+            self.progress.pack(before=self.result_label, pady=(0, 10))
+            self.progress.start(10)
+        else:
+            self.progress.stop()
+            self.progress.pack_forget()
+
+    def get_inputs(self):
         """
-        Gather inputs, validate them, and perform inference using the model.
+        Gather and validate inputs.
 
         Returns:
-            float: Predicted price in CZK, or None if validation fails.
+            tuple: (area, disposition, region), or None if validation fails.
         """
+        if self.predictor is None:
+            return None
+
         try:
-            area = float(self.area_entry.get())
+            area = float(self.area_var.get())
         except ValueError:
             messagebox.showwarning("Chyba", "Plocha musí být číslo!")
             return None
@@ -200,42 +406,31 @@ class ApartmentPriceApp:
                 return None
 
         region = self.region_var.get()
+        return area, disp, region
 
-        try:
-            return self.predictor.predict_price(area, disp, region)
-        except Exception as e:
-            # For demonstration if model is not trained yet:
-            # return area * 100000 
-            messagebox.showerror("Model Error", f"Model není připraven na tato data nebo nebyl nalezen.\n{e}")
-            return None
-
-    def plot_future_trend(self, start_price):
+    def _ensure_plot(self):
         """
-        Visualize the future value of the property using matplotlib.
+        Create the figure, axes and Tk canvas on first use.
 
-        Args:
-            start_price (float): The current predicted price.
+        They are reused for every later analysis; only the line data changes.
         """
-        for widget in self.graph_frame.winfo_children():
-            widget.destroy()
-            
+        if self.canvas is not None:
+            return
+
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+        from matplotlib.ticker import FuncFormatter
+
         bg_primary = self.theme.get("bg_primary", "#1a1a1a")
         text_main = self.theme.get("text_main", "#ecf0f1")
         accent_color = self.theme.get("accent_color", "#e67e22")
-        success_color = self.theme.get("success_color", "#27ae60")
-
-        n_years = self.app_config.get("future_trend", {}).get("years", 10)
-        g_rate = self.app_config.get("future_trend", {}).get("growth_rate", 0.04)
-        future_data = self.predictor.calculate_future_value(start_price, years=n_years, growth_rate=g_rate) 
-        years = [d['year'] for d in future_data]
-        prices = [d['price'] for d in future_data]
 
         fig = Figure(figsize=(6, 4), dpi=100)
         fig.patch.set_facecolor(bg_primary)
         ax = fig.add_subplot(111)
         ax.set_facecolor(bg_primary)
 
-        ax.plot(years, prices, marker='s', linestyle='-', color=accent_color, linewidth=2, markersize=6)
+        self.trend_line, = ax.plot([], [], marker='s', linestyle='-', color=accent_color, linewidth=2, markersize=6)
 
         for spine in ax.spines.values():
             spine.set_color(text_main)
@@ -253,11 +448,103 @@ class ApartmentPriceApp:
 
         ax.yaxis.set_major_formatter(FuncFormatter(currency_formatter))
 
-        canvas = FigureCanvasTkAgg(fig, master=self.graph_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.figure = fig
+        self.ax = ax
+        self.canvas = FigureCanvasTkAgg(fig, master=self.graph_frame)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+    def _scenario_line(self, label):
+        """Return the (reused) line for an extra scenario, creating it on first use."""
+        line = self.scenario_lines.get(label)
+        if line is None:
+            colors = [self.theme.get("success_color", "#27ae60"),
+                      self.theme.get("text_secondary", "#bdc3c7"),
+                      self.theme.get("text_muted", "#95a5a6")]
+            color = colors[len(self.scenario_lines) % len(colors)]
+            line, = self.ax.plot([], [], marker='o', linestyle='--', color=color, linewidth=1.5, markersize=4,
+                                 label=label)
+            self.scenario_lines[label] = line
+        return line
+
+    def _update_band(self, bands):
+        """
+        Replace the shaded p5-p95 band and its median line (hidden when bands is None).
+
+        The fill is a PolyCollection whose vertices cannot simply be updated, so it
+        is the only artist recreated per analysis.
+        """
+        if self.band_fill is not None:
+            self.band_fill.remove()
+            self.band_fill = None
+        if not bands:
+            if self.band_median is not None:
+                self.band_median.set_visible(False)
+            return
+
+        accent_color = self.theme.get("accent_color", "#e67e22")
+        years = [d['year'] for d in bands]
+        self.band_fill = self.ax.fill_between(years, [d['p5'] for d in bands], [d['p95'] for d in bands],
+                                              color=accent_color, alpha=0.15, linewidth=0, label="5.–95. percentil")
+        if self.band_median is None:
+            self.band_median, = self.ax.plot([], [], linestyle=':', color=accent_color, linewidth=1.5, label="Medián")
+        self.band_median.set_data(years, [d['p50'] for d in bands])
+        self.band_median.set_visible(True)
+
+    def plot_future_trend(self, start_price, future_data=None, scenarios=None, bands=None):
+        """
+        Visualize the future value of the property using matplotlib.
+
+        The figure and canvas are created once; later calls only replace the line
+        data and schedule a redraw with ``draw_idle``.
+
+        Args:
+            start_price (float): The current predicted price.
+            future_data (list[dict], optional): Precomputed projection. Computed
+                here from the configured growth rate when not given.
+            scenarios (dict, optional): Extra projections to overlay on the same
+                axes, as {label: list[dict]}. Lines of scenarios not passed in are hidden.
+            bands (list[dict], optional): Monte Carlo percentile bands from
+                ``simulate_future_value``, drawn as a shaded p5-p95 range with a median line.
+        """
+        if future_data is None:
+            n_years = self.app_config.get("future_trend", {}).get("years", 10)
+            g_rate = self.app_config.get("future_trend", {}).get("growth_rate", 0.04)
+            future_data = self.predictor.calculate_future_value(start_price, years=n_years, growth_rate=g_rate)
+        scenarios = scenarios or {}
+
+        self._ensure_plot()
+
+        self.trend_line.set_data([d['year'] for d in future_data], [d['price'] for d in future_data])
+
+        for label, line in self.scenario_lines.items():
+            line.set_visible(label in scenarios)
+        for label, data in scenarios.items():
+            line = self._scenario_line(label)
+            line.set_data([d['year'] for d in data], [d['price'] for d in data])
+            line.set_visible(True)
+        self._update_band(bands)
+
+        legend = self.ax.get_legend()
+        if scenarios or bands:
+            text_main = self.theme.get("text_main", "#ecf0f1")
+            handles = [self.scenario_lines[label] for label in scenarios]
+            if bands:
+                handles += [self.band_median, self.band_fill]
+            self.trend_line.set_label(self.app_config.get("future_trend", {}).get("label", "Základní scénář"))
+            legend = self.ax.legend(handles=[self.trend_line] + handles, facecolor=self.theme.get("bg_primary", "#1a1a1a"),
+                                    edgecolor=text_main, labelcolor=text_main, fontsize=9)
+        elif legend is not None:
+            legend.remove()
+
+        self.ax.relim(visible_only=True)
+        if bands:
+            # relim only looks at lines, so include the band edges explicitly
+            self.ax.update_datalim([(d['year'], d[key]) for d in bands for key in ('p5', 'p95')])
+        self.ax.autoscale_view()
+        self.canvas.draw_idle()
 
 if __name__ == "__main__":
     root = tk.Tk()
-    app = ApartmentPriceApp(root)
-    root.mainloop()
\ No newline at end of file
+    app = ApartmentPriceApp(root, timer=STARTUP_TIMER)
+    root.mainloop()
+    app.executor.shutdown(wait=False)
\ No newline at end of file
@@ -0,0 +1,159 @@
+import datetime
+import hashlib
+import json
+import os
+import struct
+
+import numpy as np
+
+# File layout:
+#   magic (8 bytes) | format version (uint32) | header length (uint64) | JSON header
+#   | padding | payload (raw arrays, each aligned to ALIGNMENT bytes)
+# Array offsets in the header are relative to the payload start, and the
+# checksum covers the whole payload.
+MAGIC = b"APTMODEL"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+_PREAMBLE = struct.Struct("<8sIQ")
+
+
+class ArtifactError(ValueError):
+    """Raised when a model bundle is missing, stale, truncated or corrupted."""
+
+
+def _align(offset):
+    """Round an offset up to the next ALIGNMENT boundary."""
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_bundle(path, arrays, info):
+    """
+    Write arrays and JSON-serializable info into a single model bundle.
+
+    The file is written to a temporary path and renamed into place, so readers
+    never observe a half-written bundle.
+
+    Args:
+        path (str): Destination file.
+        arrays (dict): Name -> NumPy array (numeric or bool dtypes).
+        info (dict): Extra JSON data stored in the header (columns, metadata, ...).
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = _align(offset)
+        layout[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset += array.nbytes
+    payload_size = offset
+
+    digest = hashlib.sha256()
+    position = 0
+    for name, array in arrays.items():
+        padding = layout[name]['offset'] - position
+        digest.update(b"\0" * padding)
+        digest.update(array.data)
+        position = layout[name]['offset'] + array.nbytes
+
+    header = dict(info)
+    header.update({
+        'format_version': FORMAT_VERSION,
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'arrays': layout,
+        'payload_size': payload_size,
+        'checksum': digest.hexdigest(),
+    })
+    header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    payload_start = _align(_PREAMBLE.size + len(header_bytes))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b"\0" * (payload_start - _PREAMBLE.size - len(header_bytes)))
+        position = 0
+        for name, array in arrays.items():
+            f.write(b"\0" * (layout[name]['offset'] - position))
+            f.write(array.data)
+            position = layout[name]['offset'] + array.nbytes
+    os.replace(tmp_path, path)
+
+
+def read_header(path):
+    """
+    Read and validate the bundle header without touching the payload.
+
+    Returns:
+        tuple: (header dict, payload start offset).
+
+    Raises:
+        ArtifactError: If the file is not a bundle, has another format version
+            or is shorter than the header declares.
+    """
+    if not os.path.exists(path):
+        raise ArtifactError(f"Model bundle not found: {path}")
+
+    file_size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        preamble = f.read(_PREAMBLE.size)
+        if len(preamble) < _PREAMBLE.size:
+            raise ArtifactError(f"Model bundle is truncated: {path}")
+        magic, version, header_len = _PREAMBLE.unpack(preamble)
+        if magic != MAGIC:
+            raise ArtifactError(f"Not a model bundle: {path}")
+        if version != FORMAT_VERSION:
+            raise ArtifactError(f"Unsupported model bundle version {version} (expected {FORMAT_VERSION}), retrain the model")
+        try:
+            header = json.loads(f.read(header_len).decode('utf-8'))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ArtifactError(f"Model bundle header is corrupted: {e}")
+
+    payload_start = _align(_PREAMBLE.size + header_len)
+    if file_size != payload_start + header['payload_size']:
+        raise ArtifactError(f"Model bundle is truncated or padded ({file_size} bytes, "
+                            f"expected {payload_start + header['payload_size']}): {path}")
+    return header, payload_start
+
+
+def verify_checksum(path, header, payload_start, block_size=1 << 22):
+    """Raise ArtifactError if the payload does not match the checksum in the header."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        f.seek(payload_start)
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    if digest.hexdigest() != header['checksum']:
+        raise ArtifactError(f"Model bundle checksum mismatch: {path}")
+
+
+def read_bundle(path, mmap_mode='r', verify=True):
+    """
+    Open a model bundle.
+
+    With ``mmap_mode='r'`` the arrays are read-only memory maps into the file, so
+    processes loading the same bundle share the pages instead of each holding a
+    private copy.
+
+    Args:
+        path (str): Bundle file.
+        mmap_mode (str, optional): 'r' to memory-map arrays, None to read them into memory.
+        verify (bool): Check the payload checksum before returning.
+
+    Returns:
+        tuple: (dict of arrays, header dict).
+    """
+    header, payload_start = read_header(path)
+    if verify:
+        verify_checksum(path, header, payload_start)
+
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        dtype = np.dtype(spec['dtype'])
+        shape = tuple(spec['shape'])
+        offset = payload_start + spec['offset']
+        if mmap_mode and int(np.prod(shape)) > 0:
+            arrays[name] = np.memmap(path, dtype=dtype, mode=mmap_mode, offset=offset, shape=shape)
+        else:
+            count = int(np.prod(shape))
+            arrays[name] = np.fromfile(path, dtype=dtype, count=count, offset=offset).reshape(shape)
+    return arrays, header
@@ -0,0 +1,223 @@
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Init path to access shared utils
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.append(project_root)
+
+from src.utils.config_loader import ConfigLoader
+from src.model.inference import PricePredictor, UnknownCategoryError
+
+INPUT_COLUMNS = ['area', 'disposition', 'region']
+PRICE_COLUMN = 'predicted_price'
+
+# Predictor of a pool worker process, set by _init_worker
+_worker_predictor = None
+
+
+def _is_parquet(path):
+    return path.lower().endswith(('.parquet', '.pq'))
+
+
+def read_chunks(path, chunk_size):
+    """
+    Yield a CSV or Parquet file as DataFrames of at most ``chunk_size`` rows.
+
+    Only one chunk is held in memory at a time. Parquet files need ``pyarrow``.
+    """
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size, dtype={'disposition': str, 'region': str})
+
+
+class ChunkWriter:
+    """
+    Appends DataFrame chunks to a CSV or Parquet file.
+
+    Rows go to a temporary file that replaces ``path`` only on close(), so an
+    interrupted run never leaves a truncated output behind.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = f"{path}.{os.getpid()}.tmp"
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._parquet_writer = None
+        self._csv_header = True
+
+    def write(self, df):
+        if _is_parquet(self.path):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.tmp_path, table.schema)
+            self._parquet_writer.write_table(table.cast(self._parquet_writer.schema))
+        else:
+            df.to_csv(self.tmp_path, mode='w' if self._csv_header else 'a', header=self._csv_header,
+                      index=False, encoding='utf-8')
+            self._csv_header = False
+
+    def close(self, commit=True):
+        """Finish the file and move it into place (or discard it if ``commit`` is False)."""
+        if commit and self._csv_header and self._parquet_writer is None:
+            # Empty input: still write a file with the price column
+            self.write(pd.DataFrame(columns=INPUT_COLUMNS + [PRICE_COLUMN]))
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        if commit:
+            os.replace(self.tmp_path, self.path)
+        elif os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+def price_chunk(predictor, areas, dispositions, regions, strict=False):
+    """
+    Predict one chunk with a single vectorized predict_batch call.
+
+    Args:
+        predictor (PricePredictor): Loaded predictor.
+        areas, dispositions, regions (np.ndarray): Aligned input columns.
+        strict (bool): Raise UnknownCategoryError for a row with an unknown or
+            missing disposition or region (or a missing area). When False such
+            rows get NaN.
+
+    Returns:
+        np.ndarray: Prices as float64, NaN for rows that cannot be priced.
+    """
+    known_dispositions, known_regions = predictor.get_known_categories()
+
+    valid = (np.isfinite(areas)
+             & pd.Series(dispositions).isin(list(known_dispositions)).to_numpy()
+             & pd.Series(regions).isin(list(known_regions)).to_numpy())
+    if strict and not valid.all():
+        row = int(np.argmin(valid))
+        raise UnknownCategoryError(f"Cannot price row {row} of the chunk: area={areas[row]!r}, "
+                                   f"disposition={dispositions[row]!r}, region={regions[row]!r}")
+
+    prices = np.full(len(areas), np.nan)
+    if valid.any():
+        # Rows are already validated, so the non-strict path (which skips the
+        # per-row prediction cache) prices them exactly
+        prices[valid] = predictor.predict_batch(areas[valid], dispositions[valid], regions[valid],
+                                                chunk_size=len(areas), strict=False)
+    return prices
+
+
+def _init_worker(predictor):
+    """Pool initializer: use the given predictor or load the configured model once per process."""
+    global _worker_predictor
+    _worker_predictor = predictor if predictor is not None else PricePredictor()
+
+
+def _price_in_worker(args):
+    return price_chunk(_worker_predictor, *args)
+
+
+def _columns(chunk):
+    missing = [col for col in INPUT_COLUMNS if col not in chunk.columns]
+    if missing:
+        raise ValueError(f"Input is missing the columns {missing}")
+    return (pd.to_numeric(chunk['area'], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan),
+            chunk['disposition'].to_numpy(dtype=object),
+            chunk['region'].to_numpy(dtype=object))
+
+
+def bulk_predict(input_path, output_path, predictor=None, chunk_size=50000, workers=1, max_in_flight=None,
+                 strict=False):
+    """
+    Price every row of a CSV/Parquet file and write it out with a price column.
+
+    The input is streamed in chunks of ``chunk_size`` rows. Each chunk is
+    encoded and predicted in one vectorized call, either here or, with
+    ``workers`` > 1, in a process pool whose workers each hold a loaded model.
+    At most ``max_in_flight`` chunks are read ahead, and results are written
+    in input order as soon as the oldest chunk is done, so memory stays the
+    same however large the file is.
+
+    Args:
+        input_path (str): CSV or Parquet file with 'area', 'disposition' and
+            'region' columns (other columns are copied to the output).
+        output_path (str): CSV or Parquet file to write (chosen by extension).
+        predictor (PricePredictor, optional): Loaded predictor. Defaults to the
+            configured model; pool workers load their own copy when not given.
+        chunk_size (int): Rows per chunk.
+        workers (int): Worker processes (1 predicts in this process).
+        max_in_flight (int, optional): Chunks submitted but not yet written
+            (default: twice the number of workers).
+        strict (bool): Fail on the first row that cannot be priced instead of
+            writing NaN.
+
+    Returns:
+        dict: 'rows', 'priced' (rows with a price), 'chunks' and 'seconds'.
+    """
+    start = time.perf_counter()
+    summary = {'rows': 0, 'priced': 0, 'chunks': 0}
+    writer = ChunkWriter(output_path)
+
+    def write(chunk, prices):
+        chunk[PRICE_COLUMN] = prices
+        writer.write(chunk)
+        summary['rows'] += len(chunk)
+        summary['priced'] += int(np.isfinite(prices).sum())
+        summary['chunks'] += 1
+
+    try:
+        if workers > 1:
+            max_in_flight = max_in_flight or workers * 2
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(predictor,)) as pool:
+                pending = deque()
+                for chunk in read_chunks(input_path, chunk_size):
+                    # Only the three model columns are sent to the worker
+                    pending.append((chunk, pool.submit(_price_in_worker, _columns(chunk) + (strict,))))
+                    if len(pending) >= max_in_flight:
+                        chunk, future = pending.popleft()
+                        write(chunk, future.result())
+                while pending:
+                    chunk, future = pending.popleft()
+                    write(chunk, future.result())
+        else:
+            if predictor is None:
+                predictor = PricePredictor()
+            for chunk in read_chunks(input_path, chunk_size):
+                write(chunk, price_chunk(predictor, *_columns(chunk), strict=strict))
+    except BaseException:
+        writer.close(commit=False)
+        raise
+    writer.close()
+
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+
+if __name__ == "__main__":
+    bulk_cfg = ConfigLoader.get_config()['model'].get('bulk', {})
+    parser = argparse.ArgumentParser(description="Price a CSV/Parquet file of apartments (area, disposition, region).")
+    parser.add_argument('input', help="CSV or Parquet file with 'area', 'disposition' and 'region' columns.")
+    parser.add_argument('output', help="CSV or Parquet file to write, with an added 'predicted_price' column.")
+    parser.add_argument('--chunk-size', type=int, default=bulk_cfg.get('chunk_size', 50000))
+    parser.add_argument('--workers', type=int, default=bulk_cfg.get('workers', 1),
+                        help="Worker processes, each with its own loaded model (0 = all CPU cores).")
+    parser.add_argument('--strict', action='store_true',
+                        help="Stop at the first row that cannot be priced instead of writing an empty price.")
+    args = parser.parse_args()
+
+    n_workers = args.workers or os.cpu_count() or 1
+    # Workers load the model themselves; the 'flat' engine then shares the memory-mapped trees
+    summary = bulk_predict(args.input, args.output, chunk_size=args.chunk_size, workers=n_workers,
+                           max_in_flight=n_workers * bulk_cfg.get('chunks_in_flight_per_worker', 2),
+                           strict=args.strict)
+    print(f"Priced {summary['priced']} of {summary['rows']} apartments in {summary['seconds']:.1f} s: {args.output}")
@@ -0,0 +1,221 @@
+import hashlib
+import io
+import json
+import os
+
+import pandas as pd
+
+# Bump when the cached columns or their meaning change, to force a rebuild
+CACHE_VERSION = 1
+CATEGORICAL_COLUMNS = ('disposition', 'region')
+
+
+def hash_file(path, size, prefix_size=None, block_size=1 << 22):
+    """
+    SHA-256 of the first ``size`` bytes of a file, optionally also of its first
+    ``prefix_size`` bytes. Both digests come from one sequential read.
+
+    Returns:
+        tuple: (prefix hex digest or None, hex digest).
+    """
+    digest = hashlib.sha256()
+    prefix_digest = None
+    with open(path, 'rb') as f:
+        position = 0
+        for stop in ([prefix_size] if prefix_size is not None else []) + [size]:
+            while position < stop:
+                block = f.read(min(block_size, stop - position))
+                if not block:
+                    break
+                digest.update(block)
+                position += len(block)
+            if stop == prefix_size and prefix_digest is None:
+                prefix_digest = digest.hexdigest()
+    return prefix_digest, digest.hexdigest()
+
+
+def ends_with_newline(path, size):
+    """Whether the byte at position ``size - 1`` is a newline (i.e. a complete last row)."""
+    if size == 0:
+        return False
+    with open(path, 'rb') as f:
+        f.seek(size - 1)
+        return f.read(1) == b"\n"
+
+
+def complete_size(path, size):
+    """
+    Length of the longest prefix of the first ``size`` bytes that ends with a
+    complete row. A last row without a newline is treated as still being written.
+    """
+    with open(path, 'rb') as f:
+        position = size
+        while position > 0:
+            block_start = max(0, position - (1 << 16))
+            f.seek(block_start)
+            newline = f.read(position - block_start).rfind(b"\n")
+            if newline >= 0:
+                return block_start + newline + 1
+            position = block_start
+    return 0
+
+
+class _PrefixReader(io.RawIOBase):
+    """Raw binary reader that stops after the first ``size`` bytes of a file."""
+    def __init__(self, path, size):
+        self._file = open(path, 'rb')
+        self._remaining = size
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = min(len(buffer), self._remaining)
+        if n <= 0:
+            return 0
+        n = self._file.readinto(memoryview(buffer)[:n])
+        self._remaining -= n
+        return n
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+def open_prefix(path, size):
+    """
+    Open the first ``size`` bytes of a file for reading, e.g. by ``pd.read_csv``
+    with ``chunksize``. Bytes appended later (or beyond ``size``) are not seen.
+    """
+    return io.BufferedReader(_PrefixReader(path, size), buffer_size=1 << 20)
+
+
+def read_csv_tail(path, start, stop, columns):
+    """
+    Parse the CSV rows stored between two byte offsets.
+
+    ``start`` must be the end of a complete row (see ends_with_newline), so the
+    tail holds whole rows without a header.
+
+    Args:
+        path (str): CSV file.
+        start (int): First byte of the tail.
+        stop (int): End of the tail (exclusive).
+        columns (list): Column names of the file.
+
+    Returns:
+        pd.DataFrame: The tail rows.
+    """
+    with open(path, 'rb') as f:
+        f.seek(start)
+        tail = f.read(stop - start)
+    return pd.read_csv(io.BytesIO(tail), header=None, names=columns)
+
+
+def _read_manifest(manifest_path):
+    """Load the cache manifest, or None if it is missing, unreadable or from another version."""
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if manifest.get('version') != CACHE_VERSION:
+        return None
+    return manifest
+
+
+def _with_categories(df):
+    """Store the categorical columns as categoricals with sorted categories."""
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype(object).astype('category')
+    return df
+
+
+def _write(df, cache_path, manifest_path, manifest):
+    """Write the processed frame and then its manifest, each atomically."""
+    os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+    tmp_path = f"{cache_path}.tmp"
+    df.reset_index(drop=True).to_feather(tmp_path)
+    os.replace(tmp_path, cache_path)
+
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def load_processed_dataset(raw_path, cache_path, process, manifest_path=None, raw_size=None):
+    """
+    Load the processed features of the raw CSV, reusing the columnar cache.
+
+    The cache is a Feather file plus a JSON manifest holding the size and
+    SHA-256 of the raw CSV it was built from:
+
+    - same hash: the typed columns are loaded straight from the cache;
+    - the old content is an unchanged prefix of the CSV (rows were appended):
+      only the new tail is parsed and appended to the cache;
+    - anything else (edited rows, a new header, no cache): full rebuild.
+
+    Only the first ``raw_size`` bytes are hashed and read, so rows appended
+    meanwhile are picked up by the next call. If they do not end with a
+    complete row, the result is returned without updating the cache.
+
+    Args:
+        raw_path (str): Raw scraped CSV.
+        cache_path (str): Feather file with the processed features.
+        process (callable): Turns a raw DataFrame into the processed one. It must
+            work row by row, so processing the tail separately gives the same rows.
+        manifest_path (str, optional): Defaults to ``cache_path + '.json'``.
+        raw_size (int, optional): Bytes of the CSV to use (defaults to its
+            current size), e.g. the size recorded in a training watermark.
+
+    Returns:
+        tuple: (processed DataFrame, status) where status is 'cached',
+        'appended' or 'rebuilt'.
+    """
+    manifest_path = manifest_path or f"{cache_path}.json"
+    if raw_size is None:
+        raw_size = os.path.getsize(raw_path)
+    manifest = _read_manifest(manifest_path)
+    cache_ok = manifest is not None and os.path.exists(cache_path)
+
+    old_size = manifest['raw_size'] if cache_ok else None
+    if old_size is not None and old_size > raw_size:
+        old_size = None
+    # Hash only the bytes present now, in case the scraper is still appending
+    prefix_hash, raw_hash = hash_file(raw_path, raw_size, prefix_size=old_size)
+
+    new_manifest = {
+        'version': CACHE_VERSION,
+        'raw_path': os.path.basename(raw_path),
+        'raw_size': raw_size,
+        'raw_sha256': raw_hash,
+    }
+
+    if cache_ok and manifest['raw_sha256'] == raw_hash:
+        return pd.read_feather(cache_path), 'cached'
+
+    # Only a size ending with a complete row is recorded, so a row the scraper
+    # is still writing is never cached in part
+    complete = ends_with_newline(raw_path, raw_size)
+
+    if (cache_ok and prefix_hash == manifest['raw_sha256']
+            and ends_with_newline(raw_path, old_size)):
+        cached = pd.read_feather(cache_path)
+        processed = process(read_csv_tail(raw_path, old_size, raw_size, manifest['raw_columns']))
+        # Categories of the two parts may differ; _with_categories re-encodes them
+        df = _with_categories(pd.concat([cached, processed], ignore_index=True))
+        if complete:
+            new_manifest.update(raw_columns=manifest['raw_columns'], n_rows=len(df))
+            _write(df, cache_path, manifest_path, new_manifest)
+        return df, 'appended'
+
+    # Parse exactly the hashed bytes; the file may have grown since
+    with open_prefix(raw_path, raw_size) as f:
+        raw = pd.read_csv(f)
+    df = _with_categories(process(raw).reset_index(drop=True))
+    if complete:
+        new_manifest.update(raw_columns=list(raw.columns), n_rows=len(df))
+        _write(df, cache_path, manifest_path, new_manifest)
+    return df, 'rebuilt'
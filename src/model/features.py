@@ -0,0 +1,117 @@
+import re
+
+import pandas as pd
+
+from src.utils.config_loader import ConfigLoader
+from src.model.region_resolver import RegionResolver
+
+# Parsing of raw listings into model features. Kept free of scikit-learn, so the
+# scrapers can derive the same columns (e.g. for the listing store) cheaply.
+
+config = ConfigLoader.get_config()
+
+# Matches "54 m²" or "54m2"
+AREA_PATTERN = re.compile(r'(\d+)\s*m[²2]')
+# Matches "2+kk", "1+1", "3+1" etc.
+DISPOSITION_PATTERN = re.compile(r'(\d\+[\w]{1,2})')
+
+# City and keyword tables compiled once into a single matcher
+REGION_RESOLVER = RegionResolver(config['model']['city_to_region'])
+
+def parse_area(title):
+    """
+    Extract area in square meters from the title string.
+
+    Args:
+        title (str): Title containing area (e.g. "Prodej bytu 3+kk 75 m²").
+
+    Returns:
+        int or None: Extracted area or None if not found.
+    """
+    match = AREA_PATTERN.search(str(title))
+    if match:
+        return int(match.group(1))
+    return None
+
+def parse_disposition(title):
+    """
+    Extract apartment disposition (e.g. 2+kk) from the title.
+
+    Args:
+        title (str): Title string.
+
+    Returns:
+        str: Disposition string or 'Other'.
+    """
+    match = DISPOSITION_PATTERN.search(str(title))
+    if match:
+        return match.group(1)
+    return 'Other'
+
+def clean_region(location):
+    """
+    Map a specific location string (city/district) to a general Region (Kraj).
+
+    Cities from ``config['model']['city_to_region']`` take precedence over the
+    region keywords; see RegionResolver.
+
+    Args:
+        location (str): Raw location string.
+
+    Returns:
+        str: Normalized region name or 'Other'/'Zahraničí'.
+    """
+    return REGION_RESOLVER.resolve(location)
+
+def extract_features(df):
+    """
+    Vectorized equivalent of applying parse_area, parse_disposition and
+    clean_region row by row.
+
+    Listing titles and locations repeat heavily (a few thousand distinct values
+    across millions of rows), so each column is factorized first, the
+    precompiled patterns run once per distinct value via ``Series.str.extract``
+    and the results are broadcast back by code.
+
+    Args:
+        df (pd.DataFrame): Raw listings with 'title' and 'location' columns.
+
+    Returns:
+        pd.DataFrame: Columns 'area' (numeric, NaN if missing), 'disposition' and
+        'region' (both categorical), aligned with ``df.index``.
+    """
+    # Missing values get their own code instead of -1, so every row maps to a distinct value
+    title_codes, titles = pd.factorize(df['title'], use_na_sentinel=False)
+    titles = pd.Series(titles, dtype=object)
+    areas = pd.to_numeric(titles.str.extract(AREA_PATTERN, expand=False))
+    dispositions = titles.str.extract(DISPOSITION_PATTERN, expand=False).fillna('Other')
+
+    location_codes, locations = pd.factorize(df['location'], use_na_sentinel=False)
+    regions = pd.Series(REGION_RESOLVER.resolve_many(locations), dtype=object)
+
+    return pd.DataFrame({
+        'area': areas.take(title_codes).to_numpy(),
+        'disposition': pd.Categorical(dispositions.to_numpy(dtype=object)[title_codes]),
+        'region': pd.Categorical(regions.to_numpy(dtype=object)[location_codes]),
+    }, index=df.index)
+
+def build_features(raw):
+    """
+    Turn raw scraped rows into the processed training columns.
+
+    Args:
+        raw (pd.DataFrame): Rows with 'title', 'url', 'raw_price' and 'location'.
+
+    Returns:
+        pd.DataFrame: Columns 'url', 'area', 'disposition', 'region' and a
+        numeric 'price' (NaN where it could not be parsed).
+    """
+    features = extract_features(raw)
+    price = raw['raw_price'].astype(str).str.replace(r'[^\d]', '', regex=True)
+    return pd.DataFrame({
+        'url': raw['url'],
+        'area': features['area'].astype('float64'),
+        'disposition': features['disposition'],
+        'region': features['region'],
+        'price': pd.to_numeric(price, errors='coerce').astype('float64'),
+    }, index=raw.index)
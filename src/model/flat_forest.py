@@ -0,0 +1,127 @@
+import numpy as np
+
+
+class FlatForest:
+    """
+    RandomForest exported into contiguous NumPy arrays for sklearn-free inference.
+
+    All trees are concatenated into one node table. A batch is evaluated level by
+    level for all (row, tree) pairs at once, dropping pairs as soon as they reach
+    a leaf, without any per-node Python code. The comparison ``x <= threshold``
+    is done on float32 inputs against float64 thresholds and the tree outputs are
+    summed in tree order, exactly like sklearn does, so predictions are identical.
+
+    The arrays are only read during prediction, so they can be read-only memory
+    maps shared between processes (see ``src.model.artifact``).
+
+    Attributes:
+        feature (np.ndarray): int32 feature index tested at each node.
+        threshold (np.ndarray): float64 split threshold of each node.
+        children (np.ndarray): int32 array of shape (n_nodes, 2) with the
+            (left, right) child of each node. Leaves point to themselves.
+        leaf (np.ndarray): bool flag marking leaf nodes.
+        value (np.ndarray): float64 prediction stored at each node.
+        roots (np.ndarray): int32 index of the root node of every tree.
+        max_depth (int): Depth of the deepest tree.
+        columns (list): Feature names in model order.
+    """
+    ARRAY_NAMES = ('feature', 'threshold', 'children', 'leaf', 'value', 'roots')
+
+    def __init__(self, feature, threshold, children, leaf, value, roots, max_depth, columns):
+        """Wrap already exported node arrays."""
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.leaf = leaf
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.columns = list(columns)
+
+    @classmethod
+    def from_sklearn(cls, model, columns):
+        """
+        Export a fitted sklearn RandomForestRegressor.
+
+        Args:
+            model (RandomForestRegressor): Fitted single-output forest.
+            columns (list): Feature names in the order used for training.
+
+        Returns:
+            FlatForest: Exported forest.
+        """
+        features, thresholds, children, leaves, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(offset, offset + n_nodes, dtype=np.int32)
+            is_leaf = tree.children_left < 0
+
+            left = np.where(is_leaf, node_ids, tree.children_left + offset)
+            right = np.where(is_leaf, node_ids, tree.children_right + offset)
+
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(tree.threshold.astype(np.float64))
+            children.append(np.stack([left, right], axis=1).astype(np.int32))
+            leaves.append(is_leaf)
+            values.append(tree.value.reshape(n_nodes, -1)[:, 0].astype(np.float64))
+            roots.append(offset)
+
+            max_depth = max(max_depth, tree.max_depth)
+            offset += n_nodes
+
+        return cls(np.concatenate(features), np.concatenate(thresholds),
+                   np.concatenate(children), np.concatenate(leaves),
+                   np.concatenate(values), np.asarray(roots, dtype=np.int32),
+                   max_depth, columns)
+
+    def to_arrays(self):
+        """Return the node arrays as a dict (name -> np.ndarray)."""
+        return {name: getattr(self, name) for name in self.ARRAY_NAMES}
+
+    @classmethod
+    def from_arrays(cls, arrays, max_depth, columns):
+        """Rebuild a forest from the dict produced by :meth:`to_arrays`."""
+        return cls(*(arrays[name] for name in cls.ARRAY_NAMES), max_depth, columns)
+
+    @property
+    def n_trees(self):
+        """Number of trees in the forest."""
+        return len(self.roots)
+
+    def predict(self, X):
+        """
+        Predict prices for an encoded feature matrix.
+
+        Args:
+            X (np.ndarray): Matrix of shape (n_rows, n_features) in column order.
+
+        Returns:
+            np.ndarray: float64 predictions, one per row.
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        if n_rows == 0:
+            return np.zeros(0, dtype=np.float64)
+        flat_x = X.ravel()
+        # Flattened (left, right) pairs let one gather pick the next node
+        children = self.children.reshape(-1)
+
+        # One entry per (row, tree) pair, row-major
+        nodes = np.tile(self.roots, n_rows)
+        row_offsets = np.repeat(np.arange(n_rows, dtype=np.int64) * n_features, self.n_trees)
+        active = np.flatnonzero(~self.leaf[nodes])
+
+        while active.size:
+            current = nodes[active]
+            go_right = ~(flat_x[row_offsets[active] + self.feature[current]] <= self.threshold[current])
+            current = children[2 * current + go_right]
+            nodes[active] = current
+            active = active[~self.leaf[current]]
+
+        # cumsum adds the trees strictly left to right, matching sklearn's summation order
+        leaf_values = self.value[nodes].reshape(n_rows, self.n_trees)
+        return np.cumsum(leaf_values, axis=1)[:, -1] / self.n_trees
@@ -1,17 +1,140 @@
 import os
-import joblib
-import pandas as pd
+import sys
+import warnings
+import numpy as np
 import datetime
 import json
 from src.utils.config_loader import ConfigLoader
+from src.model.prediction_cache import PredictionCache
+from src.model.flat_forest import FlatForest
+from src.model.artifact import read_bundle
+
+# pandas, joblib (and through it sklearn) are imported on first use only, so the
+# 'flat' and 'grid' engines start without loading them at all.
+
+
+class UnknownCategoryError(ValueError):
+    """Raised when a disposition or region has no matching column in the trained model."""
+
+
+class FeatureEncoder:
+    """
+    One-hot encoder compiled from the model columns.
+
+    Every disposition and region is mapped to its integer column offset once,
+    so encoding a row only writes a few cells into a reusable float32 buffer.
+    The row buffer is shared between calls, so one encoder should not be used
+    from several threads at the same time.
+
+    Attributes:
+        columns (list): Model columns the encoder was compiled from.
+        n_features (int): Width of the feature matrix.
+        area_offset (int): Column offset of the area feature (-1 if absent).
+        disposition_offsets (dict): Disposition value -> column offset.
+        region_offsets (dict): Region value -> column offset.
+    """
+    def __init__(self, model_columns):
+        """
+        Compile the encoder.
+
+        Args:
+            model_columns (list): Feature names in the order expected by the model.
+        """
+        self.columns = model_columns
+        self.n_features = len(model_columns)
+        self.area_offset = -1
+        self.disposition_offsets = {}
+        self.region_offsets = {}
+
+        for i, col in enumerate(model_columns):
+            if col == 'area':
+                self.area_offset = i
+            elif col.startswith('disposition_'):
+                self.disposition_offsets[col[len('disposition_'):]] = i
+            elif col.startswith('region_'):
+                self.region_offsets[col[len('region_'):]] = i
+
+        self._row = np.zeros((1, self.n_features), dtype=np.float32)
+        self._hot = []
+
+    def _offset(self, offsets, kind, value, strict):
+        """Look up a category offset, raising or returning -1 for unknown values."""
+        offset = offsets.get(value, -1)
+        if offset < 0 and strict:
+            raise UnknownCategoryError(f"Unknown {kind} '{value}' (not seen during training)")
+        return offset
+
+    def encode_row(self, area, disposition, region, strict=True):
+        """
+        Encode one apartment into the reusable row buffer.
+
+        Args:
+            area (float): Area in m^2.
+            disposition (str): Disposition category.
+            region (str): Region name.
+            strict (bool): Raise UnknownCategoryError for unknown categories.
+                When False, unknown categories are encoded as all zeros.
+
+        Returns:
+            np.ndarray: The (1, n_features) buffer, valid until the next call.
+        """
+        disp_offset = self._offset(self.disposition_offsets, 'disposition', disposition, strict)
+        region_offset = self._offset(self.region_offsets, 'region', region, strict)
+
+        row = self._row[0]
+        for offset in self._hot:
+            row[offset] = 0
+        self._hot = [o for o in (disp_offset, region_offset) if o >= 0]
+        for offset in self._hot:
+            row[offset] = 1
+        if self.area_offset >= 0:
+            row[self.area_offset] = area
+        return self._row
+
+    def encode_into(self, X, areas, dispositions, regions, strict=True):
+        """
+        One-hot encode a chunk of rows into the zeroed matrix ``X``.
+
+        Args:
+            X (np.ndarray): Zeroed (n_rows, n_features) matrix to fill.
+            areas (np.ndarray): Areas in m^2.
+            dispositions (np.ndarray): Disposition per row.
+            regions (np.ndarray): Region per row.
+            strict (bool): Raise UnknownCategoryError for unknown categories.
+        """
+        import pandas as pd
+
+        rows = np.arange(len(areas))
+
+        if self.area_offset >= 0:
+            X[:, self.area_offset] = areas
+
+        for kind, offsets, values in (('disposition', self.disposition_offsets, dispositions),
+                                      ('region', self.region_offsets, regions)):
+            # Resolve each distinct category once instead of once per row
+            codes, uniques = pd.factorize(values)
+            resolved = [self._offset(offsets, kind, u, strict) for u in uniques]
+            if strict and (codes < 0).any():
+                raise UnknownCategoryError(f"Missing {kind} value in batch input")
+            cols = np.array(resolved + [-1], dtype=np.int64)[codes]
+            known = cols >= 0
+            X[rows[known], cols[known]] = 1
+
 
 class PricePredictor:
     """
     Handles model loading and price prediction inference.
     
     Attributes:
-        model (RandomForestRegressor): The trained sklearn model.
+        model (RandomForestRegressor | FlatForest): The trained model, either the
+            sklearn estimator or its exported flat-array form.
         model_columns (list): List of feature names expected by the model.
+        encoder (FeatureEncoder): One-hot encoder compiled from model_columns at load time.
+        cache (PredictionCache): Optional LRU cache of predictions (None when disabled).
+        engine (str): Prediction backend from config: 'sklearn' (the pickled forest),
+            'flat' (FlatForest arrays from the model bundle, no sklearn needed) or 'grid' (precomputed
+            PriceGrid, the forest is not loaded at all).
+        grid (PriceGrid): Tabulated predictions when engine is 'grid', otherwise None.
         metadata (dict): Additional metadata (regions, valid ranges) loaded from JSON.
     """
     def __init__(self, model_path=None, columns_path=None):
@@ -24,10 +147,19 @@ class PricePredictor:
         """
         self.model = None
         self.model_columns = None
+        self.encoder = None
         self.current_year = datetime.datetime.now().year
         self.config = ConfigLoader.get_config()
         self.model_config = self.config.get('model', {})
         self.paths_config = self.config.get('paths', {})
+        self.inference_config = self.model_config.get('inference', {})
+        self.cache = PredictionCache.from_config(self.inference_config.get('cache', {}))
+        self.engine = self.inference_config.get('engine', 'sklearn')
+        self.grid = None
+        # FlatForest export of an sklearn model, used for single-row predictions
+        self._row_forest = None
+        self._row_forest_source = None
+        self.grid_interpolate = self.inference_config.get('grid_interpolate', False)
         self.metadata = None
         
         # Resolve absolute paths relative to project root
@@ -41,9 +173,16 @@ class PricePredictor:
         
         final_model_path = model_path or os.path.join(base_model_path, model_filename)
         final_columns_path = columns_path or os.path.join(base_model_path, columns_filename)
+        grid_path = os.path.join(base_model_path, self.paths_config.get('grid_filename', 'apartment_price_grid.npz'))
+        bundle_path = os.path.join(base_model_path, self.paths_config.get('bundle_filename', 'apartment_model.bundle'))
         
         try:
-            self.load_model_data(final_model_path, final_columns_path)
+            if self.engine == 'grid':
+                self.load_grid_data(grid_path)
+            elif self.engine == 'flat':
+                self.load_bundle_data(bundle_path)
+            else:
+                self.load_model_data(final_model_path, final_columns_path)
         except Exception as e:
             print(f"Warning: Could not load model: {e}")
 
@@ -54,17 +193,106 @@ class PricePredictor:
         if not os.path.exists(columns_path):
             raise FileNotFoundError(f"Model columns not found: {columns_path}")
 
+        import joblib
+
         self.model = joblib.load(model_path)
         self.model_columns = joblib.load(columns_path)
+        self.encoder = FeatureEncoder(self.model_columns)
+        if self.cache is not None:
+            self.cache.clear()
+        # The single-row export is built on first use (see prepare_single_predictions)
+        self._row_forest = self._row_forest_source = None
         
-        # Load Metadata
-        metadata_path = os.path.join(os.path.dirname(model_path), 'apartment_metadata.json')
+        self._load_metadata(os.path.dirname(model_path))
+
+    def load_bundle_data(self, bundle_path):
+        """
+        Load the flat-array forest, columns and metadata from a single model bundle.
+
+        By default the tree arrays are memory-mapped read-only, so every process
+        serving the same bundle shares one copy of them. A bundle with another
+        format version, a wrong size or a bad checksum raises ArtifactError.
+        """
+        mmap_mode = 'r' if self.inference_config.get('mmap', True) else None
+        verify = self.inference_config.get('verify_checksum', True)
+        arrays, header = read_bundle(bundle_path, mmap_mode=mmap_mode, verify=verify)
+
+        self.model = FlatForest.from_arrays(arrays, header['max_depth'], header['columns'])
+        self.model_columns = self.model.columns
+        self.encoder = FeatureEncoder(self.model_columns)
+        self.metadata = header.get('metadata')
+        if self.cache is not None:
+            self.cache.clear()
+
+    def load_grid_data(self, grid_path):
+        """Load the precomputed price grid instead of the pickled forest."""
+        from src.model.price_grid import PriceGrid
+
+        if not os.path.exists(grid_path):
+            raise FileNotFoundError(f"Price grid not found: {grid_path}")
+
+        self.grid = PriceGrid.load(grid_path)
+        if self.cache is not None:
+            self.cache.clear()
+
+        self._load_metadata(os.path.dirname(grid_path))
+
+    def _load_metadata(self, model_folder):
+        """Load the metadata JSON stored next to the model artifacts (if any)."""
+        metadata_filename = self.paths_config.get('metadata_filename', 'apartment_metadata.json')
+        metadata_path = os.path.join(model_folder, metadata_filename)
         if os.path.exists(metadata_path):
              with open(metadata_path, 'r', encoding='utf-8') as f:
                   self.metadata = json.load(f)
         else:
              self.metadata = None
 
+    def _get_encoder(self):
+        """Return the compiled encoder, recompiling it if the model columns were replaced."""
+        if self.encoder is None or self.encoder.columns is not self.model_columns:
+            self.encoder = FeatureEncoder(self.model_columns)
+        return self.encoder
+
+    def prepare_single_predictions(self):
+        """
+        Build the single-row model now, so the first predict_price call does not
+        pay for it. Callers that only use predict_batch never need it.
+        """
+        self._get_row_model()
+
+    def _get_row_model(self):
+        """
+        Return the model used for single-row predictions.
+
+        sklearn's predict costs about 10 ms per call, almost all of it dispatch
+        overhead, so a RandomForestRegressor is exported on first use into a
+        FlatForest, which returns identical prices in well under a millisecond
+        for one row. The export is kept only by predictors that price single rows.
+        """
+        model = self.model
+        # Only check for sklearn if it has already been imported (the 'flat' engine never loads it)
+        ensemble = sys.modules.get('sklearn.ensemble')
+        if ensemble is None or not isinstance(model, ensemble.RandomForestRegressor):
+            return model
+        if self._row_forest_source is not model:
+            self._row_forest = FlatForest.from_sklearn(model, self.model_columns)
+            self._row_forest_source = model
+        return self._row_forest
+
+    def _predict_matrix(self, X):
+        """
+        Run the model on an already encoded feature matrix.
+
+        The sklearn model is fitted on a DataFrame, so it warns about missing
+        feature names when given a plain array. The column order is guaranteed by
+        the encoder, so the warning is silenced here.
+        """
+        if isinstance(self.model, FlatForest):
+            return self.model.predict(X)
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", message="X does not have valid feature names")
+            return np.asarray(self.model.predict(X), dtype=np.float64)
+
     def get_regions(self):
         """Return list of valid regions."""
         if self.metadata:
@@ -77,7 +305,24 @@ class PricePredictor:
             return self.metadata.get('dispositions', [])
         return list(self.model_config.get('disposition_mapping', {}).keys())
 
-    def predict_price(self, area, disposition, region):
+    def get_known_categories(self):
+        """
+        Dispositions and regions the loaded model (or price grid) can price.
+
+        Unlike get_dispositions/get_regions, which return the UI metadata, these
+        are read from the model columns, so they match what predict_batch accepts.
+
+        Returns:
+            tuple: (set of dispositions, set of regions).
+        """
+        if self.grid is not None:
+            return set(self.grid.disposition_index), set(self.grid.region_index)
+        if self.model is None or self.model_columns is None:
+            raise ValueError("Model not loaded")
+        encoder = self._get_encoder()
+        return set(encoder.disposition_offsets), set(encoder.region_offsets)
+
+    def predict_price(self, area, disposition, region, strict=True):
         """
         Predict the price of an apartment.
 
@@ -85,36 +330,143 @@ class PricePredictor:
             area (float): Area in m^2.
             disposition (str): Disposition category (e.g. '2+kk').
             region (str): Region name (e.g. 'Praha').
+            strict (bool): Raise UnknownCategoryError if the disposition or region
+                was not seen during training. When False, the unknown category is
+                left out of the encoding (such calls bypass the cache).
 
         Returns:
             float: Predicted price.
         """
+        if self.grid is not None:
+            return self.grid.lookup(area, disposition, region, interpolate=self.grid_interpolate, strict=strict)
         if self.model is None or self.model_columns is None:
             raise ValueError("Model not loaded")
 
-        # 1. Create input dictionary with zeros
-        input_data = {col: 0 for col in self.model_columns}
+        cache = self.cache if strict else None
+        if cache is not None:
+            bucket, area = cache.quantize(area)
+            key = (bucket, disposition, region)
+            price = cache.get(key)
+            if price is not None:
+                return price
 
-        # 2. Set numerical values
-        input_data['area'] = area
+        row = self._get_encoder().encode_row(area, disposition, region, strict=strict)
+        row_model = self._get_row_model()
+        if isinstance(row_model, FlatForest):
+            price = row_model.predict(row)[0]
+        else:
+            price = self._predict_matrix(row)[0]
 
-        # 3. Set categorical values (One-Hot Encoding)
-        disp_col = f"disposition_{disposition}"
-        region_col = f"region_{region}"
+        if cache is not None:
+            cache.put(key, price)
+        return price
 
-        if disp_col in input_data:
-            input_data[disp_col] = 1
-        
-        if region_col in input_data:
-            input_data[region_col] = 1
+    def predict_batch(self, areas, dispositions=None, regions=None, chunk_size=None, strict=True):
+        """
+        Predict prices for many apartments at once.
 
-        # 4. Create DataFrame and ensure column order
-        encoded_df = pd.DataFrame([input_data])
-        encoded_df = encoded_df[self.model_columns]
+        Accepts either three parallel arrays (``areas``, ``dispositions``, ``regions``),
+        a DataFrame with ``area``, ``disposition`` and ``region`` columns passed as
+        ``areas``, or an iterable of ``(area, disposition, region)`` records passed
+        as ``areas``. Rows are one-hot encoded into a preallocated matrix and the
+        model is called once per chunk. When the prediction cache is enabled, only
+        the distinct keys missing from the cache are sent to the model.
 
-        # 5. Predict
-        price = self.model.predict(encoded_df)[0]
-        return price
+        Args:
+            areas (array-like | pd.DataFrame | iterable): Areas in m^2, or the whole input.
+            dispositions (array-like, optional): Disposition per row.
+            regions (array-like, optional): Region per row.
+            chunk_size (int, optional): Rows per model call (defaults to config value).
+            strict (bool): Raise UnknownCategoryError for categories not seen during training.
+
+        Returns:
+            np.ndarray: Predicted prices, in input order.
+        """
+        if self.grid is None and (self.model is None or self.model_columns is None):
+            raise ValueError("Model not loaded")
+
+        areas, dispositions, regions = self._normalize_batch_input(areas, dispositions, regions)
+        if self.grid is not None:
+            return self.grid.lookup_batch(areas, dispositions, regions,
+                                          interpolate=self.grid_interpolate, strict=strict)
+        if self.cache is not None and strict:
+            return self._predict_batch_cached(areas, dispositions, regions, chunk_size)
+        return self._predict_batch_encoded(areas, dispositions, regions, chunk_size, strict)
+
+    def _predict_batch_encoded(self, areas, dispositions, regions, chunk_size, strict):
+        """Encode normalized batch input chunk by chunk and evaluate the model."""
+        encoder = self._get_encoder()
+        n_rows = len(areas)
+        prices = np.empty(n_rows, dtype=np.float64)
+        if n_rows == 0:
+            return prices
+
+        chunk_size = chunk_size or self.inference_config.get('batch_chunk_size', 10000)
+        chunk_size = min(chunk_size, n_rows)
+        buffer = np.zeros((chunk_size, encoder.n_features), dtype=np.float32)
+
+        for start in range(0, n_rows, chunk_size):
+            stop = min(start + chunk_size, n_rows)
+            X = buffer[:stop - start]
+            X.fill(0)
+            encoder.encode_into(X, areas[start:stop], dispositions[start:stop], regions[start:stop], strict=strict)
+            prices[start:stop] = self._predict_matrix(X)
+
+        return prices
+
+    def _predict_batch_cached(self, areas, dispositions, regions, chunk_size):
+        """Answer a normalized batch from the cache, predicting each missing key once."""
+        cache = self.cache
+        prices = np.empty(len(areas), dtype=np.float64)
+        pending = {}
+
+        for i, (area, disposition, region) in enumerate(zip(areas.tolist(), dispositions, regions)):
+            bucket, snapped = cache.quantize(area)
+            key = (bucket, disposition, region)
+            if key in pending:
+                pending[key][1].append(i)
+                continue
+            price = cache.get(key)
+            if price is None:
+                pending[key] = (snapped, [i])
+            else:
+                prices[i] = price
+
+        if pending:
+            keys = list(pending)
+            missing = self._predict_batch_encoded(
+                np.array([pending[k][0] for k in keys], dtype=np.float64),
+                np.array([k[1] for k in keys], dtype=object),
+                np.array([k[2] for k in keys], dtype=object),
+                chunk_size, strict=True)
+            for key, price in zip(keys, missing.tolist()):
+                cache.put(key, price)
+                prices[pending[key][1]] = price
+
+        return prices
+
+    @staticmethod
+    def _normalize_batch_input(areas, dispositions, regions):
+        """Turn any supported batch input into three aligned NumPy arrays."""
+        # A DataFrame can only be passed in if pandas has already been imported
+        pd = sys.modules.get('pandas')
+        if pd is not None and isinstance(areas, pd.DataFrame):
+            df = areas
+            areas, dispositions, regions = df['area'], df['disposition'], df['region']
+        elif dispositions is None and regions is None:
+            records = list(areas)
+            areas = [r[0] for r in records]
+            dispositions = [r[1] for r in records]
+            regions = [r[2] for r in records]
+        elif dispositions is None or regions is None:
+            raise ValueError("Both dispositions and regions must be given together with areas")
+
+        areas = np.asarray(areas, dtype=np.float64)
+        dispositions = np.asarray(dispositions, dtype=object)
+        regions = np.asarray(regions, dtype=object)
+        if not (len(areas) == len(dispositions) == len(regions)):
+            raise ValueError("areas, dispositions and regions must have the same length")
+        return areas, dispositions, regions
 
     def calculate_future_value(self, start_price, years=10, growth_rate=0.03):
         """
@@ -141,3 +493,84 @@ class PricePredictor:
             future_values.append({'year': start_year_val + i, 'price': current_val})
             
         return future_values
+
+    def simulate_future_value(self, start_price, years=10, drift=0.04, volatility=0.05, n_paths=100_000,
+                              percentiles=(5, 50, 95), n_workers=1, seed=None, should_stop=None):
+        """
+        Simulate stochastic growth paths and return percentile bands instead of one curve.
+
+        Annual growth factors are lognormal with expected growth ``drift`` and log
+        volatility ``volatility``. Memory stays bounded for any ``n_paths`` (see
+        src.model.simulation).
+
+        Args:
+            start_price (float): Initial price.
+            years (int): Number of years to project.
+            drift (float): Expected annual growth rate (e.g. 0.04 for 4%).
+            volatility (float): Standard deviation of the annual log growth.
+            n_paths (int): Number of simulated paths.
+            percentiles (tuple): Percentiles to report.
+            n_workers (int): Worker processes used for sampling.
+            seed (int, optional): Seed for reproducible bands.
+            should_stop (callable, optional): Checked between simulation chunks;
+                returning True abandons the run with SimulationCancelled.
+
+        Returns:
+            list[dict]: One dict per year with 'year' and a 'p<percentile>' price
+            per requested percentile (e.g. 'p5', 'p50', 'p95').
+        """
+        from src.model.simulation import simulate_price_bands
+
+        bands = simulate_price_bands(start_price, years=years, drift=drift, volatility=volatility,
+                                     n_paths=n_paths, percentiles=percentiles,
+                                     n_workers=n_workers, seed=seed, should_stop=should_stop)
+        keys = [f"p{q:g}" for q in percentiles]
+        return [
+            dict({'year': self.current_year + i}, **{k: float(bands[j, i]) for j, k in enumerate(keys)})
+            for i in range(years + 1)
+        ]
+
+    def project_future_values(self, start_prices, growth_rates, years=10):
+        """
+        Project many start prices under several growth scenarios at once.
+
+        Args:
+            start_prices (float | array-like): One or more current prices.
+            growth_rates (float | array-like): Either one constant annual rate per
+                scenario, shape (n_scenarios,), or a per-year rate curve per
+                scenario, shape (n_scenarios, years).
+            years (int): Number of years to project.
+
+        Returns:
+            np.ndarray: Prices of shape (n_listings, n_scenarios, years + 1). Index 0
+            on the last axis is the start price (current year).
+        """
+        start = np.atleast_1d(np.asarray(start_prices, dtype=np.float64))
+        rates = np.asarray(growth_rates, dtype=np.float64)
+
+        if rates.ndim <= 1:
+            curves = np.broadcast_to(np.atleast_1d(rates)[:, None], (rates.size, years))
+        elif rates.ndim == 2 and rates.shape[1] == years:
+            curves = rates
+        else:
+            raise ValueError(f"growth_rates must have shape (n_scenarios,) or (n_scenarios, {years})")
+
+        factors = np.ones((curves.shape[0], years + 1), dtype=np.float64)
+        np.cumprod(1 + curves, axis=1, out=factors[:, 1:])
+        return start[:, None, None] * factors[None, :, :]
+
+    def projection_to_records(self, projection, listing=0, scenario=0):
+        """
+        Convert one row of a projection into the list-of-dicts shape returned by
+        calculate_future_value.
+
+        Args:
+            projection (np.ndarray): Result of project_future_values.
+            listing (int): Listing index.
+            scenario (int): Scenario index.
+
+        Returns:
+            list[dict]: List of dicts with 'year' and 'price'.
+        """
+        prices = projection[listing, scenario]
+        return [{'year': self.current_year + i, 'price': float(p)} for i, p in enumerate(prices)]
@@ -0,0 +1,250 @@
+import argparse
+import datetime
+import os
+import sqlite3
+import sys
+
+import pandas as pd
+
+# Init path to access shared utils
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.append(project_root)
+
+from src.model.features import build_features
+from src.utils.listing_keys import listing_key
+
+# Bump when the schema changes incompatibly
+STORE_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    id INTEGER PRIMARY KEY,            -- listing_key(url): one row per listing
+    url TEXT NOT NULL,
+    title TEXT,
+    raw_price TEXT,
+    location TEXT,
+    area REAL,
+    disposition TEXT,
+    region TEXT,
+    price REAL,
+    first_seen TEXT NOT NULL,          -- UTC, ISO 8601
+    last_seen TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS listings_region ON listings (region, last_seen);
+CREATE INDEX IF NOT EXISTS listings_disposition ON listings (disposition, last_seen);
+CREATE INDEX IF NOT EXISTS listings_last_seen ON listings (last_seen);
+
+-- One row when a listing is first seen and one whenever its price changes
+CREATE TABLE IF NOT EXISTS price_history (
+    listing_id INTEGER NOT NULL REFERENCES listings (id),
+    seen_at TEXT NOT NULL,
+    raw_price TEXT,
+    price REAL,
+    PRIMARY KEY (listing_id, seen_at)
+) WITHOUT ROWID;
+
+CREATE TEMP TABLE IF NOT EXISTS incoming (
+    id INTEGER, url TEXT, title TEXT, raw_price TEXT, location TEXT,
+    area REAL, disposition TEXT, region TEXT, price REAL, seen_at TEXT
+);
+"""
+
+FEATURE_COLUMNS = ['url', 'area', 'disposition', 'region', 'price']
+
+
+def utc_now():
+    """Current UTC time in the store's timestamp format."""
+    return datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+
+
+def default_store_path(config):
+    """Path of the listing store configured in ``paths``."""
+    return os.path.join(project_root, config['paths']['output_folder'], config['paths']['store_filename'])
+
+
+def open_scraper_store(config):
+    """The listing store the scrapers write to, or None if ``scraper.write_store`` is off."""
+    if not config['scraper'].get('write_store', False):
+        return None
+    return ListingStore(default_store_path(config))
+
+
+class ListingStore:
+    """
+    SQLite store of scraped listings with first/last sighting and price history.
+
+    Each listing is one row keyed by its URL (see listing_keys.listing_key) and
+    carries the raw scraped fields together with the parsed model features
+    (area, disposition, region, numeric price), so training can select slices
+    by region, disposition or date through indexes instead of scanning a CSV.
+    """
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, STORE_VERSION):
+            raise RuntimeError(f"{path} has store version {version}, expected {STORE_VERSION}")
+        self._conn.executescript(SCHEMA)
+        self._conn.execute(f"PRAGMA user_version = {STORE_VERSION}")
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM listings").fetchone()[0]
+
+    def add_listings(self, ads, seen_at=None):
+        """
+        Insert or update scraped ads in one transaction (e.g. one page).
+
+        New listings are inserted with ``first_seen = seen_at``. Listings seen
+        before get their fields and ``last_seen`` updated, and a price_history
+        row when the price changed.
+
+        Args:
+            ads (list[dict] or pd.DataFrame): Ads with 'title', 'url',
+                'raw_price' and 'location'.
+            seen_at (str, optional): Timestamp of the sighting (defaults to now).
+
+        Returns:
+            dict: Counts of 'new' listings, 'updated' listings and 'price_changes'.
+        """
+        raw = ads if isinstance(ads, pd.DataFrame) else pd.DataFrame(ads, columns=['title', 'url', 'raw_price', 'location'])
+        raw = raw[raw['url'].notna() & (raw['url'].astype(str) != '')]
+        counts = {'new': 0, 'updated': 0, 'price_changes': 0}
+        if raw.empty:
+            return counts
+
+        seen_at = seen_at or utc_now()
+        features = build_features(raw)
+        rows = pd.DataFrame({
+            'id': [listing_key(url) for url in raw['url'].tolist()],
+            'url': raw['url'], 'title': raw['title'], 'raw_price': raw['raw_price'].astype(str),
+            'location': raw['location'], 'area': features['area'],
+            'disposition': features['disposition'].astype(object), 'region': features['region'].astype(object),
+            'price': features['price'], 'seen_at': seen_at,
+        })
+        # The last occurrence wins when a batch repeats a listing; sorted keys
+        # keep the B-tree inserts sequential
+        rows = rows.drop_duplicates('id', keep='last').sort_values('id').astype(object)
+        rows = rows.where(rows.notna(), None).itertuples(index=False, name=None)
+
+        with self._conn:
+            self._conn.execute("DELETE FROM incoming")
+            self._conn.executemany("INSERT INTO incoming VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            # Sightings older than the stored one (e.g. importing an old CSV) do not overwrite it
+            new, updated, changed = self._conn.execute("""
+                SELECT SUM(l.id IS NULL),
+                       SUM(l.id IS NOT NULL),
+                       SUM(l.id IS NOT NULL AND l.price IS NOT i.price AND i.seen_at >= l.last_seen)
+                FROM incoming i LEFT JOIN listings l ON l.id = i.id
+            """).fetchone()
+            self._conn.execute("""
+                INSERT OR IGNORE INTO price_history (listing_id, seen_at, raw_price, price)
+                SELECT i.id, i.seen_at, i.raw_price, i.price
+                FROM incoming i LEFT JOIN listings l ON l.id = i.id
+                WHERE l.id IS NULL OR (l.price IS NOT i.price AND i.seen_at >= l.last_seen)
+            """)
+            self._conn.execute("""
+                INSERT INTO listings (id, url, title, raw_price, location, area, disposition, region, price,
+                                      first_seen, last_seen)
+                SELECT id, url, title, raw_price, location, area, disposition, region, price, seen_at, seen_at
+                FROM incoming WHERE true
+                ON CONFLICT (id) DO UPDATE SET
+                    url = excluded.url, title = excluded.title, raw_price = excluded.raw_price,
+                    location = excluded.location, area = excluded.area, disposition = excluded.disposition,
+                    region = excluded.region, price = excluded.price, last_seen = excluded.last_seen
+                WHERE excluded.last_seen >= listings.last_seen
+            """)
+            self._conn.execute("DELETE FROM incoming")
+        counts.update(new=new, updated=updated, price_changes=changed)
+        return counts
+
+    def import_csv(self, csv_path, seen_at=None, chunk_size=50000):
+        """
+        One-shot import of a raw scraped CSV, one transaction per chunk.
+
+        The CSV has no timestamps, so all rows are recorded as seen at
+        ``seen_at`` (defaults to the file's modification time). Importing the
+        same file again changes nothing.
+
+        Returns:
+            dict: Summed counts from add_listings.
+        """
+        if seen_at is None:
+            mtime = os.path.getmtime(csv_path)
+            seen_at = datetime.datetime.fromtimestamp(mtime, datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+        totals = {'new': 0, 'updated': 0, 'price_changes': 0}
+        for chunk in pd.read_csv(csv_path, chunksize=chunk_size):
+            for key, value in self.add_listings(chunk, seen_at).items():
+                totals[key] += value
+        return totals
+
+    def load_features(self, regions=None, dispositions=None, since=None, days=None):
+        """
+        Load the training columns of a slice of listings.
+
+        Args:
+            regions (list, optional): Only these regions.
+            dispositions (list, optional): Only these dispositions.
+            since (str, optional): Only listings seen at or after this timestamp.
+            days (int, optional): Only listings seen in the last ``days`` days.
+
+        Returns:
+            pd.DataFrame: Same columns as features.build_features ('url', 'area',
+            categorical 'disposition' and 'region', 'price').
+        """
+        where, params = [], []
+        if regions:
+            where.append(f"region IN ({', '.join('?' * len(regions))})")
+            params += list(regions)
+        if dispositions:
+            where.append(f"disposition IN ({', '.join('?' * len(dispositions))})")
+            params += list(dispositions)
+        if days is not None:
+            cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=days)
+            since = max(since or '', cutoff.strftime('%Y-%m-%dT%H:%M:%S'))
+        if since:
+            where.append("last_seen >= ?")
+            params.append(since)
+
+        query = f"SELECT {', '.join(FEATURE_COLUMNS)} FROM listings"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        df = pd.read_sql_query(query + " ORDER BY id", self._conn, params=params)
+        df['area'] = df['area'].astype('float64')
+        df['price'] = df['price'].astype('float64')
+        for col in ['disposition', 'region']:
+            df[col] = df[col].astype(object).astype('category')
+        return df
+
+    def price_history(self, url):
+        """Recorded prices of one listing, oldest first."""
+        return pd.read_sql_query("SELECT seen_at, raw_price, price FROM price_history WHERE listing_id = ? "
+                                 "ORDER BY seen_at", self._conn, params=[listing_key(url)])
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    from src.utils.config_loader import ConfigLoader
+
+    config = ConfigLoader.get_config()
+    paths_cfg = config['paths']
+    parser = argparse.ArgumentParser(description="Import the raw scraped CSV into the SQLite listing store.")
+    parser.add_argument('--csv', default=os.path.join(project_root, paths_cfg['output_folder'], paths_cfg['output_filename']))
+    parser.add_argument('--store', default=default_store_path(config))
+    parser.add_argument('--seen-at', help="Timestamp recorded for the imported rows (default: CSV modification time).")
+    args = parser.parse_args()
+
+    with ListingStore(args.store) as store:
+        counts = store.import_csv(args.csv, seen_at=args.seen_at)
+        print(f"Imported {args.csv}: {counts['new']} new, {counts['updated']} already stored, "
+              f"{counts['price_changes']} price changes. The store holds {len(store)} listings.")
@@ -0,0 +1,95 @@
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of predicted prices keyed on (quantized area, disposition, region).
+
+    Areas are snapped to a grid of ``area_step`` m^2, so requests that differ by a
+    fraction of a square meter share one entry. The predictor evaluates the model
+    on the snapped area, so a cached price is exactly what the model returns for
+    the bucket regardless of which request filled it.
+
+    Attributes:
+        area_step (float): Area quantization step in m^2 (0 disables quantization).
+        max_entries (int): Maximum number of cached prices.
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups that required a model evaluation.
+        evictions (int): Number of entries dropped to respect max_entries.
+    """
+    def __init__(self, area_step=0.5, max_entries=4096):
+        """
+        Initialize an empty cache.
+
+        Args:
+            area_step (float): Area quantization step in m^2.
+            max_entries (int): Maximum number of cached prices.
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.area_step = area_step
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_config(cls, cache_config):
+        """
+        Build a cache from the ``model.inference.cache`` config section.
+
+        Returns:
+            PredictionCache or None: None when caching is disabled.
+        """
+        if not cache_config.get('enabled', False):
+            return None
+        return cls(area_step=cache_config.get('area_step', 0.5),
+                   max_entries=cache_config.get('max_entries', 4096))
+
+    def quantize(self, area):
+        """
+        Snap an area to the cache grid.
+
+        Returns:
+            tuple: (bucket index or exact area, snapped area).
+        """
+        if not self.area_step:
+            return area, area
+        bucket = int(round(area / self.area_step))
+        return bucket, bucket * self.area_step
+
+    def get(self, key):
+        """Return the cached price for ``key`` (or None) and update the counters."""
+        price = self._entries.get(key)
+        if price is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return price
+
+    def put(self, key, price):
+        """Store a price, evicting the least recently used entry when full."""
+        self._entries[key] = price
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop all entries (e.g. after a new model was loaded). Counters are kept."""
+        self._entries.clear()
+
+    def stats(self):
+        """Return a dict with the current size and hit/miss/eviction counters."""
+        return {
+            'size': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,394 @@
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import numpy as np
+
+# Init path to access shared utils
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.append(project_root)
+
+from src.utils.config_loader import ConfigLoader
+from src.model.inference import PricePredictor
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent prediction requests into few ``predict_batch`` calls.
+
+    Requests are queued; a single dispatcher thread takes the first waiting
+    request, keeps collecting more for up to ``window`` seconds (or until
+    ``max_batch_size`` rows are gathered) and evaluates them with one model call.
+    All model calls happen on that thread, so the predictor and its cache are
+    never used concurrently.
+
+    Attributes:
+        batches (int): Model calls made so far.
+        batched_rows (int): Rows predicted so far.
+        max_rows (int): Largest batch so far.
+    """
+    def __init__(self, predict_batch, window=0.002, max_batch_size=256):
+        self.predict_batch = predict_batch
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self.batched_rows = 0
+        self.max_rows = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def queue_depth(self):
+        """Requests waiting for the dispatcher."""
+        return self._queue.qsize()
+
+    def submit(self, areas, dispositions, regions):
+        """
+        Queue rows for prediction.
+
+        Returns:
+            Future: Resolves to an np.ndarray of prices, or raises the model's
+            error (e.g. UnknownCategoryError) for these rows.
+        """
+        future = Future()
+        self._queue.put((np.asarray(areas, dtype=np.float64), np.asarray(dispositions, dtype=object),
+                         np.asarray(regions, dtype=object), future))
+        return future
+
+    def close(self):
+        """Stop the dispatcher after the queued requests."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            jobs, rows = [first], len(first[0])
+            deadline = time.perf_counter() + self.window
+            closing = False
+            while rows < self.max_batch_size:
+                timeout = deadline - time.perf_counter()
+                try:
+                    job = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    closing = True
+                    break
+                jobs.append(job)
+                rows += len(job[0])
+            self._evaluate(jobs)
+            if closing:
+                return
+
+    def _evaluate(self, jobs):
+        areas, dispositions, regions = (np.concatenate([job[i] for job in jobs]) for i in range(3))
+        try:
+            prices = self.predict_batch(areas, dispositions, regions)
+        except Exception:
+            # One invalid request must not fail the others: retry each on its own
+            for job in jobs:
+                self._evaluate_one(job)
+            return
+        self._record(len(areas))
+        start = 0
+        for job in jobs:
+            stop = start + len(job[0])
+            job[3].set_result(prices[start:stop])
+            start = stop
+
+    def _evaluate_one(self, job):
+        try:
+            prices = self.predict_batch(job[0], job[1], job[2])
+        except Exception as e:
+            job[3].set_exception(e)
+            return
+        self._record(len(job[0]))
+        job[3].set_result(prices)
+
+    def _record(self, n_rows):
+        self.batches += 1
+        self.batched_rows += n_rows
+        self.max_rows = max(self.max_rows, n_rows)
+
+
+class LatencyStats:
+    """Request counts and latency percentiles per endpoint over the last ``window`` requests."""
+    def __init__(self, window=10000):
+        self._lock = threading.Lock()
+        self._latencies = defaultdict(lambda: deque(maxlen=window))
+        self._counts = defaultdict(int)
+        self._errors = defaultdict(int)
+
+    def record(self, endpoint, seconds, ok=True):
+        with self._lock:
+            self._latencies[endpoint].append(seconds * 1000)
+            self._counts[endpoint] += 1
+            if not ok:
+                self._errors[endpoint] += 1
+
+    def snapshot(self):
+        """Dict endpoint -> {'count', 'errors', 'p50_ms', 'p90_ms', 'p99_ms'}."""
+        with self._lock:
+            latencies = {endpoint: np.array(values) for endpoint, values in self._latencies.items()}
+            counts, errors = dict(self._counts), dict(self._errors)
+        report = {}
+        for endpoint, values in latencies.items():
+            p50, p90, p99 = np.percentile(values, [50, 90, 99]) if len(values) else (0.0, 0.0, 0.0)
+            report[endpoint] = {'count': counts[endpoint], 'errors': errors.get(endpoint, 0),
+                                'p50_ms': round(float(p50), 3), 'p90_ms': round(float(p90), 3),
+                                'p99_ms': round(float(p99), 3)}
+        return report
+
+
+class BadRequest(ValueError):
+    """Invalid request body; answered with HTTP 400."""
+
+
+def _listing(item):
+    """(area, disposition, region) of one JSON listing."""
+    try:
+        area = float(item['area'])
+        if not np.isfinite(area):
+            raise ValueError(area)
+        return area, str(item['disposition']), str(item['region'])
+    except (KeyError, TypeError, ValueError):
+        raise BadRequest("Each listing needs a finite numeric 'area' and a 'disposition' and 'region'")
+
+
+class PredictionServer:
+    """
+    HTTP/JSON price service around one preloaded PricePredictor.
+
+    Endpoints:
+        POST /predict        {"area", "disposition", "region"} -> {"price"}
+        POST /predict/batch  {"listings": [{...}, ...]} -> {"prices": [...]}
+        POST /project        {"start_price"} or a listing, optional "years" and
+                             "growth_rates" -> {"start_price", "scenarios": [...]}
+        GET  /health         model and engine status
+        GET  /stats          request counts, latency percentiles, queue depth
+                             and batching counters
+
+    Single predictions are coalesced by a MicroBatcher. Attributes mirror
+    FixtureServer: ``base_url`` once bound, start()/serve_forever()/stop().
+    """
+    def __init__(self, predictor, host='127.0.0.1', port=0, batch_window_ms=2.0, max_batch_size=256,
+                 max_batch_listings=10000, max_body_bytes=1 << 20, default_years=10, default_growth_rate=0.04):
+        self.predictor = predictor
+        self.batcher = MicroBatcher(predictor.predict_batch, batch_window_ms / 1000, max_batch_size)
+        self.stats = LatencyStats()
+        self.max_batch_listings = max_batch_listings
+        self.max_body_bytes = max_body_bytes
+        self.default_years = default_years
+        self.default_growth_rate = default_growth_rate
+        self.started_at = time.time()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+        host, port = self._server.server_address[:2]
+        self.base_url = f"http://{host}:{port}"
+
+    @classmethod
+    def from_config(cls, config, predictor=None, host=None, port=None):
+        """Build the server from the ``model.server`` section (loading the configured model)."""
+        server_cfg = config['model'].get('server', {})
+        trend_cfg = config['app'].get('future_trend', {})
+        return cls(predictor or PricePredictor(),
+                   host=host or server_cfg.get('host', '127.0.0.1'),
+                   port=server_cfg.get('port', 8000) if port is None else port,
+                   batch_window_ms=server_cfg.get('batch_window_ms', 2.0),
+                   max_batch_size=server_cfg.get('max_batch_size', 256),
+                   max_batch_listings=server_cfg.get('max_batch_listings', 10000),
+                   default_years=trend_cfg.get('years', 10),
+                   default_growth_rate=trend_cfg.get('growth_rate', 0.04))
+
+    @property
+    def model_loaded(self):
+        return self.predictor.grid is not None or self.predictor.model is not None
+
+    # --- Endpoints ---
+
+    def health(self, _body):
+        return 200, {'status': 'ok' if self.model_loaded else 'no model', 'model_loaded': self.model_loaded,
+                     'engine': self.predictor.engine, 'uptime_seconds': round(time.time() - self.started_at, 1)}
+
+    def stats_report(self, _body):
+        batcher = self.batcher
+        report = {
+            'endpoints': self.stats.snapshot(),
+            'queue_depth': batcher.queue_depth,
+            'batching': {'batches': batcher.batches, 'rows': batcher.batched_rows, 'max_rows': batcher.max_rows,
+                         'mean_rows': round(batcher.batched_rows / batcher.batches, 2) if batcher.batches else 0.0},
+        }
+        cache = self.predictor.cache
+        if cache is not None:
+            report['cache'] = {'hits': cache.hits, 'misses': cache.misses, 'evictions': cache.evictions}
+        return 200, report
+
+    def _predict_rows(self, listings):
+        areas, dispositions, regions = zip(*listings)
+        return self.batcher.submit(areas, dispositions, regions).result()
+
+    def predict(self, body):
+        price = self._predict_rows([_listing(body)])[0]
+        return 200, {'price': float(price)}
+
+    def predict_batch(self, body):
+        listings = body.get('listings')
+        if not isinstance(listings, list):
+            raise BadRequest("Expected {\"listings\": [...]}")
+        if len(listings) > self.max_batch_listings:
+            raise BadRequest(f"At most {self.max_batch_listings} listings per request")
+        if not listings:
+            return 200, {'prices': []}
+        prices = self._predict_rows([_listing(item) for item in listings])
+        return 200, {'prices': prices.tolist()}
+
+    def project(self, body):
+        years = body.get('years', self.default_years)
+        if not isinstance(years, int) or not 0 <= years <= 100:
+            raise BadRequest("'years' must be an integer between 0 and 100")
+        if 'start_price' in body:
+            try:
+                start_price = float(body['start_price'])
+                if not np.isfinite(start_price):
+                    raise ValueError(start_price)
+            except (TypeError, ValueError):
+                raise BadRequest("'start_price' must be a finite number")
+        else:
+            start_price = float(self._predict_rows([_listing(body)])[0])
+
+        rates = body.get('growth_rates', [body.get('growth_rate', self.default_growth_rate)])
+        if not isinstance(rates, list) or not rates:
+            raise BadRequest("'growth_rates' must be a non-empty list")
+        projection = self.predictor.project_future_values(start_price, rates, years=years)
+        scenarios = [{'growth_rate': rate,
+                      'values': self.predictor.projection_to_records(projection, scenario=i)}
+                     for i, rate in enumerate(rates)]
+        return 200, {'start_price': start_price, 'scenarios': scenarios}
+
+    ROUTES = {
+        ('GET', '/health'): health,
+        ('GET', '/stats'): stats_report,
+        ('POST', '/predict'): predict,
+        ('POST', '/predict/batch'): predict_batch,
+        ('POST', '/project'): project,
+    }
+    MODEL_ROUTES = {'/predict', '/predict/batch', '/project'}
+
+    def handle(self, method, path, body_bytes):
+        """Dispatch one request and return (status, JSON-serializable payload)."""
+        route = self.ROUTES.get((method, path))
+        if route is None:
+            known = any(p == path for _, p in self.ROUTES)
+            return (405, {'error': f"{method} not allowed"}) if known else (404, {'error': f"No endpoint {path}"})
+        if path in self.MODEL_ROUTES and not self.model_loaded:
+            return 503, {'error': "Model not loaded"}
+        try:
+            body = json.loads(body_bytes) if body_bytes else {}
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return 400, {'error': "Body is not valid JSON"}
+        if not isinstance(body, dict):
+            return 400, {'error': "Body must be a JSON object"}
+        try:
+            return route(self, body)
+        except ValueError as e:
+            # BadRequest, UnknownCategoryError and invalid projection shapes
+            return 400, {'error': str(e)}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, so clients can reuse one connection for many requests
+            protocol_version = "HTTP/1.1"
+
+            def _serve(self, method):
+                start = time.perf_counter()
+                path = urlsplit(self.path).path.rstrip('/') or '/'
+                try:
+                    length = int(self.headers.get('Content-Length') or 0)
+                except ValueError:
+                    length = -1
+                # Never read an invalid length: read(-1) would block until the client closes
+                if length < 0:
+                    status, payload = 400, {'error': "Invalid Content-Length"}
+                    self.close_connection = True
+                elif length > server.max_body_bytes:
+                    status, payload = 413, {'error': "Request body too large"}
+                    self.close_connection = True
+                else:
+                    try:
+                        status, payload = server.handle(method, path, self.rfile.read(length))
+                    except Exception as e:
+                        status, payload = 500, {'error': f"Internal error: {e}"}
+                body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                if (method, path) in server.ROUTES:
+                    server.stats.record(path, time.perf_counter() - start, ok=status < 400)
+
+            def do_GET(self):
+                self._serve('GET')
+
+            def do_POST(self):
+                self._serve('POST')
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        """Serve in a background thread and return the base URL."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def serve_forever(self):
+        """Serve in the calling thread until stop() is called or Ctrl+C."""
+        self._server.serve_forever()
+
+    def stop(self):
+        """Shut the server and the batcher down."""
+        self._server.shutdown()
+        self._server.server_close()
+        self.batcher.close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve apartment price predictions over HTTP/JSON.")
+    parser.add_argument('--host', help="Interface to bind (defaults to model.server.host).")
+    parser.add_argument('--port', type=int, help="Port to bind (defaults to model.server.port).")
+    args = parser.parse_args()
+
+    server = PredictionServer.from_config(ConfigLoader.get_config(), host=args.host, port=args.port)
+    if not server.model_loaded:
+        print("Warning: No model loaded, prediction endpoints answer 503. Train the model first.")
+    print(f"Serving predictions ({server.predictor.engine} engine) at {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,136 @@
+import numpy as np
+
+from src.model.inference import UnknownCategoryError
+
+
+class PriceGrid:
+    """
+    Precomputed model predictions over the whole (region x disposition x area) domain.
+
+    The model only has three inputs, so its prediction surface can be tabulated
+    once after training. Lookups are pure index arithmetic and do not need the
+    pickled forest. Areas outside the tabulated range are clamped to its edges,
+    which matches the forest itself: tree splits never extend beyond the area
+    range seen during training.
+
+    Attributes:
+        prices (np.ndarray): float32 array of shape (n_regions, n_dispositions, n_areas).
+        regions (list): Region names along axis 0.
+        dispositions (list): Disposition names along axis 1.
+        area_start (float): Area of the first grid column in m^2.
+        area_step (float): Distance between grid columns in m^2.
+    """
+    def __init__(self, prices, regions, dispositions, area_start, area_step):
+        """
+        Wrap a tabulated price array.
+
+        Args:
+            prices (np.ndarray): Prices of shape (n_regions, n_dispositions, n_areas).
+            regions (list): Region names along axis 0.
+            dispositions (list): Disposition names along axis 1.
+            area_start (float): Area of the first grid column.
+            area_step (float): Distance between grid columns.
+        """
+        self.prices = prices
+        self.regions = list(regions)
+        self.dispositions = list(dispositions)
+        self.area_start = float(area_start)
+        self.area_step = float(area_step)
+        self.region_index = {r: i for i, r in enumerate(self.regions)}
+        self.disposition_index = {d: i for i, d in enumerate(self.dispositions)}
+
+    @classmethod
+    def build(cls, predict_fn, regions, dispositions, min_area, max_area, area_step=1.0):
+        """
+        Evaluate a model over the full input grid.
+
+        Args:
+            predict_fn (callable): Takes (areas, dispositions, regions) arrays and returns prices.
+            regions (list): Regions to tabulate.
+            dispositions (list): Dispositions to tabulate.
+            min_area (float): Smallest tabulated area.
+            max_area (float): Largest tabulated area (always covered).
+            area_step (float): Distance between tabulated areas.
+
+        Returns:
+            PriceGrid: The tabulated grid.
+        """
+        n_areas = int(np.ceil((max_area - min_area) / area_step)) + 1
+        areas = min_area + area_step * np.arange(n_areas, dtype=np.float64)
+
+        region_col, disp_col, area_col = np.meshgrid(
+            np.asarray(regions, dtype=object), np.asarray(dispositions, dtype=object), areas, indexing='ij')
+        prices = np.asarray(predict_fn(area_col.ravel(), disp_col.ravel(), region_col.ravel()))
+        prices = prices.astype(np.float32).reshape(len(regions), len(dispositions), n_areas)
+        return cls(prices, regions, dispositions, min_area, area_step)
+
+    def save(self, path):
+        """Save the grid as an uncompressed .npz file."""
+        np.savez(path,
+                 prices=self.prices,
+                 regions=np.asarray(self.regions, dtype=str),
+                 dispositions=np.asarray(self.dispositions, dtype=str),
+                 area_start=self.area_start,
+                 area_step=self.area_step)
+
+    @classmethod
+    def load(cls, path):
+        """Load a grid saved by :meth:`save`."""
+        with np.load(path) as data:
+            return cls(data['prices'],
+                       data['regions'].tolist(),
+                       data['dispositions'].tolist(),
+                       data['area_start'],
+                       data['area_step'])
+
+    def _category_indices(self, index, kind, values, strict):
+        """Resolve category names to grid indices (-1 for unknown when not strict)."""
+        result = np.empty(len(values), dtype=np.int64)
+        for i, value in enumerate(values):
+            idx = index.get(value, -1)
+            if idx < 0 and strict:
+                raise UnknownCategoryError(f"Unknown {kind} '{value}' (not in price grid)")
+            result[i] = idx
+        return result
+
+    def lookup_batch(self, areas, dispositions, regions, interpolate=False, strict=True):
+        """
+        Look up prices for many apartments.
+
+        Args:
+            areas (array-like): Areas in m^2.
+            dispositions (array-like): Disposition per row.
+            regions (array-like): Region per row.
+            interpolate (bool): Linearly interpolate between neighbouring area steps
+                instead of snapping to the nearest one.
+            strict (bool): Raise UnknownCategoryError for unknown categories.
+                When False, such rows get NaN.
+
+        Returns:
+            np.ndarray: Prices as float64.
+        """
+        areas = np.asarray(areas, dtype=np.float64)
+        r_idx = self._category_indices(self.region_index, 'region', regions, strict)
+        d_idx = self._category_indices(self.disposition_index, 'disposition', dispositions, strict)
+
+        n_areas = self.prices.shape[2]
+        pos = np.clip((areas - self.area_start) / self.area_step, 0, n_areas - 1)
+
+        if interpolate and n_areas > 1:
+            lo = np.minimum(np.floor(pos).astype(np.int64), n_areas - 2)
+            frac = pos - lo
+            p_lo = self.prices[r_idx, d_idx, lo].astype(np.float64)
+            p_hi = self.prices[r_idx, d_idx, lo + 1].astype(np.float64)
+            result = p_lo + (p_hi - p_lo) * frac
+        else:
+            nearest = np.floor(pos + 0.5).astype(np.int64)
+            result = self.prices[r_idx, d_idx, nearest].astype(np.float64)
+
+        unknown = (r_idx < 0) | (d_idx < 0)
+        if unknown.any():
+            result[unknown] = np.nan
+        return result
+
+    def lookup(self, area, disposition, region, interpolate=False, strict=True):
+        """Look up the price of a single apartment (see :meth:`lookup_batch`)."""
+        return float(self.lookup_batch([area], [disposition], [region], interpolate, strict)[0])
@@ -0,0 +1,126 @@
+from collections import deque
+
+# Fallback keywords checked after all cities, in priority order (keyword -> region)
+REGION_KEYWORDS = (
+    ('Praha', 'Praha'),
+    ('Středočeský', 'Středočeský kraj'),
+    ('Jihočeský', 'Jihočeský kraj'),
+    ('Plzeňský', 'Plzeňský kraj'),
+    ('Karlovarský', 'Karlovarský kraj'),
+    ('Ústecký', 'Ústecký kraj'),
+    ('Liberecký', 'Liberecký kraj'),
+    ('Královéhradecký', 'Královéhradecký kraj'),
+    ('Pardubický', 'Pardubický kraj'),
+    ('Vysočina', 'Kraj Vysočina'),
+    ('Jihomoravský', 'Jihomoravský kraj'),
+    ('Olomoucký', 'Olomoucký kraj'),
+    ('Zlínský', 'Zlínský kraj'),
+    ('Moravskoslezský', 'Moravskoslezský kraj'),
+)
+
+_NO_MATCH = float('inf')
+
+
+class RegionResolver:
+    """
+    Maps raw location strings to regions with a single pass over each string.
+
+    All city names and fallback keywords are compiled into one Aho-Corasick
+    automaton. Every pattern has a priority (cities in mapping order, then the
+    keywords), and each automaton state stores the best priority of all patterns
+    ending there, so scanning a location yields the highest-priority pattern
+    occurring anywhere in it. This is exactly the result of testing the cities
+    one by one and then the keywords, but independent of the number of patterns.
+
+    Results are memoized per location string, as listing locations repeat heavily.
+
+    Attributes:
+        regions (list): Region of each pattern, indexed by priority.
+        default (str): Region returned when nothing matches.
+    """
+    def __init__(self, city_to_region, keywords=REGION_KEYWORDS, default='Other'):
+        """
+        Compile the matcher.
+
+        Args:
+            city_to_region (dict): City name -> region, in priority order.
+                Keys starting with '_comment' are ignored.
+            keywords (iterable): (keyword, region) pairs checked after the cities.
+            default (str): Region for locations without any match.
+        """
+        patterns = [(city, region) for city, region in city_to_region.items()
+                    if not city.startswith('_comment') and city]
+        patterns += [(keyword, region) for keyword, region in keywords if keyword]
+
+        self.regions = [region for _, region in patterns]
+        self.default = default
+        self._memo = {}
+        self._build(pattern for pattern, _ in patterns)
+
+    def _build(self, patterns):
+        """Build the trie, failure links and best priority per state."""
+        self._goto = [{}]
+        self._best = [_NO_MATCH]
+        for priority, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._best.append(_NO_MATCH)
+                state = next_state
+            # A repeated pattern keeps its first (highest) priority
+            self._best[state] = min(self._best[state], priority)
+
+        # Breadth-first, so the failure state is final before its children are processed
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                # Patterns that are suffixes of this one also end at this position
+                self._best[child] = min(self._best[child], self._best[self._fail[child]])
+                queue.append(child)
+
+    def _match(self, text):
+        """Return the best pattern priority occurring in text (inf if none)."""
+        goto, fail, best_at = self._goto, self._fail, self._best
+        state = 0
+        best = _NO_MATCH
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if best_at[state] < best:
+                best = best_at[state]
+                if best == 0:
+                    break
+        return best
+
+    def resolve(self, location):
+        """
+        Map one location string (city/district) to its region.
+
+        Args:
+            location (str): Raw location string; other values are converted with str().
+
+        Returns:
+            str: Region name or the default.
+        """
+        location = str(location)
+        region = self._memo.get(location)
+        if region is None:
+            priority = self._match(location)
+            region = self.default if priority == _NO_MATCH else self.regions[priority]
+            self._memo[location] = region
+        return region
+
+    def resolve_many(self, locations):
+        """Map an iterable of location strings; returns a list of regions."""
+        return [self.resolve(location) for location in locations]
@@ -0,0 +1,140 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Width of the histogram range in standard deviations of the cumulative log return.
+# Paths beyond it are counted in the edge bins (probability far below 1e-9).
+_RANGE_SIGMAS = 8.0
+
+
+class SimulationCancelled(Exception):
+    """Raised by simulate_price_bands when its ``should_stop`` callback returns True."""
+
+
+def _log_growth_params(drift, volatility):
+    """
+    Mean and std of the annual log growth so that E[growth factor] = 1 + drift.
+
+    Returns:
+        tuple: (mu, sigma) of the normal distribution of log(1 + annual growth).
+    """
+    sigma = float(volatility)
+    mu = np.log1p(drift) - 0.5 * sigma ** 2
+    return mu, sigma
+
+
+def _histogram_edges(years, mu, sigma, n_bins):
+    """
+    Per-year bin range of the cumulative log return, centred on its mean.
+
+    Returns:
+        tuple: (lower edges, bin widths), both arrays of length ``years``.
+    """
+    t = np.arange(1, years + 1)
+    spread = _RANGE_SIGMAS * sigma * np.sqrt(t)
+    return t * mu - spread, 2 * spread / n_bins
+
+
+def _simulate_chunk(seed_seq, n_paths, years, mu, sigma, lo, width, n_bins):
+    """
+    Simulate one chunk of paths and return their per-year histogram counts.
+
+    Args:
+        seed_seq (np.random.SeedSequence): Independent seed for this chunk.
+        n_paths (int): Number of paths in the chunk.
+        lo (np.ndarray): Lower histogram edge per year.
+        width (np.ndarray): Bin width per year.
+
+    Returns:
+        np.ndarray: int64 counts of shape (years, n_bins).
+    """
+    rng = np.random.default_rng(seed_seq)
+    log_paths = np.cumsum(rng.normal(mu, sigma, size=(n_paths, years)), axis=1)
+
+    bins = np.clip(((log_paths - lo) / width).astype(np.int64), 0, n_bins - 1)
+    bins += np.arange(years, dtype=np.int64) * n_bins
+    return np.bincount(bins.ravel(), minlength=years * n_bins).reshape(years, n_bins)
+
+
+def simulate_price_bands(start_price, years=10, drift=0.04, volatility=0.05, n_paths=100_000,
+                         percentiles=(5, 50, 95), chunk_size=50_000, n_workers=1, seed=None, n_bins=4096,
+                         should_stop=None):
+    """
+    Monte Carlo simulation of lognormal annual growth paths, reduced to percentile bands.
+
+    Paths are drawn in chunks and each chunk is immediately folded into a fixed
+    per-year histogram of cumulative log returns, so memory depends on
+    ``chunk_size`` and ``n_bins`` only, never on ``n_paths``. Every chunk gets its
+    own child of one ``SeedSequence``, so results are identical whether the chunks
+    run in-process or across a process pool.
+
+    Args:
+        start_price (float): Current price.
+        years (int): Number of years to simulate.
+        drift (float): Expected annual growth (e.g. 0.04 for 4%).
+        volatility (float): Standard deviation of the annual log growth.
+        n_paths (int): Number of simulated paths.
+        percentiles (tuple): Percentiles to report (0-100).
+        chunk_size (int): Paths simulated per chunk.
+        n_workers (int): Worker processes (1 runs everything in this process).
+        seed (int, optional): Seed for reproducible results.
+        n_bins (int): Histogram resolution per year.
+        should_stop (callable, optional): Checked after every chunk; when it
+            returns True the simulation is abandoned.
+
+    Returns:
+        np.ndarray: Prices of shape (len(percentiles), years + 1). Column 0 is the
+        start price.
+
+    Raises:
+        SimulationCancelled: If ``should_stop`` returned True.
+    """
+    if n_paths <= 0:
+        raise ValueError("n_paths must be positive")
+
+    mu, sigma = _log_growth_params(drift, volatility)
+    if sigma == 0:
+        # Every path follows the deterministic compound growth curve
+        curve = start_price * (1 + drift) ** np.arange(years + 1)
+        return np.tile(curve, (len(percentiles), 1))
+
+    lo, width = _histogram_edges(years, mu, sigma, n_bins)
+
+    chunk_sizes = [chunk_size] * (n_paths // chunk_size)
+    if n_paths % chunk_size:
+        chunk_sizes.append(n_paths % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    args = [(s, n, years, mu, sigma, lo, width, n_bins) for s, n in zip(seeds, chunk_sizes)]
+
+    counts = np.zeros((years, n_bins), dtype=np.int64)
+    if n_workers > 1 and len(args) > 1:
+        # 'spawn' keeps this safe when called from a GUI or any threaded process
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=context) as executor:
+            for chunk_counts in executor.map(_simulate_chunk, *zip(*args)):
+                counts += chunk_counts
+                if should_stop is not None and should_stop():
+                    # Drop the queued chunks instead of waiting for them on exit
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    raise SimulationCancelled()
+    else:
+        for chunk_args in args:
+            counts += _simulate_chunk(*chunk_args)
+            if should_stop is not None and should_stop():
+                raise SimulationCancelled()
+
+    # Interpolate each percentile inside its histogram bin
+    cumulative = np.cumsum(counts, axis=1)
+    bands = np.empty((len(percentiles), years + 1), dtype=np.float64)
+    bands[:, 0] = start_price
+    for i, q in enumerate(percentiles):
+        target = q / 100.0 * n_paths
+        for year in range(years):
+            cum = cumulative[year]
+            b = min(int(np.searchsorted(cum, target, side='left')), n_bins - 1)
+            before = cum[b - 1] if b > 0 else 0
+            inside = counts[year, b]
+            frac = (target - before) / inside if inside else 0.5
+            bands[i, year + 1] = start_price * np.exp(lo[year] + (b + frac) * width[year])
+    return bands
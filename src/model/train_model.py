@@ -1,9 +1,12 @@
 import pandas as pd
 import numpy as np
-import re
 import os
 import joblib
 import json
+import argparse
+import datetime
+import tempfile
+import time
 from sklearn.ensemble import RandomForestRegressor
 import sys
 
@@ -13,6 +16,14 @@ project_root = os.path.dirname(os.path.dirname(current_dir))
 sys.path.append(project_root)
 
 from src.utils.config_loader import ConfigLoader
+from src.model.inference import FeatureEncoder
+from src.model.price_grid import PriceGrid
+from src.model.flat_forest import FlatForest
+from src.model.artifact import write_bundle
+from src.model.dataset_cache import (load_processed_dataset, hash_file, ends_with_newline, read_csv_tail,
+                                     complete_size, open_prefix)
+from src.model.listing_store import ListingStore
+from src.model.features import build_features
 config = ConfigLoader.get_config()
 
 # Increase recursion depth if needed
@@ -20,149 +31,510 @@ sys.setrecursionlimit(2000)
 
 # --- CONFIG ---
 RAW_DATA_PATH = os.path.join(project_root, config['paths']['output_folder'], config['paths']['output_filename'])
+PROCESSED_DATA_PATH = os.path.join(project_root, config['paths']['processed_folder'], config['paths']['processed_filename'])
 MODEL_PATH = os.path.join(project_root, config['paths']['model_folder'], config['paths']['model_filename'])
 COLUMNS_PATH = os.path.join(project_root, config['paths']['model_folder'], config['paths']['columns_filename'])
 METADATA_PATH = os.path.join(project_root, config['paths']['model_folder'], config['paths']['metadata_filename'])
+GRID_PATH = os.path.join(project_root, config['paths']['model_folder'], config['paths']['grid_filename'])
+BUNDLE_PATH = os.path.join(project_root, config['paths']['model_folder'], config['paths']['bundle_filename'])
+TUNING_REPORT_PATH = os.path.join(project_root, config['paths']['model_folder'], config['paths']['tuning_report_filename'])
+STORE_PATH = os.path.join(project_root, config['paths']['output_folder'], config['paths']['store_filename'])
 
-def parse_area(title):
+def clean_features(df, min_price):
+    """Drop rows without area or price and rows below the realistic price floor."""
+    df = df.dropna(subset=['area', 'price'])
+    return df[df['price'] > min_price] # Realistic floor for apartments
+
+def _read_raw_chunks(raw_path, raw_size, chunk_size):
+    """Yield the rows in the first ``raw_size`` bytes of the raw CSV in chunks."""
+    with open_prefix(raw_path, raw_size) as f:
+        yield from pd.read_csv(f, chunksize=chunk_size)
+
+def build_design_matrix_streaming(raw_path, chunk_size, min_price, raw_size=None):
     """
-    Extract area in square meters from the title string.
+    Encode the raw CSV into a compact feature matrix without loading it whole.
+
+    The CSV is read twice in chunks. The first pass counts the usable rows and
+    fixes the disposition/region vocabulary and area range; the second pass
+    cleans each chunk again and one-hot encodes it straight into a preallocated
+    float32 matrix. Peak memory is the matrix plus one chunk. Columns come out
+    in the same order as ``pd.get_dummies`` produces in the in-memory path.
 
     Args:
-        title (str): Title containing area (e.g. "Prodej bytu 3+kk 75 m²").
+        raw_path (str): Raw scraped CSV.
+        chunk_size (int): Rows per chunk.
+        min_price (int): Price floor passed to clean_features.
+        raw_size (int, optional): Only read the first ``raw_size`` bytes of the
+            CSV (defaults to its current size), so both passes see the same rows
+            even if the scraper appends in between.
 
     Returns:
-        int or None: Extracted area or None if not found.
+        tuple: (X float32 array, y float64 array, columns, metadata dict).
     """
-    # Matches "54 m²" or "54m2"
-    match = re.search(r'(\d+)\s*m[²2]', str(title))
-    if match:
-        return int(match.group(1))
-    return None
+    if raw_size is None:
+        raw_size = os.path.getsize(raw_path)
+
+    # 1st pass: vocabulary, row count and area range
+    n_rows = 0
+    dispositions, regions = set(), set()
+    min_area, max_area = np.inf, -np.inf
+    for raw in _read_raw_chunks(raw_path, raw_size, chunk_size):
+        chunk = clean_features(build_features(raw), min_price)
+        n_rows += len(chunk)
+        dispositions.update(chunk['disposition'].astype(object).unique())
+        regions.update(chunk['region'].astype(object).unique())
+        if len(chunk):
+            min_area = min(min_area, chunk['area'].min())
+            max_area = max(max_area, chunk['area'].max())
+
+    if n_rows == 0:
+        raise ValueError(f"No usable rows in {raw_path}")
 
-def parse_disposition(title):
+    dispositions, regions = sorted(dispositions), sorted(regions)
+    columns = ['area'] + [f'disposition_{d}' for d in dispositions] + [f'region_{r}' for r in regions]
+    metadata = {
+        'dispositions': dispositions,
+        'regions': regions,
+        'min_area': int(min_area),
+        'max_area': int(max_area)
+    }
+
+    # 2nd pass: encode into the preallocated matrix
+    X = np.zeros((n_rows, len(columns)), dtype=np.float32)
+    y = np.empty(n_rows, dtype=np.float64)
+    encoder = FeatureEncoder(columns)
+    start = 0
+    for raw in _read_raw_chunks(raw_path, raw_size, chunk_size):
+        chunk = clean_features(build_features(raw), min_price)
+        stop = start + len(chunk)
+        encoder.encode_into(X[start:stop], chunk['area'].to_numpy(),
+                            chunk['disposition'].to_numpy(dtype=object), chunk['region'].to_numpy(dtype=object))
+        y[start:stop] = chunk['price'].to_numpy()
+        start = stop
+
+    return X, y, columns, metadata
+
+def tune_hyperparameters(X, y, tuning_config, random_state=None):
     """
-    Extract apartment disposition (e.g. 2+kk) from the title.
+    Search RandomForest hyperparameters with k-fold cross-validation.
+
+    Candidates are evaluated in parallel worker processes. The training matrix is
+    dumped once to a temporary file and memory-mapped read-only, so workers share
+    its pages instead of receiving a pickled copy per task. With the 'halving'
+    search, every candidate starts on a small sample of the rows and only the
+    best third (``factor``) advance to the next, larger round, so weak candidates
+    are stopped early.
 
     Args:
-        title (str): Title string.
+        X (pd.DataFrame | np.ndarray): Encoded training matrix.
+        y (pd.Series | np.ndarray): Prices.
+        tuning_config (dict): The ``model.tuning`` config section.
+        random_state (int, optional): Seed for the forests and the CV splits.
 
     Returns:
-        str: Disposition string or 'Other'.
+        tuple: (best parameters dict, report dict with scores and timings).
     """
-    # Matches "2+kk", "1+1", "3+1" etc.
-    match = re.search(r'(\d\+[\w]{1,2})', str(title))
-    if match:
-        return match.group(1)
-    return 'Other'
+    from sklearn.model_selection import GridSearchCV, KFold
 
-def clean_region(location):
+    param_grid = {k: v for k, v in tuning_config['param_grid'].items() if not k.startswith('_comment')}
+    search_type = tuning_config.get('search', 'halving')
+    cv = KFold(n_splits=tuning_config.get('cv_folds', 5), shuffle=True, random_state=random_state)
+    n_jobs = tuning_config.get('n_jobs', -1)
+    scoring = tuning_config.get('scoring', 'neg_mean_absolute_error')
+    # Parallelism comes from the search; each forest is fitted single-threaded
+    estimator = RandomForestRegressor(random_state=random_state, n_jobs=1)
+
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        X_path = os.path.join(tmp, 'X.joblib')
+        joblib.dump(np.ascontiguousarray(X, dtype=np.float32), X_path)
+        X_shared = joblib.load(X_path, mmap_mode='r')
+        y_shared = np.asarray(y, dtype=np.float64)
+
+        if search_type == 'halving':
+            from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+            from sklearn.model_selection import HalvingGridSearchCV
+            search = HalvingGridSearchCV(estimator, param_grid, cv=cv, scoring=scoring, n_jobs=n_jobs,
+                                         factor=tuning_config.get('factor', 3), refit=False,
+                                         random_state=random_state)
+        elif search_type == 'grid':
+            search = GridSearchCV(estimator, param_grid, cv=cv, scoring=scoring, n_jobs=n_jobs, refit=False)
+        else:
+            raise ValueError(f"Unknown tuning search '{search_type}' (expected 'halving' or 'grid')")
+
+        search.fit(X_shared, y_shared)
+        del X_shared
+    elapsed = time.perf_counter() - start
+
+    results = search.cv_results_
+    candidates = []
+    for i in np.argsort(results['rank_test_score'], kind='stable'):
+        candidate = {
+            'params': results['params'][i],
+            'mean_score': float(results['mean_test_score'][i]),
+            'std_score': float(results['std_test_score'][i]),
+            'mean_fit_seconds': float(results['mean_fit_time'][i]),
+            'rank': int(results['rank_test_score'][i]),
+        }
+        if 'iter' in results:
+            candidate['round'] = int(results['iter'][i])
+            candidate['n_samples'] = int(results['n_resources'][i])
+        candidates.append(candidate)
+
+    report = {
+        'search': search_type,
+        'scoring': scoring,
+        'cv_folds': cv.get_n_splits(),
+        'n_jobs': n_jobs,
+        'n_rows': int(len(y_shared)),
+        'n_features': int(np.shape(X)[1]),
+        'n_candidates': len(candidates),
+        'best_params': search.best_params_,
+        'best_score': float(search.best_score_),
+        'total_seconds': round(elapsed, 3),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'candidates': candidates,
+    }
+    return search.best_params_, report
+
+def save_model_bundle(model, columns, metadata, path=None):
     """
-    Map a specific location string (city/district) to a general Region (Kraj).
+    Export the forest into flat arrays and write them, together with the columns,
+    metadata and training config, into a single memory-mappable model bundle.
 
     Args:
-        location (str): Raw location string.
+        model (RandomForestRegressor): Trained model.
+        columns (list): Feature columns the model was trained on.
+        metadata (dict): Metadata generated for the UI.
+        path (str, optional): Destination (defaults to the configured bundle path).
+    """
+    forest = FlatForest.from_sklearn(model, columns)
+    training_config = {k: v for k, v in config['model']['training'].items() if not k.startswith('_comment')}
+    write_bundle(path or BUNDLE_PATH, forest.to_arrays(), {
+        'columns': columns,
+        'metadata': metadata,
+        'training_config': training_config,
+        'max_depth': forest.max_depth,
+        'n_trees': forest.n_trees,
+    })
+
+def build_price_grid(model, columns, metadata):
+    """
+    Tabulate the trained model over every (region, disposition, area step) combination.
+
+    Args:
+        model (RandomForestRegressor): Trained model.
+        columns (list): Feature columns the model was trained on.
+        metadata (dict): Metadata with regions, dispositions and the area range.
 
     Returns:
-        str: Normalized region name or 'Other'/'Zahraničí'.
-    """
-    location = str(location)
-    
-    city_to_region = config['model']['city_to_region']
-
-    # Check for cities in the location string
-    for city, region in city_to_region.items():
-        if city in location:
-            return region
-
-    # Fallback checks for keywords
-    if 'Praha' in location: return 'Praha'
-    if 'Středočeský' in location: return 'Středočeský kraj'
-    if 'Jihočeský' in location: return 'Jihočeský kraj'
-    if 'Plzeňský' in location: return 'Plzeňský kraj'
-    if 'Karlovarský' in location: return 'Karlovarský kraj'
-    if 'Ústecký' in location: return 'Ústecký kraj'
-    if 'Liberecký' in location: return 'Liberecký kraj'
-    if 'Královéhradecký' in location: return 'Královéhradecký kraj'
-    if 'Pardubický' in location: return 'Pardubický kraj'
-    if 'Vysočina' in location: return 'Kraj Vysočina'
-    if 'Jihomoravský' in location: return 'Jihomoravský kraj'
-    if 'Olomoucký' in location: return 'Olomoucký kraj'
-    if 'Zlínský' in location: return 'Zlínský kraj'
-    if 'Moravskoslezský' in location: return 'Moravskoslezský kraj'
-
-    return 'Other'
-
-def train():
+        PriceGrid: Precomputed predictions usable without the pickled forest.
+    """
+    encoder = FeatureEncoder(columns)
+
+    def predict(areas, dispositions, regions):
+        X = np.zeros((len(areas), encoder.n_features), dtype=np.float32)
+        encoder.encode_into(X, areas, dispositions, regions)
+        return model.predict(pd.DataFrame(X, columns=columns))
+
+    area_step = config['model']['training'].get('grid_area_step', 1)
+    return PriceGrid.build(predict, metadata['regions'], metadata['dispositions'],
+                           metadata['min_area'], metadata['max_area'], area_step)
+
+def make_watermark(raw_size, raw_sha256, trained_rows):
+    """
+    Describe the raw data a model was trained on.
+
+    Args:
+        raw_size (int): Bytes of the raw CSV covered by the model.
+        raw_sha256 (str): SHA-256 of those bytes.
+        trained_rows (int): Cleaned rows the model has been trained on.
+
+    Returns:
+        dict: Watermark stored in the metadata.
+    """
+    return {
+        'raw_size': raw_size,
+        'raw_sha256': raw_sha256,
+        'trained_rows': int(trained_rows),
+        'updated': datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+
+def save_metadata(metadata):
+    """
+    Atomically write the UI metadata (and training watermark) to METADATA_PATH.
+
+    Call it after save_artifacts, so the watermark never covers rows that the
+    saved model has not been trained on.
+    """
+    tmp_path = f"{METADATA_PATH}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, METADATA_PATH)
+    print(f"Metadata saved to {METADATA_PATH}")
+
+def save_artifacts(model, columns, metadata):
+    """Save the model, its columns, the model bundle and the price grid."""
+    # 6. Save Artifacts
+    joblib.dump(model, MODEL_PATH)
+    joblib.dump(columns, COLUMNS_PATH)
+    print(f"Model saved to {MODEL_PATH}")
+    print(f"Columns saved to {COLUMNS_PATH}")
+
+    # 7. Write Model Bundle
+    save_model_bundle(model, columns, metadata)
+    print(f"Model bundle saved to {BUNDLE_PATH}")
+
+    # 8. Precompute Price Grid
+    print("Building price grid...")
+    grid = build_price_grid(model, columns, metadata)
+    grid.save(GRID_PATH)
+    print(f"Price grid {grid.prices.shape} saved to {GRID_PATH}")
+
+def train(source=None, store_filter=None):
     """
     Main training pipeline:
-    1. Loads raw CSV data.
-    2. Extracts features (area, disposition, region).
-    3. Cleans data (removes outliers, parses prices).
-    4. Generates metadata for UI.
-    5. Trains RandomForestRegressor.
+    1. Loads processed features (area, disposition, region, price) from the
+       columnar cache, parsing only raw CSV rows that are not cached yet.
+    2. Cleans data (removes missing values and outliers).
+    3. Generates metadata for UI.
+    4. One-hot encodes the features.
+    5. Optionally tunes hyperparameters (``model.tuning``), then trains
+       RandomForestRegressor.
     6. Saves model and artifacts.
+    7. Writes the flat-array model bundle for sklearn-free inference.
+    8. Tabulates the model into a dense price grid.
+    9. Writes the metadata with the training watermark, only after everything
+       above succeeded.
+
+    With ``model.training.streaming`` enabled, steps 1-4 are replaced by
+    build_design_matrix_streaming, which never holds the raw data in memory.
+
+    Args:
+        source (str, optional): 'csv' or 'store' (defaults to
+            ``model.training.source``). 'store' loads step 1 from the SQLite
+            listing store instead, restricted to ``store_filter``.
+        store_filter (dict, optional): 'regions', 'dispositions' and/or 'days'
+            for ListingStore.load_features (defaults to
+            ``model.training.store_filter``).
     """
+    training_config = config['model']['training']
+    min_price = training_config['min_price']
+    source = source or training_config.get('source', 'csv')
+
     print("Loading apartment data...")
-    if not os.path.exists(RAW_DATA_PATH):
-        print(f"Error: {RAW_DATA_PATH} not found. Run scraper first.")
-        return
+    if source == 'store':
+        if not os.path.exists(STORE_PATH):
+            print(f"Error: {STORE_PATH} not found. Run scraper first or import the CSV (listing_store.py).")
+            return
+        if store_filter is None:
+            store_filter = training_config.get('store_filter', {})
+        store_filter = {key: store_filter.get(key) for key in ('regions', 'dispositions', 'days')}
+        raw_size = raw_hash = None
+    else:
+        if not os.path.exists(RAW_DATA_PATH):
+            print(f"Error: {RAW_DATA_PATH} not found. Run scraper first.")
+            return
+        # Watermark of the raw data this model is trained on, for later incremental refreshes.
+        # All reads below stop at raw_size, so rows appended meanwhile are left to refresh().
+        raw_size = complete_size(RAW_DATA_PATH, os.path.getsize(RAW_DATA_PATH))
+        _, raw_hash = hash_file(RAW_DATA_PATH, raw_size)
 
-    df = pd.read_csv(RAW_DATA_PATH)
-    print(f"Loaded {len(df)} rows.")
+    if source != 'store' and training_config.get('streaming', False):
+        # 1.-4. Out-of-core: chunked passes over the raw CSV
+        chunk_size = training_config.get('chunk_size', 100000)
+        print(f"Streaming {RAW_DATA_PATH} in chunks of {chunk_size} rows...")
+        X, y, columns, metadata = build_design_matrix_streaming(RAW_DATA_PATH, chunk_size, min_price, raw_size)
+        # A DataFrame view (no copy), so the model records the feature names as usual
+        X = pd.DataFrame(X, columns=columns, copy=False)
+        print(f"Encoded {len(y)} rows into a {X.shape[0]}x{X.shape[1]} float32 matrix.")
+    else:
+        if source == 'store':
+            # 1. Features of the selected slice, already parsed in the store
+            with ListingStore(STORE_PATH) as store:
+                df = store.load_features(**store_filter)
+            print(f"Loaded {len(df)} rows from {STORE_PATH} (filter: {store_filter}).")
+            if df.empty:
+                print("Error: No listings match the filter.")
+                return
+        else:
+            # 1. Feature Extraction (cached)
+            df, status = load_processed_dataset(RAW_DATA_PATH, PROCESSED_DATA_PATH, build_features,
+                                                raw_size=raw_size)
+            print(f"Loaded {len(df)} rows (features {status}: {PROCESSED_DATA_PATH}).")
 
-    # 1. Feature Extraction
-    print("Extracting features...")
-    df['area'] = df['title'].apply(parse_area)
-    df['disposition'] = df['title'].apply(parse_disposition)
-    df['region'] = df['location'].apply(clean_region)
+        # 2. Cleaning
+        print("Cleaning data...")
 
-    # 2. Cleaning
-    print("Cleaning data...")
-    df['price'] = df['raw_price'].astype(str).str.replace(r'[^\d]', '', regex=True)
-    df['price'] = pd.to_numeric(df['price'], errors='coerce')
+        print("\n--- Missing Values Check ---")
+        print(df[['area', 'disposition', 'price', 'region']].isnull().sum())
 
-    print("\n--- Missing Values Check ---")
-    print(df[['area', 'disposition', 'price', 'region']].isnull().sum())
-    
-    df = df.dropna(subset=['area', 'price'])
-    min_price = config['model']['training']['min_price']
-    df = df[df['price'] > min_price] # Realistic floor for apartments
+        df = clean_features(df, min_price)
+        # Drop categories that only occurred in removed rows, so they get no dummy column
+        for col in ['disposition', 'region']:
+            df[col] = df[col].cat.remove_unused_categories()
 
-    # 3. Generate Metadata (Valid Options for UI)
-    print("Generating metadata...")
-    metadata = {
-        'dispositions': sorted(df['disposition'].unique().tolist()),
-        'regions': sorted(df['region'].unique().tolist()),
-        'min_area': int(df['area'].min()),
-        'max_area': int(df['area'].max())
-    }
+        # 3. Generate Metadata (Valid Options for UI)
+        print("Generating metadata...")
+        metadata = {
+            'dispositions': sorted(df['disposition'].unique().tolist()),
+            'regions': sorted(df['region'].unique().tolist()),
+            'min_area': int(df['area'].min()),
+            'max_area': int(df['area'].max())
+        }
 
-    with open(METADATA_PATH, 'w', encoding='utf-8') as f:
-        json.dump(metadata, f, indent=2, ensure_ascii=False)
-    print(f"Metadata saved to {METADATA_PATH}")
+        # 4. Prepare for Training
+        features = ['area', 'disposition', 'region']
+        X = df[features]
+        y = df['price']
+
+        # One-Hot Encoding
+        X = pd.get_dummies(X, columns=['disposition', 'region'], drop_first=False)
 
-    # 4. Prepare for Training
-    features = ['area', 'disposition', 'region']
-    X = df[features]
-    y = df['price']
+    # A model trained on a store slice has no CSV watermark; --refresh then retrains fully
+    if raw_hash is not None:
+        metadata['watermark'] = make_watermark(raw_size, raw_hash, len(y))
 
-    # One-Hot Encoding
-    X = pd.get_dummies(X, columns=['disposition', 'region'], drop_first=False)
-    
     # 5. Train Model
+    n_est = training_config['rf_n_estimators']
+    r_state = training_config['rf_random_state']
+    rf_params = {'n_estimators': n_est, 'random_state': r_state}
+
+    tuning_config = config['model'].get('tuning', {})
+    if tuning_config.get('enabled', False):
+        print("\nTuning hyperparameters...")
+        best_params, report = tune_hyperparameters(X, y, tuning_config, random_state=r_state)
+        rf_params.update(best_params)
+        with open(TUNING_REPORT_PATH, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Best parameters {best_params} ({report['scoring']} {report['best_score']:.0f}, "
+              f"{report['n_candidates']} candidates in {report['total_seconds']:.1f} s)")
+        print(f"Tuning report saved to {TUNING_REPORT_PATH}")
+
     print("\nTraining Random Forest Regressor...")
-    n_est = config['model']['training']['rf_n_estimators']
-    r_state = config['model']['training']['rf_random_state']
-    model = RandomForestRegressor(n_estimators=n_est, random_state=r_state)
+    model = RandomForestRegressor(n_jobs=training_config.get('rf_n_jobs', -1), **rf_params)
     model.fit(X, y)
+    # Single predictions are faster without a thread pool, so the saved model predicts serially
+    model.set_params(n_jobs=None)
     print("Model training complete.")
 
-    # 6. Save Artifacts
-    joblib.dump(model, MODEL_PATH)
-    joblib.dump(list(X.columns), COLUMNS_PATH)
-    print(f"Model saved to {MODEL_PATH}")
-    print(f"Columns saved to {COLUMNS_PATH}")
+    # 6.-8. Save model, bundle and price grid, then the metadata and watermark
+    save_artifacts(model, list(X.columns), metadata)
+    save_metadata(metadata)
+
+def refresh():
+    """
+    Incremental pipeline: update the saved model with rows appended to the raw
+    CSV since the watermark stored in the metadata.
+
+    Only the CSV tail after the watermark is parsed. If the new rows look like
+    the training data, ``warm_start`` grows extra trees on them (proportional to
+    their share of all training rows) instead of refitting the whole forest.
+    A full train() runs instead when:
+
+    - there is no model or watermark yet, or the CSV before the watermark changed;
+    - the new rows contain a disposition or region the model has no column for;
+    - they exceed ``model.refresh.max_new_fraction`` of the trained rows;
+    - the current model's median relative error on them exceeds
+      ``model.refresh.max_error`` (drift).
+    """
+    print("Refreshing model with new apartment data...")
+    if not os.path.exists(RAW_DATA_PATH):
+        print(f"Error: {RAW_DATA_PATH} not found. Run scraper first.")
+        return
+
+    refresh_config = config['model'].get('refresh', {})
+    training_config = config['model']['training']
+
+    try:
+        model = joblib.load(MODEL_PATH)
+        columns = joblib.load(COLUMNS_PATH)
+        with open(METADATA_PATH, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"No usable trained model ({e}), running full training.")
+        return train()
+
+    watermark = metadata.get('watermark')
+    if not watermark:
+        print("Model has no training watermark, running full training.")
+        return train()
+
+    start = watermark['raw_size']
+    raw_size = complete_size(RAW_DATA_PATH, os.path.getsize(RAW_DATA_PATH))
+    if raw_size < start or not ends_with_newline(RAW_DATA_PATH, start):
+        print("Raw data was rewritten since the last training, running full training.")
+        return train()
+    prefix_hash, raw_hash = hash_file(RAW_DATA_PATH, raw_size, prefix_size=start)
+    if prefix_hash != watermark['raw_sha256']:
+        print("Raw data was rewritten since the last training, running full training.")
+        return train()
+    if raw_size == start:
+        print("Model is up to date.")
+        return
+
+    raw_columns = pd.read_csv(RAW_DATA_PATH, nrows=0).columns.tolist()
+    new = clean_features(build_features(read_csv_tail(RAW_DATA_PATH, start, raw_size, raw_columns)),
+                         training_config['min_price'])
+    trained_rows = watermark['trained_rows']
+    print(f"Found {len(new)} usable new rows after the watermark ({trained_rows} trained).")
+
+    if len(new) < refresh_config.get('min_new_rows', 20):
+        print("Too few new rows to grow trees on, keeping the current model.")
+        return
+
+    unknown = (set(new['disposition'].astype(object)) - set(metadata['dispositions'])) | \
+              (set(new['region'].astype(object)) - set(metadata['regions']))
+    if unknown:
+        print(f"New categories {sorted(unknown)} need new model columns, running full training.")
+        return train()
+
+    fraction = len(new) / trained_rows
+    if fraction > refresh_config.get('max_new_fraction', 0.25):
+        print(f"New rows are {fraction:.0%} of the trained data, running full training.")
+        return train()
+
+    encoder = FeatureEncoder(columns)
+    X_new = np.zeros((len(new), encoder.n_features), dtype=np.float32)
+    encoder.encode_into(X_new, new['area'].to_numpy(), new['disposition'].to_numpy(dtype=object),
+                        new['region'].to_numpy(dtype=object))
+    X_new = pd.DataFrame(X_new, columns=columns, copy=False)
+    y_new = new['price'].to_numpy()
+
+    error = float(np.median(np.abs(model.predict(X_new) - y_new) / y_new))
+    print(f"Median relative error of the current model on new rows: {error:.1%}")
+    if error > refresh_config.get('max_error', 0.35):
+        print("Prices drifted past model.refresh.max_error, running full training.")
+        return train()
+
+    # 5. Grow extra trees on the new rows only
+    n_new_trees = max(1, round(model.n_estimators * fraction))
+    print(f"Growing {n_new_trees} trees on the new rows...")
+    model.set_params(warm_start=True, n_estimators=model.n_estimators + n_new_trees,
+                     n_jobs=training_config.get('rf_n_jobs', -1))
+    model.fit(X_new, y_new)
+    model.set_params(warm_start=False, n_jobs=None)
+
+    metadata['min_area'] = min(metadata['min_area'], int(new['area'].min()))
+    metadata['max_area'] = max(metadata['max_area'], int(new['area'].max()))
+    metadata['watermark'] = make_watermark(raw_size, raw_hash, trained_rows + len(new))
+    save_artifacts(model, columns, metadata)
+    save_metadata(metadata)
 
 if __name__ == "__main__":
-    train()
+    parser = argparse.ArgumentParser(description="Train the apartment price model.")
+    parser.add_argument('--refresh', action='store_true',
+                        help="Only add rows scraped since the last training (full training if needed).")
+    parser.add_argument('--source', choices=['csv', 'store'],
+                        help="Train on the raw CSV or the SQLite listing store (defaults to model.training.source).")
+    parser.add_argument('--region', action='append', help="Store only: train on this region (repeatable).")
+    parser.add_argument('--disposition', action='append', help="Store only: train on this disposition (repeatable).")
+    parser.add_argument('--days', type=int, help="Store only: train on listings seen in the last N days.")
+    args = parser.parse_args()
+    if args.refresh:
+        refresh()
+    else:
+        store_filter = None
+        if args.region or args.disposition or args.days is not None:
+            store_filter = {'regions': args.region, 'dispositions': args.disposition, 'days': args.days}
+        train(source='store' if store_filter else args.source, store_filter=store_filter)
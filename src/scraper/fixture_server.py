@@ -0,0 +1,132 @@
+import argparse
+import glob
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Detail links of saved pages, rewritten per page so every page lists distinct ads
+_DETAIL_LINK = re.compile(r'(href="(?:https?://[^/"]+)?/detail/[^"]*?)/?"')
+
+
+class FixtureServer:
+    """
+    Local stand-in for the listing site, serving saved HTML pages.
+
+    ``GET <any path>?page=N`` returns the N-th saved page of ``folder`` (``*.html``
+    in name order, cycling when there are fewer files than pages). Used to test
+    and benchmark the scrapers offline.
+
+    Attributes:
+        base_url (str): URL of the listing (set once started).
+        request_count (int): Requests served so far.
+    """
+    def __init__(self, folder, host='127.0.0.1', port=0, latency=0.0, unique_per_page=True,
+                 empty_pages=(), failing_pages=()):
+        """
+        Configure the server (call start() to run it).
+
+        Args:
+            folder (str): Folder with saved listing pages.
+            host (str): Interface to bind.
+            port (int): Port to bind (0 picks a free one).
+            latency (float): Seconds to wait before answering, like a real server.
+            unique_per_page (bool): Suffix detail links with the page number, so
+                cycling pages do not repeat ads.
+            empty_pages (iterable): Pages answered with a page without any ads
+                (e.g. a script-rendered or bot-check page).
+            failing_pages (iterable): Pages answered with HTTP 503.
+        """
+        self.pages = []
+        for path in sorted(glob.glob(os.path.join(folder, '*.html'))):
+            with open(path, encoding='utf-8') as f:
+                self.pages.append(f.read())
+        if not self.pages:
+            raise FileNotFoundError(f"No saved pages (*.html) in {folder}")
+        self.latency = latency
+        self.unique_per_page = unique_per_page
+        self.empty_pages = set(empty_pages)
+        self.failing_pages = set(failing_pages)
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+        host, port = self._server.server_address[:2]
+        self.base_url = f"http://{host}:{port}/s/prodej/byty/"
+
+    def render(self, page):
+        """Return (status, html) for a page number."""
+        if page in self.failing_pages:
+            return 503, "<html><body>Service Unavailable</body></html>"
+        if page in self.empty_pages:
+            return 200, "<html><body><div id='app'></div><script src='/app.js'></script></body></html>"
+        html = self.pages[(page - 1) % len(self.pages)]
+        if self.unique_per_page:
+            html = _DETAIL_LINK.sub(lambda m: f'{m.group(1)}-p{page}/"', html)
+        return 200, html
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server._lock:
+                    server.request_count += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                try:
+                    page = int(parse_qs(urlsplit(self.path).query).get('page', ['1'])[0])
+                except ValueError:
+                    page = 1
+                status, html = server.render(page)
+                body = html.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        """Serve in a background thread and return the listing URL."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def serve_forever(self):
+        """Serve in the calling thread until stop() is called or Ctrl+C."""
+        self._server.serve_forever()
+
+    def stop(self):
+        """Shut the server down."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve saved listing pages locally.")
+    parser.add_argument('--folder', default=os.path.join('tests', 'fixtures'), help="Folder with saved *.html pages.")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.2, help="Seconds per response.")
+    args = parser.parse_args()
+
+    server = FixtureServer(args.folder, port=args.port, latency=args.latency)
+    print(f"Serving {len(server.pages)} saved page(s) at {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
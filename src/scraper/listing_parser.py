@@ -0,0 +1,137 @@
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+# Elements without an end tag; they never open a nesting level
+VOID_ELEMENTS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+                 'param', 'source', 'track', 'wbr'}
+
+ITEM_CLASS = "c-products__item"
+# Field name -> CSS class holding its text (same selectors as the Selenium scraper)
+TEXT_FIELDS = {
+    'title': "c-products__title",
+    'raw_price': "c-products__price",
+    'location': "c-products__info",
+}
+LINK_CLASS = "c-products__link"
+
+
+# Marks a <br> among the collected text chunks (source newlines are plain whitespace)
+_LINE_BREAK = None
+
+
+def _visible_text(chunks):
+    """Collapse whitespace like a browser does, keeping <br> line breaks (as Selenium's .text)."""
+    lines, current = [], []
+    for chunk in chunks + [_LINE_BREAK]:
+        if chunk is _LINE_BREAK:
+            line = ' '.join(''.join(current).split())
+            if line:
+                lines.append(line)
+            current = []
+        else:
+            current.append(chunk)
+    return '\n'.join(lines)
+
+
+class ListingPageParser(HTMLParser):
+    """
+    Streaming parser collecting the ``c-products__*`` ad cards of a listing page.
+
+    It reacts only to the few classes it needs and never builds a document tree,
+    so one page is parsed in a few milliseconds.
+
+    Attributes:
+        items (list): One dict per ad card with the raw field texts and href.
+    """
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.items = []
+        self._stack = []
+        self._item = None
+        self._item_depth = None
+        self._field = None
+        self._field_depth = None
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_ELEMENTS:
+            if tag == 'br' and self._field is not None:
+                self._text.append(_LINE_BREAK)
+            return
+        self._stack.append(tag)
+        depth = len(self._stack)
+        attrs = dict(attrs)
+        classes = (attrs.get('class') or '').split()
+
+        if ITEM_CLASS in classes and self._item is None:
+            self._item = {}
+            self._item_depth = depth
+        if self._item is None:
+            return
+
+        if LINK_CLASS in classes and 'href' not in self._item and attrs.get('href'):
+            self._item['href'] = attrs['href']
+        if self._field is None:
+            for field, css_class in TEXT_FIELDS.items():
+                if css_class in classes and field not in self._item:
+                    self._field = field
+                    self._field_depth = depth
+                    self._text = []
+                    break
+
+    def handle_startendtag(self, tag, attrs):
+        # <br/> and similar: behave like a start tag that is closed immediately
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag not in self._stack:
+            return
+        # Pop up to the matching tag, implicitly closing unclosed children
+        while self._stack:
+            depth = len(self._stack)
+            if self._field is not None and depth == self._field_depth:
+                self._item[self._field] = _visible_text(self._text)
+                self._field = None
+            if self._item is not None and depth == self._item_depth:
+                self.items.append(self._item)
+                self._item = None
+            if self._stack.pop() == tag:
+                break
+
+    def handle_data(self, data):
+        if self._field is not None:
+            self._text.append(data)
+
+
+def parse_listing_page(html, base_url=None):
+    """
+    Extract all apartment ads from a listing page.
+
+    Produces the same records as ``reality_scraper.extract_apartment_data``:
+    cards without a title or link are skipped, a missing price becomes "0" and a
+    missing location "".
+
+    Args:
+        html (str): Page source.
+        base_url (str, optional): Page URL used to make relative links absolute.
+
+    Returns:
+        list[dict]: Ads with 'title', 'url', 'raw_price' and 'location'.
+    """
+    parser = ListingPageParser()
+    parser.feed(html)
+    parser.close()
+
+    records = []
+    for item in parser.items:
+        if 'title' not in item or not item.get('href'):
+            continue
+        records.append({
+            'title': item['title'],
+            'url': urljoin(base_url, item['href']) if base_url else item['href'],
+            'raw_price': item.get('raw_price', "0"),
+            'location': item.get('location', ""),
+        })
+    return records
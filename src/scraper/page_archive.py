@@ -0,0 +1,158 @@
+import argparse
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+# Init path to access shared utils
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.append(project_root)
+
+from src.scraper.listing_parser import parse_listing_page
+
+MANIFEST_FILE = "pages.jsonl"
+CSV_COLUMNS = ['title', 'url', 'raw_price', 'location']
+
+
+class PageArchive:
+    """
+    Compressed, content-addressed archive of fetched listing pages.
+
+    Each page source is stored once as ``objects/<sha[:2]>/<sha>.html.gz``,
+    named by the SHA-256 of its HTML, so identical pages share a file. Every
+    fetch is also logged as one JSON line in ``pages.jsonl`` (page number, URL,
+    time, hash), which keeps the crawl order for re-parsing. Several processes
+    may save into the same archive.
+    """
+    def __init__(self, folder):
+        self.folder = folder
+        os.makedirs(os.path.join(folder, 'objects'), exist_ok=True)
+
+    def object_path(self, digest):
+        return os.path.join(self.folder, 'objects', digest[:2], f"{digest}.html.gz")
+
+    def save(self, url, html, page=None):
+        """
+        Store a page source and log the fetch.
+
+        Returns:
+            str: SHA-256 hex digest of the HTML.
+        """
+        data = html.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            # mtime=0 keeps the compressed bytes deterministic
+            with open(tmp_path, 'wb') as f, gzip.GzipFile(fileobj=f, mode='wb', mtime=0) as gz:
+                gz.write(data)
+            os.replace(tmp_path, path)
+
+        entry = {'page': page, 'url': url, 'sha256': digest,
+                 'fetched_at': datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')}
+        # One short write per line, so lines from concurrent workers do not interleave
+        with open(os.path.join(self.folder, MANIFEST_FILE), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return digest
+
+    def load(self, digest):
+        """Page source stored under a digest."""
+        with gzip.open(self.object_path(digest), 'rb') as f:
+            return f.read().decode('utf-8')
+
+    def entries(self):
+        """Logged fetches in the order they were saved (a torn last line is skipped)."""
+        path = os.path.join(self.folder, MANIFEST_FILE)
+        if not os.path.exists(path):
+            return []
+        entries = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return entries
+
+
+def open_archive(config):
+    """The archive configured in ``scraper.archive``, or None if it is disabled."""
+    archive_cfg = config['scraper'].get('archive', {})
+    if not archive_cfg.get('enabled', False):
+        return None
+    return PageArchive(os.path.join(project_root, archive_cfg.get('folder', 'data/archive')))
+
+
+def _parse_archived(args):
+    """Worker: load one archived page and extract its ads."""
+    folder, digest, url = args
+    return parse_listing_page(PageArchive(folder).load(digest), url)
+
+
+def reparse_archive(folder, output_path=None, workers=None):
+    """
+    Regenerate the scraped dataset from archived pages, without a browser.
+
+    Pages are parsed with listing_parser (the same ``c-products__*``
+    selectors) across a process pool. Ads are deduplicated by URL in crawl
+    order, like the scrapers do.
+
+    Args:
+        folder (str): Archive folder.
+        output_path (str, optional): CSV to (over)write.
+        workers (int, optional): Worker processes (default: CPU count; 1 parses
+            in this process).
+
+    Returns:
+        tuple: (DataFrame with the CSV columns, summary dict with 'pages',
+        'ads' and 'seconds').
+    """
+    start = time.perf_counter()
+    entries = [e for e in PageArchive(folder).entries() if e.get('sha256')]
+    tasks = [(folder, e['sha256'], e.get('url')) for e in entries]
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # map keeps the crawl order; chunks amortize the inter-process overhead
+            pages = list(pool.map(_parse_archived, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+    else:
+        pages = [_parse_archived(task) for task in tasks]
+
+    ads, seen_urls = [], set()
+    for page_ads in pages:
+        for data in page_ads:
+            if data['url'] not in seen_urls:
+                seen_urls.add(data['url'])
+                ads.append(data)
+    df = pd.DataFrame(ads, columns=CSV_COLUMNS)
+    if output_path:
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        df.to_csv(output_path, index=False, encoding='utf-8')
+    return df, {'pages': len(tasks), 'ads': len(df), 'seconds': time.perf_counter() - start}
+
+
+if __name__ == "__main__":
+    from src.utils.config_loader import ConfigLoader
+
+    config = ConfigLoader.get_config()
+    paths_cfg = config['paths']
+    archive_cfg = config['scraper'].get('archive', {})
+    parser = argparse.ArgumentParser(description="Re-parse archived listing pages into a CSV, offline.")
+    parser.add_argument('--archive', default=os.path.join(project_root, archive_cfg.get('folder', 'data/archive')))
+    parser.add_argument('--output', default=os.path.join(project_root, paths_cfg['output_folder'], "apartments_reparsed.csv"),
+                        help="CSV to write (the scraped CSV is not touched unless given here).")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: all CPU cores).")
+    args = parser.parse_args()
+
+    _, summary = reparse_archive(args.archive, args.output, args.workers)
+    print(f"Re-parsed {summary['pages']} archived pages into {summary['ads']} apartments "
+          f"in {summary['seconds']:.1f} s: {args.output}")
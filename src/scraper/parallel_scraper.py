@@ -0,0 +1,169 @@
+import multiprocessing
+import os
+import time
+
+import pandas as pd
+
+from src.scraper.scraper_state import mark_pages_done
+from src.scraper.url_index import UrlIndex
+from src.model.listing_store import ListingStore
+
+
+def page_worker(open_session, config, page_queue, result_queue):
+    """
+    Worker process: scrape page numbers from the shared queue until it is drained.
+
+    ``open_session(config)`` runs inside the worker and returns
+    ``(scrape, close)``, where ``scrape(page_num)`` returns the list of ads on a
+    page. Each page is sent to the writer as ``(page_num, ads)``, or
+    ``(page_num, None)`` when it failed. A final None tells the writer the
+    worker is finished, even if its session could not be opened.
+    """
+    try:
+        scrape, close = open_session(config)
+        try:
+            for page_num in iter(page_queue.get, None):
+                try:
+                    ads = scrape(page_num)
+                except Exception as e:
+                    print(f"Worker {os.getpid()}: page {page_num} failed: {e}")
+                    ads = None
+                result_queue.put((page_num, ads))
+        finally:
+            close()
+    except Exception as e:
+        print(f"Worker {os.getpid()} stopped: {e}")
+    finally:
+        result_queue.put(None)
+
+
+def write_results(result_queue, output_path, n_workers, batch_size=200, summary_queue=None, store_path=None):
+    """
+    Writer process: deduplicate ads from all workers and append them to the CSV.
+
+    Ads are checked against the CSV's URL index (url_index.UrlIndex). New ads
+    are buffered and appended in batches of at least ``batch_size`` rows.
+    Pages are recorded as done in the state file only after their ads are
+    on disk, so a crash at any point loses no data; unrecorded pages are simply
+    scraped again on the next run.
+
+    Args:
+        result_queue (Queue): Messages from page_worker.
+        output_path (str): CSV to append to.
+        n_workers (int): Number of workers (final None messages to wait for).
+        batch_size (int): Buffered rows that trigger a write.
+        summary_queue (Queue, optional): Receives the summary dict at the end.
+        store_path (str, optional): Listing store that also records every
+            page's ads (one transaction per page).
+
+    Returns:
+        dict: Summary with 'pages', 'new_ads' and 'failed_pages'.
+    """
+    seen_urls = UrlIndex.for_csv(output_path)
+    listing_store = ListingStore(store_path) if store_path else None
+    rows, pages = [], []
+    summary = {'pages': 0, 'new_ads': 0, 'failed_pages': []}
+
+    def flush():
+        if rows:
+            header = not os.path.exists(output_path)
+            pd.DataFrame(rows).to_csv(output_path, mode='a', header=header, index=False, encoding='utf-8')
+            seen_urls.commit(output_path)
+        if pages:
+            mark_pages_done(pages)
+        summary['pages'] += len(pages)
+        summary['new_ads'] += len(rows)
+        rows.clear()
+        pages.clear()
+
+    finished = 0
+    try:
+        while finished < n_workers:
+            message = result_queue.get()
+            if message is None:
+                finished += 1
+                continue
+            page_num, ads = message
+            if ads is None:
+                summary['failed_pages'].append(page_num)
+                continue
+            if listing_store is not None:
+                listing_store.add_listings(ads)
+            new_ads = 0
+            for data in ads:
+                if data.get('url') and data['url'] not in seen_urls:
+                    seen_urls.add(data['url'])
+                    rows.append(data)
+                    new_ads += 1
+            pages.append(page_num)
+            print(f"Page {page_num}: {len(ads)} ads, {new_ads} new.")
+            if len(rows) >= batch_size:
+                flush()
+    finally:
+        flush()
+        seen_urls.close()
+        if listing_store is not None:
+            listing_store.close()
+        summary['failed_pages'].sort()
+        if summary_queue is not None:
+            summary_queue.put(summary)
+    return summary
+
+
+def scrape_pages_parallel(config, page_numbers, output_path, n_workers, open_session, batch_size=200,
+                          store_path=None):
+    """
+    Scrape pages with ``n_workers`` worker processes and one writer process.
+
+    Workers pull page numbers from a shared queue, so a slow page never holds up
+    the others, and send their ads to the single writer, which owns the CSV and
+    the state file.
+
+    Args:
+        config (dict): Global configuration (passed to ``open_session``).
+        page_numbers (list): Pages to scrape.
+        output_path (str): CSV to append to.
+        n_workers (int): Number of worker processes.
+        open_session (callable): Picklable ``config -> (scrape, close)`` run in
+            each worker, e.g. ``reality_scraper.open_selenium_session``.
+        batch_size (int): Rows per CSV append.
+        store_path (str, optional): Listing store the writer also records pages in.
+
+    Returns:
+        dict: Summary with 'pages', 'new_ads', 'failed_pages' and 'seconds'.
+    """
+    start = time.perf_counter()
+    n_workers = max(1, min(n_workers, len(page_numbers)))
+    page_queue = multiprocessing.Queue()
+    result_queue = multiprocessing.Queue()
+    summary_queue = multiprocessing.Queue()
+    for page_num in page_numbers:
+        page_queue.put(page_num)
+    for _ in range(n_workers):
+        page_queue.put(None)
+
+    writer = multiprocessing.Process(target=write_results,
+                                     args=(result_queue, output_path, n_workers, batch_size, summary_queue,
+                                           store_path))
+    workers = [multiprocessing.Process(target=page_worker, args=(open_session, config, page_queue, result_queue))
+               for _ in range(n_workers)]
+    writer.start()
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            worker.join()
+            if worker.exitcode < 0:
+                # Killed by a signal before it could sign off
+                result_queue.put(None)
+        summary = summary_queue.get()
+        writer.join()
+    except KeyboardInterrupt:
+        # Ctrl+C reaches every process; the writer still flushes its buffer
+        for worker in workers:
+            worker.join()
+        writer.join()
+        raise
+
+    summary['seconds'] = time.perf_counter() - start
+    return summary
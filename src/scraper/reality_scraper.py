@@ -1,7 +1,8 @@
+import argparse
+import copy
 import time
 import random
 import os
-import json
 import pandas as pd
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
@@ -16,47 +17,35 @@ project_root = os.path.dirname(os.path.dirname(current_dir))
 sys.path.append(project_root)
 
 from src.utils.config_loader import ConfigLoader
-
-# --- CONSTANTS ---
-STATE_FILE = "scraper_state_apartments.json"
-
-def get_project_root():
-    """Return absolute path to project root."""
-    return project_root
-
-def load_state():
-    """Load scraping state (last visited page) from JSON."""
-    state_path = os.path.join(get_project_root(), STATE_FILE)
-    if os.path.exists(state_path):
-        with open(state_path, 'r') as f:
-            return json.load(f)
-    return {"last_page": 0}
-
-def save_state(page_number):
-    """Save current scraping progress."""
-    state_path = os.path.join(get_project_root(), STATE_FILE)
-    with open(state_path, 'w') as f:
-        json.dump({"last_page": page_number}, f)
-
-def get_existing_urls(csv_path):
-    """
-    Load set of already scraped URLs to avoid duplicates.
-
-    Args:
-        csv_path (str): Path to the CSV file.
-
-    Returns:
-        set: A set of URL strings.
-    """
-    if not os.path.exists(csv_path):
-        return set()
-    try:
-        df = pd.read_csv(csv_path)
-        if 'url' in df.columns:
-            return set(df['url'].unique())
-    except Exception:
-        return set()
-    return set()
+from src.scraper.scraper_state import get_project_root, mark_pages_done, pending_pages
+from src.scraper.url_index import UrlIndex
+from src.scraper.parallel_scraper import scrape_pages_parallel
+from src.model.listing_store import default_store_path, open_scraper_store
+from src.scraper.page_archive import open_archive
+
+# Reads every ad card of the loaded page in one WebDriver call. Mirrors
+# extract_apartment_data: cards without a title or link are skipped (null),
+# a missing price becomes "0" and a missing location "".
+EXTRACT_ADS_SCRIPT = """
+var text = function (el) { return (el.innerText || el.textContent || '').trim(); };
+var items = document.getElementsByClassName('c-products__item');
+var ads = [];
+for (var i = 0; i < items.length; i++) {
+    var title = items[i].querySelector('.c-products__title');
+    var link = items[i].querySelector('.c-products__link');
+    if (!title || !link) { ads.push(null); continue; }
+    var href = link.href !== undefined ? link.href : link.getAttribute('href');
+    var price = items[i].querySelector('.c-products__price');
+    var location = items[i].querySelector('.c-products__info');
+    ads.push({
+        title: text(title),
+        url: href || null,
+        raw_price: price ? text(price) : '0',
+        location: location ? text(location) : ''
+    });
+}
+return ads;
+"""
 
 def setup_driver(config):
     """
@@ -120,10 +109,95 @@ def extract_apartment_data(element):
     except Exception:
         return None
 
+def extract_page_data(driver):
+    """
+    Extract all ads of the loaded page with a single execute_script call.
+
+    Args:
+        driver (webdriver.Chrome): Driver showing a listing page.
+
+    Returns:
+        list[dict] or None: Extracted ads, or None if the script could not run
+        (the caller then falls back to extract_apartment_data per element).
+    """
+    try:
+        ads = driver.execute_script(EXTRACT_ADS_SCRIPT)
+    except Exception:
+        return None
+    if not isinstance(ads, list):
+        return None
+    return [data for data in ads if data]
+
+def scrape_page(driver, url, archive=None, page_num=None):
+    """
+    Load one listing page in the browser and extract all ads on it.
+
+    Args:
+        driver (webdriver.Chrome): Driver with cookies already handled.
+        url (str): Listing page URL.
+        archive (PageArchive, optional): Also save the rendered page source
+            here, for offline re-parsing.
+        page_num (int, optional): Page number logged with the archived page.
+
+    Returns:
+        list[dict]: Extracted ads (title, url, raw_price, location).
+    """
+    driver.get(url)
+
+    # Random delay
+    time.sleep(random.uniform(2, 4))
+
+    # Scroll down to ensure images/items load
+    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+    time.sleep(1)
+
+    if archive is not None:
+        archive.save(url, driver.page_source, page_num)
+
+    # One round trip for the whole page; per-element lookups only as a fallback
+    ads = extract_page_data(driver)
+    if ads is not None:
+        return ads
+
+    # Find items (Updated Selector)
+    items = driver.find_elements(By.CLASS_NAME, "c-products__item")
+    return [data for data in (extract_apartment_data(item) for item in items) if data]
+
+def open_selenium_session(config):
+    """
+    Start a headless browser for one worker process.
+
+    Workers cannot wait for a manual cookie click, so the browser always runs
+    headless; the ad cards are read from the page even under the cookie banner.
+
+    Returns:
+        tuple: (scrape, close) where scrape(page_num) returns the ads on a page.
+    """
+    config = copy.deepcopy(config)
+    config['driver']['headless'] = True
+    base_url = config['scraper']['base_url']
+    archive = open_archive(config)
+    driver = setup_driver(config)
+    try:
+        driver.get(base_url)
+    except Exception:
+        driver.quit()
+        raise
+
+    def scrape(page_num):
+        return scrape_page(driver, f"{base_url}?page={page_num}", archive, page_num)
+
+    return scrape, driver.quit
+
 def main():
     """
     Main execution loop for the scraper.
     """
+    parser = argparse.ArgumentParser(description="Scrape apartment listings with Selenium.")
+    parser.add_argument('--workers', type=int,
+                        help="Headless browser processes scraping in parallel (defaults to scraper.workers).")
+    args = parser.parse_args()
+
     try:
         config = ConfigLoader.get_config()
     except Exception as e:
@@ -137,17 +211,39 @@ def main():
     os.makedirs(output_dir, exist_ok=True)
     output_path = os.path.join(output_dir, paths_cfg['output_filename'])
 
-    state = load_state()
-    start_page = state['last_page'] + 1
-    seen_urls = get_existing_urls(output_path)
-
-    print(f"--- INFO: Loaded {len(seen_urls)} apartments. Resuming from page {start_page}. ---")
-    
-    if start_page > scraper_cfg['num_pages']:
-        print(f"\n⚠️  WARNING: Start page ({start_page}) is greater than configured 'num_pages' ({scraper_cfg['num_pages']}).")
+    pages = pending_pages(scraper_cfg['num_pages'])
+    if not pages:
+        print(f"\n⚠️  WARNING: All {scraper_cfg['num_pages']} configured pages ('num_pages') are already scraped.")
         print("   The scraper has nothing to do. Increase 'num_pages' in config.json or delete 'scraper_state_apartments.json' to restart.")
         return
 
+    try:
+        seen_urls = UrlIndex.for_csv(output_path)
+    except Exception as e:
+        print(f"Error: Cannot read existing apartments from {output_path}: {e}")
+        return
+    print(f"--- INFO: Loaded {len(seen_urls)} apartments. {len(pages)} page(s) left, starting at page {pages[0]}. ---")
+
+    n_workers = args.workers or scraper_cfg.get('workers', 1)
+    if n_workers > 1:
+        # The writer process opens its own connection
+        seen_urls.close()
+        print(f"--- INFO: Scraping with {n_workers} headless browser workers. ---")
+        try:
+            store_path = default_store_path(config) if scraper_cfg.get('write_store', False) else None
+            summary = scrape_pages_parallel(config, pages, output_path, n_workers, open_selenium_session,
+                                            batch_size=scraper_cfg.get('write_batch_size', 200),
+                                            store_path=store_path)
+        except KeyboardInterrupt:
+            print("\n--- SCRAPING PAUSED BY USER ---")
+            return
+        print(f"\nDone: {summary['pages']} pages, {summary['new_ads']} new apartments in {summary['seconds']:.1f} s.")
+        if summary['failed_pages']:
+            print(f"Failed pages (retried on the next run): {summary['failed_pages']}")
+        return
+
+    listing_store = open_scraper_store(config)
+    archive = open_archive(config)
     driver = setup_driver(config)
     try:
         print("\n" + "=" * 50)
@@ -160,26 +256,18 @@ def main():
         driver.get(scraper_cfg['base_url'])
         input(">>> Press ENTER here after cookies are handled... <<<")
 
-        for page_num in range(start_page, scraper_cfg['num_pages'] + 1):
+        for page_num in pages:
             # Using 'page' parameter as seen in browser, though 'strana' might work too
             url = f"{scraper_cfg['base_url']}?page={page_num}"
             print(f"Loading Page {page_num}: {url}")
-            driver.get(url)
-            
-            # Random delay
-            time.sleep(random.uniform(2, 4))
-            
-            # Scroll down to ensure images/items load
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(1)
 
-            # Find items (Updated Selector)
-            items = driver.find_elements(By.CLASS_NAME, "c-products__item")
-            
+            page_ads = scrape_page(driver, url, archive, page_num)
+            if listing_store is not None:
+                listing_store.add_listings(page_ads)
+
             page_data = []
-            for item in items:
-                data = extract_apartment_data(item)
-                if data and data.get('url') and data['url'] not in seen_urls:
+            for data in page_ads:
+                if data.get('url') and data['url'] not in seen_urls:
                     seen_urls.add(data['url'])
                     page_data.append(data)
 
@@ -187,11 +275,12 @@ def main():
                 df = pd.DataFrame(page_data)
                 header = not os.path.exists(output_path)
                 df.to_csv(output_path, mode='a', header=header, index=False, encoding='utf-8')
+                seen_urls.commit(output_path)
                 print(f"   -> Saved {len(page_data)} new apartments.")
             else:
                  print("   -> No new unique apartments found on this page.")
 
-            save_state(page_num)
+            mark_pages_done([page_num])
 
     except KeyboardInterrupt:
         print("\n--- SCRAPING PAUSED BY USER ---")
@@ -201,6 +290,9 @@ def main():
 
     finally:
         driver.quit()
+        seen_urls.close()
+        if listing_store is not None:
+            listing_store.close()
 
 if __name__ == "__main__":
     main()
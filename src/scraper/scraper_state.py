@@ -0,0 +1,76 @@
+import os
+import json
+
+# Project root (two levels up from src/scraper/)
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# --- CONSTANTS ---
+STATE_FILE = "scraper_state_apartments.json"
+
+def get_project_root():
+    """Return absolute path to project root."""
+    return project_root
+
+def get_state_path():
+    """Return absolute path to the default state file."""
+    return os.path.join(get_project_root(), STATE_FILE)
+
+def load_state(state_path=None):
+    """
+    Load scraping state from JSON.
+
+    ``last_page`` is the page up to which every page is done and
+    ``completed_pages`` lists pages finished beyond it (out of order, e.g. by
+    parallel workers). Old state files with only ``last_page`` are still valid.
+    ``state_path`` defaults to the project's state file.
+    """
+    state_path = state_path or get_state_path()
+    state = {"last_page": 0}
+    if os.path.exists(state_path):
+        with open(state_path, 'r') as f:
+            state = json.load(f)
+    state.setdefault("completed_pages", [])
+    return state
+
+def _write_state(state, state_path=None):
+    """Compact and atomically write the state, so a crash never leaves a partial file."""
+    completed = set(state["completed_pages"])
+    last_page = state["last_page"]
+    while last_page + 1 in completed:
+        last_page += 1
+    state = {"last_page": last_page, "completed_pages": sorted(p for p in completed if p > last_page)}
+
+    state_path = state_path or get_state_path()
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, state_path)
+    return state
+
+def save_state(page_number):
+    """Save current scraping progress: every page up to page_number is done."""
+    state = load_state()
+    state["last_page"] = max(state["last_page"], page_number)
+    _write_state(state)
+
+def mark_pages_done(page_numbers, state_path=None):
+    """Record individual finished pages (in any order)."""
+    state = load_state(state_path)
+    state["completed_pages"] = set(state["completed_pages"]) | set(page_numbers)
+    return _write_state(state, state_path)
+
+def pending_pages(num_pages, state=None, state_path=None):
+    """
+    List the pages that still need scraping.
+
+    Args:
+        num_pages (int): Last page to scrape.
+        state (dict, optional): State from load_state() (loaded when omitted).
+        state_path (str, optional): State file to load it from.
+
+    Returns:
+        list: Page numbers in ascending order.
+    """
+    state = state or load_state(state_path)
+    completed = set(state["completed_pages"])
+    return [p for p in range(state["last_page"] + 1, num_pages + 1) if p not in completed]
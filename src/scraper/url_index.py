@@ -0,0 +1,141 @@
+import hashlib
+import io
+import os
+import sqlite3
+
+import pandas as pd
+
+from src.utils.listing_keys import listing_key
+
+# Bump when the key derivation or schema changes, to force a rebuild
+INDEX_VERSION = 1
+# Leading CSV bytes whose hash detects a rewritten (not just appended) file
+PREFIX_SIZE = 1 << 16
+
+
+def default_index_path(csv_path):
+    """Index file stored next to the CSV, e.g. ``apartments_raw_data.urls.sqlite``."""
+    return f"{os.path.splitext(csv_path)[0]}.urls.sqlite"
+
+
+def _prefix_sha256(path, size):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read(size)).hexdigest()
+
+
+class UrlIndex:
+    """
+    On-disk set of listing URLs already stored in the scraped CSV.
+
+    Keys (see listing_key) live in an SQLite table, so a membership check is one
+    primary-key lookup and opening the index does not read the CSV. The index
+    remembers how many CSV bytes it covers: on open, only rows appended since
+    then (e.g. by another run) are read, and a rewritten CSV triggers a rebuild.
+
+    Use it like the old ``seen_urls`` set (``in`` / ``add``) and call
+    commit() right after the matching rows are appended to the CSV. Keys added
+    since the last commit are discarded if the process dies, so the index never
+    claims a listing the CSV does not have.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS urls (key INTEGER PRIMARY KEY)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value)")
+        if self._meta('version') != INDEX_VERSION:
+            self._conn.execute("DELETE FROM urls")
+            self._conn.execute("DELETE FROM meta")
+            self._set_meta(version=INDEX_VERSION)
+        self._conn.commit()
+
+    @classmethod
+    def for_csv(cls, csv_path, index_path=None, chunk_size=100000):
+        """Open the index of a CSV (default_index_path) and bring it up to date."""
+        index = cls(index_path or default_index_path(csv_path))
+        index.sync(csv_path, chunk_size)
+        return index
+
+    def _meta(self, name):
+        row = self._conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, **values):
+        self._conn.executemany("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", values.items())
+
+    def __contains__(self, url):
+        return self._conn.execute("SELECT 1 FROM urls WHERE key = ?", (listing_key(url),)).fetchone() is not None
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+
+    def add(self, url):
+        """Add a URL (pending until commit())."""
+        self._conn.execute("INSERT OR IGNORE INTO urls (key) VALUES (?)", (listing_key(url),))
+
+    def _add_many(self, urls):
+        # Sorted keys fill the B-tree sequentially, several times faster than random order
+        keys = sorted({listing_key(url) for url in urls if isinstance(url, str) and url})
+        self._conn.executemany("INSERT OR IGNORE INTO urls (key) VALUES (?)", ((key,) for key in keys))
+
+    def commit(self, csv_path):
+        """Make pending keys permanent and record that they cover the CSV as it is now."""
+        size = os.path.getsize(csv_path) if os.path.exists(csv_path) else 0
+        prefix_size = min(size, PREFIX_SIZE)
+        self._set_meta(csv_size=size, prefix_size=prefix_size,
+                       prefix_sha256=_prefix_sha256(csv_path, prefix_size) if size else None)
+        self._conn.commit()
+
+    def sync(self, csv_path, chunk_size=100000):
+        """
+        Bring the index up to date with the CSV.
+
+        Returns:
+            str: 'current', 'appended' or 'rebuilt'.
+
+        Raises:
+            ValueError: If the CSV has no 'url' column.
+            Exception: Any error reading the CSV. Deduplication would be
+                unreliable, so it is never silently skipped.
+        """
+        size = os.path.getsize(csv_path) if os.path.exists(csv_path) else 0
+        indexed_size = self._meta('csv_size')
+        prefix_size = self._meta('prefix_size')
+        valid = (indexed_size is not None and indexed_size <= size
+                 and (not indexed_size or _prefix_sha256(csv_path, prefix_size) == self._meta('prefix_sha256')))
+
+        if valid and indexed_size == size:
+            return 'current'
+
+        if valid and indexed_size:
+            columns = list(pd.read_csv(csv_path, nrows=0).columns)
+            with open(csv_path, 'rb') as f:
+                f.seek(indexed_size - 1)
+                tail = f.read(size - indexed_size + 1)
+            # The indexed part must end with a complete row
+            if tail.startswith(b"\n"):
+                if 'url' not in columns:
+                    raise ValueError(f"{csv_path} has no 'url' column")
+                for chunk in pd.read_csv(io.BytesIO(tail[1:]), header=None, names=columns,
+                                         usecols=['url'], chunksize=chunk_size):
+                    self._add_many(chunk['url'].tolist())
+                self.commit(csv_path)
+                return 'appended'
+
+        self._conn.execute("DELETE FROM urls")
+        if size:
+            if 'url' not in pd.read_csv(csv_path, nrows=0).columns:
+                raise ValueError(f"{csv_path} has no 'url' column")
+            for chunk in pd.read_csv(csv_path, usecols=['url'], chunksize=chunk_size):
+                self._add_many(chunk['url'].tolist())
+        self.commit(csv_path)
+        return 'rebuilt'
+
+    def close(self):
+        """Close the database; keys added since the last commit() are dropped."""
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
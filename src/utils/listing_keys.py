@@ -0,0 +1,22 @@
+import hashlib
+
+
+def listing_key(url):
+    """
+    64-bit key of a listing URL.
+
+    The scheme, host, fragment and a trailing slash are ignored, so the key
+    identifies the listing (its detail path with the listing ID) rather than
+    the exact spelling of the link. Collisions are negligible below billions of
+    listings.
+    """
+    # Plain string slicing; urlsplit would dominate bootstrapping large CSVs
+    key = url.strip().partition('#')[0]
+    scheme_end = key.find('://')
+    if scheme_end > 0 and key[:scheme_end].isalpha():
+        # The host ends at the first '/' or '?'
+        ends = [i for i in (key.find('/', scheme_end + 3), key.find('?', scheme_end + 3)) if i >= 0]
+        key = key[min(ends):] if ends else ''
+    path, _, query = key.partition('?')
+    key = path.rstrip('/') + ('?' + query if query else '')
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big', signed=True)
@@ -0,0 +1,57 @@
+import os
+import threading
+import time
+
+
+class StartupTimer:
+    """
+    Collects a breakdown of application start-up time.
+
+    Enabled by setting the ``APARTMENT_ANALYZER_STARTUP_TIMING`` environment
+    variable to a non-empty value other than ``0``. When disabled, all methods
+    are cheap no-ops apart from reading the clock.
+
+    Attributes:
+        enabled (bool): Whether the report will be printed.
+        phases (list): (phase name, seconds) pairs in the order they finished.
+    """
+    ENV_VAR = "APARTMENT_ANALYZER_STARTUP_TIMING"
+
+    def __init__(self, start=None):
+        """
+        Start the timer.
+
+        Args:
+            start (float, optional): time.perf_counter() value to measure from,
+                e.g. taken before the heavy imports of the entry point.
+        """
+        self.enabled = os.environ.get(self.ENV_VAR, "") not in ("", "0")
+        self.start = start if start is not None else time.perf_counter()
+        self.phases = []
+        self._last = self.start
+        self._lock = threading.Lock()
+        self._reported = False
+
+    def mark(self, phase):
+        """Record the time elapsed since the previous mark as ``phase``."""
+        now = time.perf_counter()
+        with self._lock:
+            self.phases.append((phase, now - self._last))
+            self._last = now
+
+    def record(self, phase, seconds):
+        """Record a phase measured separately (e.g. on a background thread)."""
+        with self._lock:
+            self.phases.append((phase, seconds))
+
+    def report(self):
+        """Print the breakdown once (only when enabled)."""
+        if not self.enabled or self._reported:
+            return
+        self._reported = True
+        total = time.perf_counter() - self.start
+        print("--- Startup timing ---")
+        with self._lock:
+            for phase, seconds in self.phases:
+                print(f"  {phase:<16} {seconds * 1000:8.1f} ms")
+        print(f"  {'total':<16} {total * 1000:8.1f} ms")
@@ -0,0 +1,42 @@
+"""Shared fixtures for the test modules."""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.model.inference import PricePredictor
+
+
+def make_trained_predictor():
+    """Build a predictor around a small forest trained on synthetic listings."""
+    rng = np.random.default_rng(0)
+    n = 300
+    df = pd.DataFrame({
+        'area': rng.integers(20, 150, n),
+        'disposition': rng.choice(['1+kk', '2+kk', '3+1'], n),
+        'region': rng.choice(['Praha', 'Jihomoravský kraj', 'Other'], n),
+    })
+    y = df['area'] * 80000 + (df['region'] == 'Praha') * 2_000_000 + rng.normal(0, 100000, n)
+    X = pd.get_dummies(df, columns=['disposition', 'region'], drop_first=False)
+
+    predictor = PricePredictor(model_path=None, columns_path=None)
+    predictor.model = RandomForestRegressor(n_estimators=10, random_state=42).fit(X, y)
+    predictor.model_columns = list(X.columns)
+    return predictor, df
+
+
+def make_raw_rows(n, seed, locations=('Praha 4', 'Brno - Žabovřesky', 'Olomouc')):
+    """Synthetic raw scraped rows (title, url, raw_price, location)."""
+    rng = np.random.default_rng(seed)
+    areas = rng.integers(20, 120, n)
+    return pd.DataFrame({
+        'title': [f"Prodej bytu {d} {a} m²" for d, a in zip(rng.choice(['1+kk', '2+kk', '3+1'], n), areas)],
+        'url': [f"https://example.cz/{seed}/{i}" for i in range(n)],
+        'raw_price': [f"{a * 90_000} Kč" for a in areas],
+        'location': rng.choice(list(locations), n),
+    })
@@ -0,0 +1,59 @@
+import unittest
+import os
+import sys
+import struct
+import tempfile
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.model.artifact import ArtifactError, read_bundle, write_bundle
+
+class TestModelBundle(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'model.bundle')
+        self.arrays = {
+            'threshold': np.linspace(0, 1, 7),
+            'children': np.arange(14, dtype=np.int32).reshape(7, 2),
+            'leaf': np.array([False, True, True, False, True, False, True]),
+        }
+        write_bundle(self.path, self.arrays, {'columns': ['area', 'region_Praha']})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_memory_mapped(self):
+        arrays, header = read_bundle(self.path)
+        self.assertEqual(header['columns'], ['area', 'region_Praha'])
+        for name, expected in self.arrays.items():
+            self.assertIsInstance(arrays[name], np.memmap)
+            np.testing.assert_array_equal(arrays[name], expected)
+        with self.assertRaises(ValueError):
+            arrays['threshold'][0] = 5
+        del arrays
+
+    def test_truncated_bundle_is_rejected(self):
+        with open(self.path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path) - 8)
+        with self.assertRaisesRegex(ArtifactError, 'truncated'):
+            read_bundle(self.path)
+
+    def test_corrupted_payload_is_rejected(self):
+        with open(self.path, 'r+b') as f:
+            f.seek(-1, os.SEEK_END)
+            f.write(b'\xff')
+        with self.assertRaisesRegex(ArtifactError, 'checksum'):
+            read_bundle(self.path)
+
+    def test_other_format_version_is_rejected(self):
+        with open(self.path, 'r+b') as f:
+            f.seek(8)
+            f.write(struct.pack('<I', 999))
+        with self.assertRaisesRegex(ArtifactError, 'version'):
+            read_bundle(self.path, verify=False)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+import unittest
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from unittest import mock
+
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.scraper import async_scraper, scraper_state
+from src.scraper.async_scraper import ConnectionSlots, HostRateLimiter
+from src.scraper.fixture_server import FixtureServer
+from src.scraper.listing_parser import parse_listing_page
+from src.scraper.url_index import UrlIndex
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+PAGE_URL = "https://reality.idnes.cz/s/prodej/byty/?page=1"
+
+class TestListingParser(unittest.TestCase):
+    def setUp(self):
+        with open(os.path.join(FIXTURES, 'listing_page.html'), encoding='utf-8') as f:
+            self.ads = parse_listing_page(f.read(), PAGE_URL)
+
+    def test_extracts_ad_cards(self):
+        # The advert card has no title or link and is skipped
+        self.assertEqual(len(self.ads), 4)
+        self.assertEqual(self.ads[0], {
+            'title': 'prodej bytu 2+kk 54 m²',
+            'url': 'https://reality.idnes.cz/detail/prodej/byt/praha-5-plzenska/65f1a2b3c4d5e6f708192a3b/',
+            'raw_price': '7 490 000 Kč',
+            'location': 'Plzeňská, Praha 5 - Smíchov',
+        })
+
+    def test_text_and_defaults_match_selenium(self):
+        self.assertEqual(self.ads[1]['title'], 'prodej bytu 3+1 75 m²')
+        self.assertEqual(self.ads[1]['location'], 'Bellova, Brno\nLíšeň')
+        self.assertEqual(self.ads[2]['raw_price'], '0')
+        self.assertEqual(self.ads[3]['url'],
+                         'https://reality.idnes.cz/detail/prodej/byt/zlin-jizni-svahy/65f1a2b3c4d5e6f708192a3e/')
+
+class TestRateLimits(unittest.TestCase):
+    def test_slots_overlap_with_politeness_delay(self):
+        async def timed():
+            slots = ConnectionSlots(4, 0.1, 0.1)
+            starts = []
+
+            async def request():
+                async with slots.slot():
+                    starts.append(time.perf_counter())
+                    await asyncio.sleep(0.01)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(request() for _ in range(8)))
+            return [t - start for t in sorted(starts)]
+
+        starts = asyncio.run(timed())
+        # 4 slots start at once, and each waits 0.1 s before its second request
+        self.assertLess(starts[3], 0.05)
+        self.assertGreaterEqual(starts[4], 0.09)
+        self.assertLess(starts[7], 0.2)
+
+    def test_caps_rate_per_host(self):
+        async def timed():
+            limiter = HostRateLimiter(max_rate=20)
+            start = time.perf_counter()
+            for _ in range(3):
+                await limiter.wait('a.example')
+            same_host = time.perf_counter() - start
+            start = time.perf_counter()
+            await limiter.wait('b.example')
+            return same_host, time.perf_counter() - start
+
+        same_host, other_host = asyncio.run(timed())
+        self.assertGreaterEqual(same_host, 0.09)
+        self.assertLess(other_host, 0.04)
+
+    def test_concurrent_pages_overlap_with_delays(self):
+        async def crawl(base_url, concurrency):
+            start = time.perf_counter()
+            pages = [page async for page, _ in async_scraper.fetch_listing_pages(
+                base_url, range(1, 9), concurrency=concurrency, min_delay=0.2, max_delay=0.2, retries=0)]
+            return sorted(pages), time.perf_counter() - start
+
+        with FixtureServer(FIXTURES, latency=0.05) as server:
+            pages, sequential = asyncio.run(crawl(server.base_url, 1))
+            self.assertEqual(pages, list(range(1, 9)))
+            pages, concurrent = asyncio.run(crawl(server.base_url, 4))
+            self.assertEqual(pages, list(range(1, 9)))
+
+        # One slot waits 7 delays; four slots wait one delay each
+        self.assertGreater(sequential, 1.4)
+        self.assertLess(concurrent, 0.6)
+
+class TestAsyncScraper(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.output_path = os.path.join(self.tmp.name, 'apartments.csv')
+        self.config = {
+            'scraper': {'base_url': 'unused', 'min_delay_seconds': 0, 'max_delay_seconds': 0,
+                        'async': {'concurrency': 4, 'retries': 0}},
+            'driver': {'headless': True, 'user_agent': 'test-agent'},
+        }
+
+    def run_scraper(self, server, pages, seen_urls, fallback=None):
+        with mock.patch.object(scraper_state, 'get_project_root', return_value=self.tmp.name), \
+                mock.patch('builtins.print'):
+            summary = async_scraper.run(self.config, server.base_url, pages, self.output_path, seen_urls, fallback)
+            state = scraper_state.load_state()
+        return summary, state
+
+    def test_scrapes_pages_concurrently_with_fallback(self):
+        fallback_pages = []
+        def fallback(config, pages):
+            fallback_pages.extend(pages)
+            return {page: [] for page in pages}
+
+        with FixtureServer(FIXTURES, empty_pages={3}) as server:
+            seen_urls = UrlIndex(os.path.join(self.tmp.name, 'urls.sqlite'))
+            self.addCleanup(seen_urls.close)
+            summary, state = self.run_scraper(server, list(range(1, 6)), seen_urls, fallback)
+
+            self.assertEqual(fallback_pages, [3])
+            self.assertEqual(summary['pages'], 5)
+            self.assertEqual(summary['new_ads'], 16)
+            self.assertEqual(state, {'last_page': 5, 'completed_pages': []})
+
+            df = pd.read_csv(self.output_path)
+            self.assertEqual(list(df.columns), ['title', 'url', 'raw_price', 'location'])
+            self.assertEqual(len(df), 16)
+            self.assertEqual(df['url'].nunique(), 16)
+
+            # Already stored ads are not appended again
+            summary, _ = self.run_scraper(server, [1, 2], seen_urls)
+            self.assertEqual(summary['new_ads'], 0)
+            self.assertEqual(len(pd.read_csv(self.output_path)), 16)
+
+    def test_unreadable_page_stops_state_without_fallback(self):
+        with FixtureServer(FIXTURES, failing_pages={2}) as server:
+            with UrlIndex(os.path.join(self.tmp.name, 'urls.sqlite')) as seen_urls:
+                summary, state = self.run_scraper(server, [1, 2, 3], seen_urls)
+
+        self.assertEqual(summary['pages'], 2)
+        self.assertEqual(server.request_count, 3)
+        # Page 3 is recorded as done, but the missing page 2 is not skipped
+        self.assertEqual(state, {'last_page': 1, 'completed_pages': [3]})
+
+    def test_main_writes_only_to_the_given_paths(self):
+        config = dict(self.config, paths={'output_folder': 'data/raw', 'output_filename': 'apartments.csv'})
+        config['scraper'] = dict(config['scraper'], num_pages=2, write_store=True)
+        bench_dir = os.path.join(self.tmp.name, 'bench')
+        output_path = os.path.join(bench_dir, 'apartments.csv')
+        state_path = os.path.join(bench_dir, 'state.json')
+
+        with FixtureServer(FIXTURES) as server, \
+                mock.patch.object(async_scraper.ConfigLoader, 'get_config', return_value=config), \
+                mock.patch.object(async_scraper, 'get_project_root', return_value=self.tmp.name), \
+                mock.patch.object(scraper_state, 'get_project_root', return_value=self.tmp.name), \
+                mock.patch.object(async_scraper, 'open_scraper_store') as open_store, \
+                mock.patch('builtins.print'), \
+                mock.patch('sys.argv', ['async_scraper.py', '--base-url', server.base_url, '--no-fallback',
+                                        '--output', output_path, '--state', state_path, '--no-store']):
+            async_scraper.main()
+
+        open_store.assert_not_called()
+        self.assertEqual(len(pd.read_csv(output_path)), 8)
+        self.assertEqual(scraper_state.load_state(state_path), {'last_page': 2, 'completed_pages': []})
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, 'data')))
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, scraper_state.STATE_FILE)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import multiprocessing
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.model.bulk_predict import PRICE_COLUMN, bulk_predict
+from src.model.inference import UnknownCategoryError
+from helpers import make_trained_predictor
+
+
+class TestBulkPredict(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.predictor, df = make_trained_predictor()
+        self.df = df.assign(listing_id=np.arange(len(df)))
+        self.expected = self.predictor.predict_batch(df)
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_csv_in_chunks(self):
+        self.df.iloc[[3, 7], self.df.columns.get_loc('region')] = ['Atlantis', None]
+        self.df.to_csv(self.path('in.csv'), index=False)
+
+        summary = bulk_predict(self.path('in.csv'), self.path('out.csv'), self.predictor, chunk_size=32)
+        self.assertEqual(summary['chunks'], 10)
+        self.assertEqual((summary['rows'], summary['priced']), (300, 298))
+
+        out = pd.read_csv(self.path('out.csv'))
+        self.assertEqual(out['listing_id'].tolist(), list(range(300)))
+        self.assertEqual(out[PRICE_COLUMN].isna().sum(), 2)
+        np.testing.assert_allclose(out[PRICE_COLUMN].drop([3, 7]), np.delete(self.expected, [3, 7]))
+
+        with self.assertRaises(UnknownCategoryError):
+            bulk_predict(self.path('in.csv'), self.path('strict.csv'), self.predictor, strict=True)
+        self.assertEqual(os.listdir(self.tmp.name), ['in.csv', 'out.csv'])
+
+    @unittest.skipUnless(multiprocessing.get_start_method() == 'fork', "workers inherit the test predictor via fork")
+    def test_parquet_with_workers_keeps_order(self):
+        self.df.to_parquet(self.path('in.parquet'), index=False)
+
+        summary = bulk_predict(self.path('in.parquet'), self.path('out.parquet'), self.predictor,
+                               chunk_size=25, workers=2, max_in_flight=3)
+        self.assertEqual((summary['chunks'], summary['priced']), (12, 300))
+
+        out = pd.read_parquet(self.path('out.parquet'))
+        self.assertEqual(out['listing_id'].tolist(), list(range(300)))
+        np.testing.assert_allclose(out[PRICE_COLUMN], self.expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest import mock
+
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.model.dataset_cache import load_processed_dataset
+from src.model.features import build_features
+
+ROWS = [
+    ('Prodej bytu 2+kk 54 m²', 'https://example.cz/1', '5 400 000 Kč', 'Praha 5 - Smíchov'),
+    ('Prodej bytu 3+1 75 m²', 'https://example.cz/2', '6 100 000 Kč', 'Brno - Líšeň'),
+    ('Prodej bytu 1+kk 32 m²', 'https://example.cz/3', 'Cena na vyžádání', 'Olomouc'),
+]
+NEW_ROWS = [
+    ('Prodej bytu 4+kk 110 m²', 'https://example.cz/4', '12 000 000 Kč', 'Zlín'),
+    ('Prodej bytu 2+1 60 m²', 'https://example.cz/5', '3 900 000 Kč', 'Praha 9'),
+]
+
+class TestProcessedDatasetCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.raw_path = os.path.join(self.tmp.name, 'raw.csv')
+        self.cache_path = os.path.join(self.tmp.name, 'processed', 'features.feather')
+        self.write_raw(ROWS)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_raw(self, rows, mode='w'):
+        pd.DataFrame(rows, columns=['title', 'url', 'raw_price', 'location']).to_csv(
+            self.raw_path, mode=mode, header=(mode == 'w'), index=False)
+
+    def load(self):
+        return load_processed_dataset(self.raw_path, self.cache_path, build_features)
+
+    def expected(self):
+        return build_features(pd.read_csv(self.raw_path))
+
+    def assert_matches_raw(self, df):
+        expected = self.expected()
+        for col in ['disposition', 'region']:
+            self.assertIsInstance(df[col].dtype, pd.CategoricalDtype)
+            self.assertEqual(df[col].astype(object).tolist(), expected[col].astype(object).tolist())
+        pd.testing.assert_frame_equal(df[['area', 'price']], expected[['area', 'price']])
+        self.assertEqual(df['url'].tolist(), expected['url'].tolist())
+
+    def test_rebuild_then_cached(self):
+        df, status = self.load()
+        self.assertEqual(status, 'rebuilt')
+        self.assert_matches_raw(df)
+
+        df, status = self.load()
+        self.assertEqual(status, 'cached')
+        self.assert_matches_raw(df)
+
+    def test_appended_rows_only_process_tail(self):
+        self.load()
+        self.write_raw(NEW_ROWS, mode='a')
+
+        processed_lengths = []
+        def process(raw):
+            processed_lengths.append(len(raw))
+            return build_features(raw)
+
+        df, status = load_processed_dataset(self.raw_path, self.cache_path, process)
+        self.assertEqual(status, 'appended')
+        self.assertEqual(processed_lengths, [len(NEW_ROWS)])
+        self.assert_matches_raw(df)
+        self.assertEqual(self.load()[1], 'cached')
+
+    def test_rows_appended_during_rebuild_are_not_cached(self):
+        size = os.path.getsize(self.raw_path)
+        self.write_raw(NEW_ROWS, mode='a')
+        # The scraper appends after the size was taken
+        with mock.patch('src.model.dataset_cache.os.path.getsize', return_value=size):
+            df, status = self.load()
+        self.assertEqual((status, len(df)), ('rebuilt', len(ROWS)))
+
+        df, status = self.load()
+        self.assertEqual(status, 'appended')
+        self.assert_matches_raw(df)
+
+    def test_partial_last_row_is_not_cached(self):
+        self.load()
+        with open(self.raw_path, 'a', encoding='utf-8') as f:
+            f.write('Prodej bytu 2+kk 40 m²,https://example.cz/6')
+
+        self.assertEqual(self.load()[1], 'appended')
+        with open(self.raw_path, 'a', encoding='utf-8') as f:
+            f.write(',4 000 000 Kč,Brno\n')
+        df, status = self.load()
+        self.assertEqual(status, 'appended')
+        self.assert_matches_raw(df)
+
+    def test_edited_rows_trigger_rebuild(self):
+        self.load()
+        self.write_raw(ROWS[:1] + NEW_ROWS)
+
+        df, status = self.load()
+        self.assertEqual(status, 'rebuilt')
+        self.assert_matches_raw(df)
+
+if __name__ == '__main__':
+    unittest.main()
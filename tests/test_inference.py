@@ -2,12 +2,21 @@ import unittest
 import os
 import sys
 import datetime
+import tempfile
 from unittest.mock import MagicMock, patch
 
+import numpy as np
+import pandas as pd
+
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.model.inference import PricePredictor
+from src.model.inference import PricePredictor, UnknownCategoryError
+from src.model.prediction_cache import PredictionCache
+from src.model.price_grid import PriceGrid
+from src.model.flat_forest import FlatForest
+from src.model.artifact import write_bundle
+from helpers import make_trained_predictor
 
 class TestPricePredictor(unittest.TestCase):
     def setUp(self):
@@ -31,13 +40,30 @@ class TestPricePredictor(unittest.TestCase):
         )
         self.assertEqual(price, 5000000)
         
-        # Check if predict was called with correct dataframe shape
+        # Check if predict was called with a correctly encoded row
         args, _ = self.predictor.model.predict.call_args
-        df = args[0]
-        self.assertEqual(df.shape, (1, 5))
-        self.assertEqual(df.iloc[0]['disposition_2+kk'], 1)
-        self.assertEqual(df.iloc[0]['region_Praha'], 1)
-        self.assertEqual(df.iloc[0]['area'], 60)
+        X = args[0]
+        cols = self.predictor.model_columns
+        self.assertEqual(X.shape, (1, 5))
+        self.assertEqual(X[0, cols.index('disposition_2+kk')], 1)
+        self.assertEqual(X[0, cols.index('region_Praha')], 1)
+        self.assertEqual(X[0, cols.index('area')], 60)
+        self.assertEqual(X.sum(), 62)
+
+    def test_predict_price_reuses_row_buffer(self):
+        self.predictor.predict_price(60, '2+kk', 'Praha')
+        self.predictor.predict_price(80, '3+1', 'Brno')
+        X = self.predictor.model.predict.call_args[0][0]
+        self.assertEqual(X.tolist(), [[80, 0, 1, 0, 1]])
+
+    def test_predict_price_unknown_category(self):
+        with self.assertRaises(UnknownCategoryError):
+            self.predictor.predict_price(60, '2+kk', 'Atlantis')
+
+        # Non-strict mode keeps the old behaviour of dropping the category
+        self.predictor.predict_price(60, '2+kk', 'Atlantis', strict=False)
+        X = self.predictor.model.predict.call_args[0][0]
+        self.assertEqual(X.tolist(), [[60, 1, 0, 0, 0]])
 
     def test_calculate_future_value(self):
         start_price = 1000000
@@ -56,5 +82,146 @@ class TestPricePredictor(unittest.TestCase):
         self.assertEqual(future_values[2]['year'], current_year + 2)
         self.assertAlmostEqual(future_values[2]['price'], 1102500) # 1.05M + 5%
 
+    def test_project_future_values(self):
+        projection = self.predictor.project_future_values([1000000, 2000000], [0.05, 0.0, -0.1], years=2)
+        self.assertEqual(projection.shape, (2, 3, 3))
+        self.assertAlmostEqual(projection[1, 0, 2], 2205000)
+        self.assertEqual(projection[0, 1].tolist(), [1000000] * 3)
+
+        expected = self.predictor.calculate_future_value(1000000, years=2, growth_rate=0.05)
+        records = self.predictor.projection_to_records(projection, listing=0, scenario=0)
+        self.assertEqual([r['year'] for r in records], [r['year'] for r in expected])
+        np.testing.assert_allclose([r['price'] for r in records], [r['price'] for r in expected])
+
+    def test_project_future_values_rate_curves(self):
+        projection = self.predictor.project_future_values(100, [[0.1, 0.0, -0.5]], years=3)
+        np.testing.assert_allclose(projection[0, 0], [100, 110, 110, 55])
+        with self.assertRaises(ValueError):
+            self.predictor.project_future_values(100, [[0.1, 0.0]], years=3)
+
+
+class TestBatchPrediction(unittest.TestCase):
+    def setUp(self):
+        self.predictor, self.df = make_trained_predictor()
+
+    def test_predict_batch_matches_predict_price(self):
+        rows = self.df.head(50)
+        expected = [self.predictor.predict_price(r.area, r.disposition, r.region) for r in rows.itertuples()]
+
+        from_df = self.predictor.predict_batch(rows, chunk_size=16)
+        from_arrays = self.predictor.predict_batch(rows['area'].values, rows['disposition'].values, rows['region'].values)
+        from_records = self.predictor.predict_batch(list(zip(rows['area'], rows['disposition'], rows['region'])))
+
+        np.testing.assert_array_equal(from_df, expected)
+        np.testing.assert_array_equal(from_arrays, expected)
+        np.testing.assert_array_equal(from_records, expected)
+
+    def test_predict_price_uses_exported_forest(self):
+        # Batch-only callers never build the export
+        self.predictor.predict_batch([60], ['2+kk'], ['Praha'])
+        self.assertIsNone(self.predictor._row_forest)
+
+        with patch.object(self.predictor.model, 'predict', wraps=self.predictor.model.predict) as sklearn_predict:
+            price = self.predictor.predict_price(60, '2+kk', 'Praha')
+        sklearn_predict.assert_not_called()
+        self.assertIsInstance(self.predictor._row_forest, FlatForest)
+        self.assertEqual(price, self.predictor.predict_batch([60], ['2+kk'], ['Praha'])[0])
+
+    def test_known_categories(self):
+        self.assertEqual(self.predictor.get_known_categories(),
+                         ({'1+kk', '2+kk', '3+1'}, {'Praha', 'Jihomoravský kraj', 'Other'}))
+        self.predictor.model = None
+        with self.assertRaises(ValueError):
+            self.predictor.get_known_categories()
+
+    def test_predict_batch_calls_model_once_per_chunk(self):
+        self.predictor.model = MagicMock()
+        self.predictor.model.predict.side_effect = lambda X: np.zeros(len(X))
+        self.predictor.predict_batch(self.df.head(25), chunk_size=10)
+        self.assertEqual(self.predictor.model.predict.call_count, 3)
+
+class TestPredictionCache(unittest.TestCase):
+    def setUp(self):
+        self.predictor, self.df = make_trained_predictor()
+        self.predictor.cache = PredictionCache(area_step=0.5, max_entries=2)
+
+    def test_repeated_queries_hit_cache(self):
+        first = self.predictor.predict_price(65.1, '2+kk', 'Praha')
+        self.predictor.model = MagicMock()
+        second = self.predictor.predict_price(64.9, '2+kk', 'Praha')
+
+        self.assertEqual(first, second)
+        self.predictor.model.predict.assert_not_called()
+        self.assertEqual(self.predictor.cache.stats()['hits'], 1)
+        self.assertEqual(self.predictor.cache.stats()['misses'], 1)
+
+    def test_eviction_and_batch(self):
+        prices = self.predictor.predict_batch([(60, '2+kk', 'Praha'), (60, '2+kk', 'Praha'),
+                                               (70, '3+1', 'Other'), (80, '1+kk', 'Praha')])
+        self.assertEqual(prices[0], prices[1])
+        self.assertEqual(prices[0], self.predictor.predict_price(60, '2+kk', 'Praha', strict=False))
+        stats = self.predictor.cache.stats()
+        self.assertEqual(stats['size'], 2)
+        self.assertEqual(stats['evictions'], 1)
+
+class TestPriceGrid(unittest.TestCase):
+    def setUp(self):
+        self.predictor, self.df = make_trained_predictor()
+        self.grid = PriceGrid.build(
+            lambda a, d, r: self.predictor.predict_batch(a, d, r),
+            ['Praha', 'Jihomoravský kraj', 'Other'], ['1+kk', '2+kk', '3+1'], 20, 149, area_step=1)
+
+    def test_grid_matches_forest_on_grid_points(self):
+        areas = [20, 55, 100, 149]
+        expected = self.predictor.predict_batch(areas, ['2+kk'] * 4, ['Praha'] * 4)
+        actual = self.grid.lookup_batch(areas, ['2+kk'] * 4, ['Praha'] * 4)
+        np.testing.assert_allclose(actual, expected, rtol=1e-6)
+
+    def test_interpolation_and_clamping(self):
+        lo = self.grid.lookup(60, '3+1', 'Other')
+        hi = self.grid.lookup(61, '3+1', 'Other')
+        mid = self.grid.lookup(60.25, '3+1', 'Other', interpolate=True)
+        self.assertAlmostEqual(mid, lo + (hi - lo) * 0.25, places=2)
+        self.assertEqual(self.grid.lookup(5, '3+1', 'Other'), self.grid.lookup(20, '3+1', 'Other'))
+
+    def test_predictor_grid_engine(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'grid.npz')
+            self.grid.save(path)
+            predictor = PricePredictor(model_path=None, columns_path=None)
+            predictor.load_grid_data(path)
+
+        self.assertIsNone(predictor.model)
+        self.assertAlmostEqual(predictor.predict_price(70, '1+kk', 'Praha'), self.grid.lookup(70, '1+kk', 'Praha'))
+        with self.assertRaises(UnknownCategoryError):
+            predictor.predict_batch([70], ['1+kk'], ['Atlantis'])
+
+class TestFlatForest(unittest.TestCase):
+    def setUp(self):
+        self.predictor, self.df = make_trained_predictor()
+        self.forest = FlatForest.from_sklearn(self.predictor.model, self.predictor.model_columns)
+
+    def test_matches_sklearn_exactly(self):
+        expected = self.predictor.predict_batch(self.df)
+        self.predictor.model = self.forest
+        np.testing.assert_array_equal(self.predictor.predict_batch(self.df), expected)
+
+    def test_predictor_flat_engine(self):
+        expected = self.predictor.predict_price(72.5, '3+1', 'Jihomoravský kraj')
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'model.bundle')
+            write_bundle(path, self.forest.to_arrays(), {
+                'columns': self.forest.columns, 'max_depth': self.forest.max_depth,
+                'metadata': {'regions': ['Praha'], 'dispositions': ['3+1']}})
+            predictor = PricePredictor(model_path=None, columns_path=None)
+            predictor.load_bundle_data(path)
+
+            self.assertIsInstance(predictor.model, FlatForest)
+            self.assertIsInstance(predictor.model.threshold, np.memmap)
+            self.assertEqual(predictor.model_columns, self.predictor.model_columns)
+            self.assertEqual(predictor.get_regions(), ['Praha'])
+            self.assertEqual(predictor.predict_price(72.5, '3+1', 'Jihomoravský kraj'), expected)
+            del predictor
+
 if __name__ == '__main__':
     unittest.main()
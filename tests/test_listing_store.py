@@ -0,0 +1,105 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+from unittest import mock
+
+import joblib
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.model import train_model
+from src.model.listing_store import ListingStore
+from src.model.features import build_features
+from helpers import make_raw_rows
+
+
+def ad(url, price, title="Prodej bytu 2+kk 54 m²", location="Praha 5"):
+    return {'title': title, 'url': url, 'raw_price': price, 'location': location}
+
+
+class TestListingStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = ListingStore(os.path.join(self.tmp.name, 'listings.sqlite'))
+        self.addCleanup(self.store.close)
+
+    def test_tracks_sightings_and_price_changes(self):
+        page = [ad("https://x.cz/detail/a/", "5 000 000 Kč"), ad("https://x.cz/detail/b/", "Info o ceně u RK")]
+        self.assertEqual(self.store.add_listings(page, '2026-01-01T10:00:00'),
+                         {'new': 2, 'updated': 0, 'price_changes': 0})
+
+        page[0]['raw_price'] = "4 800 000 Kč"
+        self.assertEqual(self.store.add_listings(page + page[:1], '2026-02-01T10:00:00'),
+                         {'new': 0, 'updated': 2, 'price_changes': 1})
+        # An older sighting does not overwrite newer data
+        self.store.add_listings([ad("https://x.cz/detail/a", "1 Kč")], '2025-01-01T10:00:00')
+
+        self.assertEqual(len(self.store), 2)
+        history = self.store.price_history("https://x.cz/detail/a/")
+        self.assertEqual(history['price'].tolist(), [5_000_000, 4_800_000])
+        row = self.store._conn.execute("SELECT first_seen, last_seen, price FROM listings WHERE url LIKE '%/a/'").fetchone()
+        self.assertEqual(row, ('2026-01-01T10:00:00', '2026-02-01T10:00:00', 4_800_000))
+
+    def test_loads_filtered_slices(self):
+        self.store.add_listings([ad("https://x.cz/1", "3 000 000 Kč"),
+                                 ad("https://x.cz/2", "4 000 000 Kč", title="Prodej bytu 3+1 70 m²", location="Brno")],
+                                '2020-01-01T00:00:00')
+        self.store.add_listings([ad("https://x.cz/3", "5 000 000 Kč")])
+
+        self.assertEqual(len(self.store.load_features()), 3)
+        self.assertEqual(sorted(self.store.load_features(regions=['Praha'])['url']), ["https://x.cz/1", "https://x.cz/3"])
+        self.assertEqual(self.store.load_features(dispositions=['3+1'])['region'].tolist(), ['Jihomoravský kraj'])
+        recent = self.store.load_features(regions=['Praha'], days=90)
+        self.assertEqual(recent['url'].tolist(), ["https://x.cz/3"])
+        self.assertEqual(str(recent['region'].dtype), 'category')
+
+    def test_csv_import_matches_features_and_is_idempotent(self):
+        csv_path = os.path.join(self.tmp.name, 'raw.csv')
+        raw = make_raw_rows(300, seed=3)
+        raw.to_csv(csv_path, index=False)
+
+        self.assertEqual(self.store.import_csv(csv_path, chunk_size=70)['new'], 300)
+        self.assertEqual(self.store.import_csv(csv_path)['price_changes'], 0)
+
+        loaded = self.store.load_features().sort_values('url').reset_index(drop=True)
+        expected = build_features(raw).sort_values('url').reset_index(drop=True)
+        pd.testing.assert_frame_equal(loaded.astype({'disposition': object, 'region': object}),
+                                      expected.astype({'disposition': object, 'region': object}),
+                                      check_dtype=False)
+
+
+class TestTrainingFromStore(unittest.TestCase):
+    def test_trains_on_region_slice(self):
+        with tempfile.TemporaryDirectory() as folder:
+            store_path = os.path.join(folder, 'listings.sqlite')
+            with ListingStore(store_path) as store:
+                store.add_listings(make_raw_rows(150, seed=4))
+
+            config = dict(train_model.config)
+            config['model'] = dict(config['model'], training=dict(config['model']['training'], rf_n_estimators=5,
+                                                                 rf_n_jobs=1), tuning={'enabled': False})
+            patches = {
+                'config': config,
+                'STORE_PATH': store_path,
+                'MODEL_PATH': os.path.join(folder, 'model.pkl'),
+                'COLUMNS_PATH': os.path.join(folder, 'columns.pkl'),
+                'METADATA_PATH': os.path.join(folder, 'metadata.json'),
+                'BUNDLE_PATH': os.path.join(folder, 'model.bundle'),
+                'GRID_PATH': os.path.join(folder, 'grid.npz'),
+            }
+            with mock.patch.multiple(train_model, **patches), mock.patch('builtins.print'):
+                train_model.train(source='store', store_filter={'regions': ['Praha', 'Olomoucký kraj'], 'days': 30})
+
+            with open(patches['METADATA_PATH'], encoding='utf-8') as f:
+                metadata = json.load(f)
+            self.assertEqual(metadata['regions'], ['Olomoucký kraj', 'Praha'])
+            self.assertNotIn('watermark', metadata)
+            self.assertIn('region_Praha', joblib.load(patches['COLUMNS_PATH']))
+
+if __name__ == '__main__':
+    unittest.main()
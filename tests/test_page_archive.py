@@ -0,0 +1,68 @@
+import unittest
+import gzip
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.scraper.fixture_server import FixtureServer
+from src.scraper.listing_parser import parse_listing_page
+from src.scraper.page_archive import PageArchive, reparse_archive
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+BASE_URL = "https://reality.idnes.cz/s/prodej/byty/"
+
+
+class TestPageArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.archive = PageArchive(self.tmp.name)
+        # Saved listing pages with distinct ads per page, as the fixture server renders them
+        self.server = FixtureServer(FIXTURES)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+
+    def html(self, page):
+        return self.server.render(page)[1]
+
+    def test_identical_pages_are_stored_once(self):
+        first = self.archive.save(f"{BASE_URL}?page=1", self.html(1), page=1)
+        again = self.archive.save(f"{BASE_URL}?page=1", self.html(1), page=1)
+        other = self.archive.save(f"{BASE_URL}?page=2", self.html(2), page=2)
+
+        self.assertEqual(first, again)
+        self.assertNotEqual(first, other)
+        self.assertEqual(self.archive.load(first), self.html(1))
+        self.assertEqual([e['page'] for e in self.archive.entries()], [1, 1, 2])
+        with open(self.archive.object_path(first), 'rb') as f:
+            self.assertEqual(gzip.decompress(f.read()).decode('utf-8'), self.html(1))
+        objects = [name for _, _, names in os.walk(os.path.join(self.tmp.name, 'objects')) for name in names]
+        self.assertEqual(len(objects), 2)
+
+    def test_reparse_regenerates_dataset_in_crawl_order(self):
+        expected = []
+        for page in [3, 1, 2, 1]:
+            url = f"{BASE_URL}?page={page}"
+            self.archive.save(url, self.html(page), page=page)
+            expected += [ad for ad in parse_listing_page(self.html(page), url) if ad not in expected]
+        # A torn manifest line from a crash is ignored
+        with open(os.path.join(self.tmp.name, 'pages.jsonl'), 'a', encoding='utf-8') as f:
+            f.write('{"page": 4, "url": ')
+
+        output_path = os.path.join(self.tmp.name, 'reparsed.csv')
+        serial, summary = reparse_archive(self.tmp.name, workers=1)
+        parallel, _ = reparse_archive(self.tmp.name, output_path, workers=2)
+
+        self.assertEqual(summary['pages'], 4)
+        self.assertEqual(summary['ads'], 12)
+        self.assertEqual(serial.to_dict('records'), expected)
+        pd.testing.assert_frame_equal(serial, parallel)
+        pd.testing.assert_frame_equal(pd.read_csv(output_path, dtype=str, keep_default_na=False), parallel)
+
+if __name__ == '__main__':
+    unittest.main()
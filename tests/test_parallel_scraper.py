@@ -0,0 +1,102 @@
+import unittest
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import tempfile
+import urllib.request
+from unittest import mock
+
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.scraper import scraper_state
+from src.scraper.fixture_server import FixtureServer
+from src.scraper.listing_parser import parse_listing_page
+from src.scraper.parallel_scraper import scrape_pages_parallel, write_results
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def open_http_session(config):
+    """Stand-in for the Selenium session: fetch pages from the fixture server over HTTP."""
+    base_url = config['scraper']['base_url']
+
+    def scrape(page_num):
+        url = f"{base_url}?page={page_num}"
+        with urllib.request.urlopen(url, timeout=10) as response:
+            return parse_listing_page(response.read().decode('utf-8'), url)
+
+    return scrape, lambda: None
+
+
+class StateTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        patcher = mock.patch.object(scraper_state, 'get_project_root', return_value=self.tmp.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+        self.output_path = os.path.join(self.tmp.name, 'apartments.csv')
+
+
+class TestScraperState(StateTestCase):
+    def test_old_state_file_is_still_read(self):
+        with open(os.path.join(self.tmp.name, scraper_state.STATE_FILE), 'w') as f:
+            json.dump({"last_page": 3}, f)
+
+        self.assertEqual(scraper_state.pending_pages(6), [4, 5, 6])
+
+    def test_out_of_order_pages_are_compacted(self):
+        scraper_state.mark_pages_done([2, 5])
+        self.assertEqual(scraper_state.load_state(), {'last_page': 0, 'completed_pages': [2, 5]})
+        self.assertEqual(scraper_state.pending_pages(6), [1, 3, 4, 6])
+
+        scraper_state.mark_pages_done([1, 3])
+        self.assertEqual(scraper_state.load_state(), {'last_page': 3, 'completed_pages': [5]})
+
+        scraper_state.save_state(4)
+        self.assertEqual(scraper_state.load_state(), {'last_page': 5, 'completed_pages': []})
+
+
+class TestWriter(StateTestCase):
+    def test_deduplicates_and_records_only_written_pages(self):
+        pd.DataFrame([{'title': 'old', 'url': 'u0', 'raw_price': '1', 'location': ''}]).to_csv(
+            self.output_path, index=False)
+        messages = queue.Queue()
+        for message in [(1, [{'title': 'a', 'url': 'u0'}, {'title': 'b', 'url': 'u1'}]),
+                        (3, None),
+                        (2, [{'title': 'b', 'url': 'u1'}, {'title': 'c', 'url': 'u2'}]),
+                        None, None]:
+            messages.put(message)
+
+        with mock.patch('builtins.print'):
+            summary = write_results(messages, self.output_path, n_workers=2, batch_size=1)
+
+        self.assertEqual(summary, {'pages': 2, 'new_ads': 2, 'failed_pages': [3]})
+        self.assertEqual(list(pd.read_csv(self.output_path)['url']), ['u0', 'u1', 'u2'])
+        # The failed page stays pending
+        self.assertEqual(scraper_state.pending_pages(3), [3])
+
+
+@unittest.skipUnless(multiprocessing.get_start_method() == 'fork', "workers must inherit the patched state path")
+class TestParallelScraping(StateTestCase):
+    def test_workers_share_the_page_queue(self):
+        with FixtureServer(FIXTURES, failing_pages={4}) as server:
+            config = {'scraper': {'base_url': server.base_url}}
+            with mock.patch('builtins.print'):
+                summary = scrape_pages_parallel(config, list(range(1, 9)), self.output_path, 3,
+                                                open_http_session, batch_size=5)
+
+        self.assertEqual(summary['pages'], 7)
+        self.assertEqual(summary['failed_pages'], [4])
+        df = pd.read_csv(self.output_path)
+        self.assertEqual(len(df), 28)
+        self.assertEqual(df['url'].nunique(), 28)
+        self.assertEqual(scraper_state.load_state(), {'last_page': 3, 'completed_pages': [5, 6, 7, 8]})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+import http.client
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.model.inference import UnknownCategoryError
+from src.model.prediction_server import MicroBatcher, PredictionServer
+from helpers import make_trained_predictor
+
+
+def call(base_url, path, body=None):
+    """(status, JSON payload) of one request; POST when a body is given."""
+    data = json.dumps(body).encode('utf-8') if body is not None else None
+    request = urllib.request.Request(base_url + path, data=data, headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+class TestMicroBatcher(unittest.TestCase):
+    def test_coalesces_concurrent_requests(self):
+        calls = []
+
+        def predict_batch(areas, dispositions, regions):
+            if 'Atlantis' in regions:
+                raise UnknownCategoryError("Unknown region: 'Atlantis'")
+            calls.append(len(areas))
+            return areas * 2
+
+        batcher = MicroBatcher(predict_batch, window=0.2, max_batch_size=1000)
+        self.addCleanup(batcher.close)
+        futures = [batcher.submit([i], ['2+kk'], ['Praha']) for i in range(20)]
+        bad = batcher.submit([1], ['2+kk'], ['Atlantis'])
+
+        self.assertEqual([f.result(timeout=5)[0] for f in futures], [i * 2 for i in range(20)])
+        with self.assertRaises(UnknownCategoryError):
+            bad.result(timeout=5)
+        # All requests were queued within the window: one call that failed, then one retry per request
+        self.assertEqual(batcher.batches, 20)
+        self.assertEqual(sum(calls), 20)
+
+        calls.clear()
+        futures = [batcher.submit([i, i], ['2+kk'] * 2, ['Praha'] * 2) for i in range(10)]
+        self.assertEqual(len(futures[-1].result(timeout=5)), 2)
+        self.assertEqual(calls, [20])
+
+
+class TestPredictionServer(unittest.TestCase):
+    def setUp(self):
+        self.predictor, self.df = make_trained_predictor()
+        self.server = PredictionServer(self.predictor, port=0, batch_window_ms=5)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+
+    def test_single_and_batch_predictions_match_the_model(self):
+        rows = self.df.head(30)
+        expected = self.predictor.predict_batch(rows)
+        listings = [{'area': float(r.area), 'disposition': r.disposition, 'region': r.region} for r in rows.itertuples()]
+
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            singles = list(pool.map(lambda item: call(self.server.base_url, '/predict', item), listings))
+        self.assertEqual({status for status, _ in singles}, {200})
+        np.testing.assert_allclose([payload['price'] for _, payload in singles], expected)
+
+        status, payload = call(self.server.base_url, '/predict/batch', {'listings': listings})
+        self.assertEqual(status, 200)
+        np.testing.assert_allclose(payload['prices'], expected)
+
+        status, stats = call(self.server.base_url, '/stats')
+        self.assertEqual(stats['endpoints']['/predict']['count'], 30)
+        self.assertIn('p99_ms', stats['endpoints']['/predict'])
+        self.assertEqual(stats['batching']['rows'], 60)
+        self.assertLessEqual(stats['batching']['batches'], 31)
+        self.assertEqual(stats['queue_depth'], 0)
+
+    def test_projection(self):
+        status, payload = call(self.server.base_url, '/project',
+                               {'start_price': 1_000_000, 'years': 2, 'growth_rates': [0.1, 0.0]})
+        self.assertEqual(status, 200)
+        self.assertEqual([v['price'] for v in payload['scenarios'][0]['values']],
+                         [1_000_000, 1_100_000, 1_210_000.0000000002])
+        self.assertEqual(payload['scenarios'][1]['growth_rate'], 0.0)
+
+        status, payload = call(self.server.base_url, '/project', {'area': 60, 'disposition': '2+kk', 'region': 'Praha'})
+        self.assertEqual(status, 200)
+        self.assertAlmostEqual(payload['start_price'], self.predictor.predict_price(60, '2+kk', 'Praha'))
+        self.assertEqual(len(payload['scenarios'][0]['values']), self.server.default_years + 1)
+
+    def test_errors(self):
+        base = self.server.base_url
+        self.assertEqual(call(base, '/predict', {'area': 60, 'disposition': '2+kk', 'region': 'Atlantis'})[0], 400)
+        self.assertEqual(call(base, '/predict', {'area': 'big'})[0], 400)
+        # json.dumps writes NaN/Infinity literals, which json.loads accepts
+        for area in (float('nan'), float('inf'), '-inf'):
+            self.assertEqual(call(base, '/predict', {'area': area, 'disposition': '2+kk', 'region': 'Praha'})[0], 400)
+        self.assertEqual(call(base, '/predict/batch', {'listings': [{'area': float('nan'), 'disposition': '2+kk',
+                                                                     'region': 'Praha'}]})[0], 400)
+        self.assertEqual(call(base, '/project', {'start_price': float('inf')})[0], 400)
+        self.assertEqual(call(base, '/predict/batch', {'listings': 'all'})[0], 400)
+        self.assertEqual(call(base, '/project', {'start_price': 1, 'years': -1})[0], 400)
+        self.assertEqual(call(base, '/nothing')[0], 404)
+        self.assertEqual(call(base, '/predict')[0], 405)
+        self.assertEqual(call(base, '/health')[1]['model_loaded'], True)
+
+        host, port = self.server.base_url[len('http://'):].split(':')
+        for length in ('-1', 'abc', str(self.server.max_body_bytes + 1)):
+            conn = http.client.HTTPConnection(host, int(port), timeout=5)
+            conn.putrequest('POST', '/predict')
+            conn.putheader('Content-Length', length)
+            conn.endheaders()
+            self.assertEqual(conn.getresponse().status, 413 if length.isdigit() else 400)
+            conn.close()
+
+        self.predictor.model = None
+        self.assertEqual(call(base, '/predict', {'area': 60, 'disposition': '2+kk', 'region': 'Praha'})[0], 503)
+        self.assertEqual(call(base, '/stats')[1]['endpoints']['/predict']['errors'], 9)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import importlib.util
+import os
+import sys
+from unittest import mock
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class FakeDriver:
+    """Records WebDriver calls; execute_script answers the batch extraction script."""
+    def __init__(self, batch_result=None, batch_error=None, items=()):
+        self.batch_result = batch_result
+        self.batch_error = batch_error
+        self.items = list(items)
+        self.calls = []
+
+    def get(self, url):
+        self.calls.append(('get', url))
+
+    def execute_script(self, script):
+        self.calls.append(('execute_script',))
+        if 'c-products__item' not in script:
+            return None
+        if self.batch_error:
+            raise self.batch_error
+        return self.batch_result
+
+    def find_elements(self, by, value):
+        self.calls.append(('find_elements', value))
+        return self.items
+
+
+@unittest.skipUnless(importlib.util.find_spec('selenium'), "selenium is not installed")
+class TestBatchExtraction(unittest.TestCase):
+    def setUp(self):
+        from src.scraper import reality_scraper
+        self.scraper = reality_scraper
+        patcher = mock.patch.object(reality_scraper.time, 'sleep')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reads_page_in_one_call(self):
+        ads = [{'title': 'Prodej bytu 2+kk 50 m²', 'url': 'https://x/detail/1/', 'raw_price': '5 000 000 Kč',
+                'location': 'Praha'}, None]
+        driver = FakeDriver(batch_result=ads)
+
+        self.assertEqual(self.scraper.scrape_page(driver, 'https://x/?page=1'), ads[:1])
+        self.assertNotIn('find_elements', [call[0] for call in driver.calls])
+
+    def test_falls_back_to_per_element_extraction(self):
+        driver = FakeDriver(batch_error=RuntimeError("javascript error"), items=['card'])
+        record = {'title': 't', 'url': 'u', 'raw_price': '0', 'location': ''}
+        with mock.patch.object(self.scraper, 'extract_apartment_data', return_value=record) as extract:
+            self.assertEqual(self.scraper.scrape_page(driver, 'https://x/?page=1'), [record])
+        extract.assert_called_once_with('card')
+
+if __name__ == '__main__':
+    unittest.main()
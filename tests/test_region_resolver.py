@@ -0,0 +1,65 @@
+import unittest
+import os
+import random
+import sys
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.model.region_resolver import REGION_KEYWORDS, RegionResolver
+
+def linear_region(location, city_to_region):
+    """Reference implementation: the original city scan followed by the keyword checks."""
+    location = str(location)
+    for city, region in city_to_region.items():
+        if city in location:
+            return region
+    for keyword, region in REGION_KEYWORDS:
+        if keyword in location:
+            return region
+    return 'Other'
+
+class TestRegionResolver(unittest.TestCase):
+    def setUp(self):
+        self.cities = {
+            'Praha': 'Praha',
+            'Brno': 'Jihomoravský kraj',
+            'Most': 'Ústecký kraj',
+            'Kostelec': 'Středočeský kraj',
+            'Nový Jičín': 'Moravskoslezský kraj',
+            'Jičín': 'Královéhradecký kraj',
+            'Costa Brava': 'Zahraničí',
+        }
+        self.resolver = RegionResolver(self.cities)
+
+    def test_first_city_in_mapping_order_wins(self):
+        # 'Jičín' also occurs inside 'Nový Jičín', which comes first in the mapping
+        self.assertEqual(self.resolver.resolve('Nový Jičín, okres Nový Jičín'), 'Moravskoslezský kraj')
+        # 'Kostelec' appears first in the text, but 'Brno' comes first in the mapping
+        self.assertEqual(self.resolver.resolve('Kostelec u Brna, Brno-venkov'), 'Jihomoravský kraj')
+        self.assertEqual(self.resolver.resolve('Mostecká, Ústecký kraj'), 'Ústecký kraj')
+
+    def test_keywords_and_default(self):
+        self.assertEqual(self.resolver.resolve('Telč, Vysočina'), 'Kraj Vysočina')
+        self.assertEqual(self.resolver.resolve('Zlínský kraj, Olomoucký kraj'), 'Olomoucký kraj')
+        self.assertEqual(self.resolver.resolve('Vídeň'), 'Other')
+        self.assertEqual(self.resolver.resolve(None), 'Other')
+
+    def test_matches_linear_scan_on_large_mapping(self):
+        rng = random.Random(0)
+        alphabet = 'abcdeéíkmnorsčř '
+        cities = {''.join(rng.choice(alphabet) for _ in range(rng.randint(2, 9))): f'Region {i % 14}'
+                  for i in range(6000)}
+        cities.update(self.cities)
+        resolver = RegionResolver(cities)
+
+        keywords = [keyword for keyword, _ in REGION_KEYWORDS]
+        for _ in range(2000):
+            parts = [''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 12)))]
+            if rng.random() < 0.3:
+                parts.append(rng.choice(keywords))
+            location = ', '.join(parts)
+            self.assertEqual(resolver.resolve(location), linear_region(location, cities), location)
+
+if __name__ == '__main__':
+    unittest.main()
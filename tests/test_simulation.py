@@ -0,0 +1,49 @@
+import unittest
+import os
+import sys
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.model.simulation import SimulationCancelled, simulate_price_bands
+
+class TestPriceBandSimulation(unittest.TestCase):
+    def test_bands_are_ordered_and_widen(self):
+        bands = simulate_price_bands(5_000_000, years=10, n_paths=20_000, seed=1)
+        self.assertEqual(bands.shape, (3, 11))
+        self.assertTrue(np.all(bands[:, 0] == 5_000_000))
+        self.assertTrue(np.all(bands[0, 1:] < bands[1, 1:]))
+        self.assertTrue(np.all(bands[1, 1:] < bands[2, 1:]))
+        self.assertTrue(np.all(np.diff(bands[2] - bands[0]) > 0))
+
+    def test_median_matches_lognormal(self):
+        drift, volatility = 0.04, 0.05
+        bands = simulate_price_bands(1_000_000, years=5, drift=drift, volatility=volatility,
+                                     n_paths=200_000, seed=3)
+        t = np.arange(6)
+        expected = 1_000_000 * np.exp(t * (np.log1p(drift) - 0.5 * volatility ** 2))
+        np.testing.assert_allclose(bands[1], expected, rtol=2e-3)
+
+    def test_seed_is_reproducible_across_chunking(self):
+        a = simulate_price_bands(1_000_000, years=3, n_paths=30_000, seed=7, chunk_size=10_000)
+        b = simulate_price_bands(1_000_000, years=3, n_paths=30_000, seed=7, chunk_size=10_000)
+        np.testing.assert_array_equal(a, b)
+
+    def test_zero_volatility_is_deterministic(self):
+        bands = simulate_price_bands(1_000_000, years=4, drift=0.04, volatility=0.0, n_paths=10)
+        np.testing.assert_allclose(bands, np.tile(1_000_000 * 1.04 ** np.arange(5), (3, 1)))
+
+    def test_should_stop_abandons_remaining_chunks(self):
+        checks = []
+        def should_stop():
+            checks.append(1)
+            return len(checks) == 2
+
+        with self.assertRaises(SimulationCancelled):
+            simulate_price_bands(1_000_000, years=3, n_paths=100_000, chunk_size=10_000, should_stop=should_stop)
+        self.assertEqual(len(checks), 2)
+
+if __name__ == '__main__':
+    unittest.main()
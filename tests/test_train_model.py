@@ -0,0 +1,215 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest import mock
+
+import joblib
+import json
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.model import train_model
+from src.model.features import extract_features, parse_area, parse_disposition, build_features
+from src.model.train_model import clean_features, build_design_matrix_streaming, tune_hyperparameters
+from helpers import make_raw_rows
+
+class TestFeatureExtraction(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'title': ['Prodej bytu 2+kk 54 m²', 'Prodej bytu 3+1 75m2', 'Prodej bytu 1+kk 32 m²',
+                      'Prodej bytu atypického', 'Prodej bytu 2+kk 54 m²', None, 'Byt 4+kk, 120 m2'],
+            'location': ['Praha 5 - Smíchov', 'Brno - Líšeň', 'Jihomoravský kraj', 'Mexiko',
+                         'Praha 5 - Smíchov', None, 'Vysočina'],
+        }, index=[10, 11, 12, 13, 14, 15, 16])
+
+    def test_matches_per_row_functions(self):
+        features = extract_features(self.df)
+
+        pd.testing.assert_series_equal(features['area'], self.df['title'].apply(parse_area), check_names=False)
+        self.assertEqual(features['disposition'].astype(object).tolist(),
+                         self.df['title'].apply(parse_disposition).tolist())
+        self.assertTrue(features.index.equals(self.df.index))
+
+    def test_matches_original_parsing(self):
+        # Expected values of the original per-row parse_area, parse_disposition and clean_region
+        features = extract_features(self.df)
+
+        self.assertEqual(features['area'].fillna(-1).tolist(), [54, 75, 32, -1, 54, -1, 120])
+        self.assertEqual(features['disposition'].astype(object).tolist(),
+                         ['2+kk', '3+1', '1+kk', 'Other', '2+kk', 'Other', '4+kk'])
+        self.assertEqual(features['region'].astype(object).tolist(),
+                         ['Praha', 'Jihomoravský kraj', 'Jihomoravský kraj', 'Other', 'Praha', 'Other',
+                          'Kraj Vysočina'])
+
+    def test_categorical_dtypes(self):
+        features = extract_features(self.df)
+        self.assertIsInstance(features['disposition'].dtype, pd.CategoricalDtype)
+        self.assertIsInstance(features['region'].dtype, pd.CategoricalDtype)
+        self.assertEqual(len(extract_features(self.df.iloc[:0])), 0)
+
+class TestStreamingDesignMatrix(unittest.TestCase):
+    def test_matches_in_memory_get_dummies(self):
+        rng = np.random.default_rng(0)
+        n = 500
+        raw = pd.DataFrame({
+            'title': [f"Prodej bytu {d} {a} m²" for d, a in zip(
+                rng.choice(['1+kk', '2+kk', '3+1', '4+kk'], n), rng.integers(15, 150, n))],
+            'url': [f"https://example.cz/{i}" for i in range(n)],
+            'raw_price': [f"{p:,} Kč".replace(",", " ") for p in rng.integers(50_000, 15_000_000, n)],
+            'location': rng.choice(['Praha 4', 'Brno - Žabovřesky', 'Olomouc', 'Zlínský kraj', 'Mexiko'], n),
+        })
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'raw.csv')
+            raw.to_csv(path, index=False)
+            X, y, columns, metadata = build_design_matrix_streaming(path, chunk_size=64, min_price=100_000)
+
+        df = clean_features(build_features(raw), 100_000)
+        for col in ['disposition', 'region']:
+            df[col] = df[col].cat.remove_unused_categories()
+        expected = pd.get_dummies(df[['area', 'disposition', 'region']], columns=['disposition', 'region'])
+
+        self.assertEqual(X.dtype, np.float32)
+        self.assertEqual(columns, list(expected.columns))
+        np.testing.assert_array_equal(X, expected.to_numpy(dtype=np.float32))
+        np.testing.assert_array_equal(y, df['price'].to_numpy())
+        self.assertEqual(metadata['regions'], sorted(df['region'].astype(object).unique()))
+        self.assertEqual(metadata['min_area'], int(df['area'].min()))
+
+class TestHyperparameterTuning(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.X = rng.uniform(20, 120, size=(120, 3))
+        self.y = self.X[:, 0] * 80_000 + rng.normal(0, 50_000, 120)
+        self.config = {
+            'cv_folds': 3, 'n_jobs': 1, 'factor': 2,
+            'param_grid': {'_comment': 'ignored', 'n_estimators': [5, 10], 'max_depth': [None, 2]},
+        }
+
+    def test_searches_report_best_candidate(self):
+        for search in ['grid', 'halving']:
+            best, report = tune_hyperparameters(self.X, self.y, dict(self.config, search=search), random_state=0)
+            self.assertIn(best['n_estimators'], [5, 10])
+            self.assertIn(best['max_depth'], [None, 2])
+            self.assertEqual(report['best_params'], best)
+            self.assertEqual(report['candidates'][0]['rank'], 1)
+            self.assertEqual(report['n_rows'], 120)
+
+        # Halving evaluates the survivors again on more rows
+        self.assertGreater(report['n_candidates'], 4)
+
+    def test_unknown_search_raises(self):
+        with self.assertRaises(ValueError):
+            tune_hyperparameters(self.X, self.y, dict(self.config, search='random'))
+
+class TestIncrementalRefresh(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        folder = self.tmp.name
+        self.raw_path = os.path.join(folder, 'raw.csv')
+        make_raw_rows(200, seed=0).to_csv(self.raw_path, index=False)
+
+        config = dict(train_model.config)
+        config['model'] = dict(config['model'], training=dict(config['model']['training'], rf_n_estimators=10,
+                                                             streaming=False, rf_n_jobs=1),
+                               tuning={'enabled': False})
+        patches = {
+            'config': config,
+            'RAW_DATA_PATH': self.raw_path,
+            'PROCESSED_DATA_PATH': os.path.join(folder, 'features.feather'),
+            'MODEL_PATH': os.path.join(folder, 'model.pkl'),
+            'COLUMNS_PATH': os.path.join(folder, 'columns.pkl'),
+            'METADATA_PATH': os.path.join(folder, 'metadata.json'),
+            'BUNDLE_PATH': os.path.join(folder, 'model.bundle'),
+            'GRID_PATH': os.path.join(folder, 'grid.npz'),
+        }
+        self.patcher = mock.patch.multiple(train_model, **patches)
+        self.patcher.start()
+        with mock.patch('builtins.print'):
+            train_model.train()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.tmp.cleanup()
+
+    def append(self, rows):
+        rows.to_csv(self.raw_path, mode='a', header=False, index=False)
+
+    def refresh(self):
+        with mock.patch('builtins.print'):
+            train_model.refresh()
+        with open(train_model.METADATA_PATH, encoding='utf-8') as f:
+            return joblib.load(train_model.MODEL_PATH), json.load(f)
+
+    def test_appended_rows_grow_trees(self):
+        self.append(make_raw_rows(40, seed=1))
+        model, metadata = self.refresh()
+
+        self.assertEqual(model.n_estimators, 12)
+        self.assertEqual(len(model.estimators_), 12)
+        self.assertEqual(metadata['watermark']['trained_rows'], 240)
+        self.assertEqual(metadata['watermark']['raw_size'], os.path.getsize(self.raw_path))
+
+        # Nothing new: the model is left as is
+        model, _ = self.refresh()
+        self.assertEqual(model.n_estimators, 12)
+
+    def test_rows_appended_during_training_are_left_for_refresh(self):
+        for streaming in (False, True):
+            make_raw_rows(200, seed=0).to_csv(self.raw_path, index=False)
+            size = os.path.getsize(self.raw_path)
+            real_hash_file = train_model.hash_file
+
+            def hash_then_append(path, *args, **kwargs):
+                digest = real_hash_file(path, *args, **kwargs)
+                # The scraper appends a page and starts the next row meanwhile
+                self.append(make_raw_rows(40, seed=1))
+                with open(self.raw_path, 'a', encoding='utf-8') as f:
+                    f.write('Prodej bytu 2+kk 40 m')
+                return digest
+
+            training = dict(train_model.config['model']['training'], streaming=streaming, chunk_size=64)
+            config = dict(train_model.config, model=dict(train_model.config['model'], training=training))
+            with mock.patch.multiple(train_model, config=config, hash_file=hash_then_append), \
+                 mock.patch('builtins.print'):
+                train_model.train()
+            with open(train_model.METADATA_PATH, encoding='utf-8') as f:
+                watermark = json.load(f)['watermark']
+            self.assertEqual((watermark['raw_size'], watermark['trained_rows']), (size, 200))
+
+            with open(self.raw_path, 'a', encoding='utf-8') as f:
+                f.write('²,https://example.cz/late,3 000 000 Kč,Brno\n')
+            model, metadata = self.refresh()
+            self.assertEqual(metadata['watermark']['trained_rows'], 241)
+            self.assertEqual(metadata['watermark']['raw_size'], os.path.getsize(self.raw_path))
+
+    def test_failed_training_keeps_the_old_watermark(self):
+        with open(train_model.METADATA_PATH, encoding='utf-8') as f:
+            metadata = json.load(f)
+        self.append(make_raw_rows(40, seed=1))
+
+        for run in (train_model.train, train_model.refresh):
+            with mock.patch.object(train_model.RandomForestRegressor, 'fit', side_effect=RuntimeError("interrupted")), \
+                 mock.patch('builtins.print'), self.assertRaises(RuntimeError):
+                run()
+            with open(train_model.METADATA_PATH, encoding='utf-8') as f:
+                self.assertEqual(json.load(f), metadata)
+
+        # The rows are still picked up by the next refresh
+        model, metadata = self.refresh()
+        self.assertEqual(model.n_estimators, 12)
+        self.assertEqual(metadata['watermark']['trained_rows'], 240)
+
+    def test_new_region_triggers_full_training(self):
+        self.append(make_raw_rows(40, seed=2, locations=('Zlín',)))
+        model, metadata = self.refresh()
+
+        self.assertEqual(model.n_estimators, 10)
+        self.assertIn('Zlínský kraj', metadata['regions'])
+        self.assertEqual(metadata['watermark']['trained_rows'], 240)
+
+if __name__ == '__main__':
+    unittest.main()
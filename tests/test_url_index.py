@@ -0,0 +1,71 @@
+import unittest
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.scraper.url_index import UrlIndex, default_index_path
+from src.utils.listing_keys import listing_key
+
+BASE = "https://reality.idnes.cz/detail/prodej/byt/praha"
+
+
+def write_ads(path, ids, mode='w'):
+    ads = pd.DataFrame({'title': [f"Byt {i}" for i in ids], 'url': [f"{BASE}/{i:024x}/" for i in ids],
+                        'raw_price': "1 000 Kč", 'location': "Praha"})
+    ads.to_csv(path, mode=mode, header=mode == 'w', index=False, encoding='utf-8')
+
+
+class TestUrlIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.csv_path = os.path.join(self.tmp.name, 'apartments.csv')
+        self.index_path = default_index_path(self.csv_path)
+
+    def test_listing_key_ignores_host_and_trailing_slash(self):
+        self.assertEqual(listing_key(f"{BASE}/abc/"), listing_key("http://reality.idnes.cz/detail/prodej/byt/praha/abc"))
+        self.assertNotEqual(listing_key(f"{BASE}/abc/"), listing_key(f"{BASE}/abd/"))
+
+    def test_bootstraps_and_reads_only_appended_rows(self):
+        write_ads(self.csv_path, range(100))
+        with UrlIndex.for_csv(self.csv_path) as index:
+            self.assertEqual(len(index), 100)
+            self.assertIn(f"{BASE}/{5:024x}/", index)
+            self.assertNotIn(f"{BASE}/{500:024x}/", index)
+
+        write_ads(self.csv_path, range(100, 150), mode='a')
+        with UrlIndex(self.index_path) as index:
+            self.assertEqual(index.sync(self.csv_path), 'appended')
+            self.assertEqual(len(index), 150)
+            self.assertEqual(index.sync(self.csv_path), 'current')
+
+        # A rewritten file is indexed from scratch
+        write_ads(self.csv_path, range(1000, 1010))
+        with UrlIndex.for_csv(self.csv_path) as index:
+            self.assertEqual(len(index), 10)
+            self.assertNotIn(f"{BASE}/{5:024x}/", index)
+
+    def test_uncommitted_urls_are_dropped(self):
+        write_ads(self.csv_path, range(3))
+        with UrlIndex.for_csv(self.csv_path) as index:
+            index.add(f"{BASE}/new/")
+            self.assertIn(f"{BASE}/new/", index)
+
+        # Closed before the rows reached the CSV: the URL must not count as stored
+        with UrlIndex(self.index_path) as index:
+            self.assertNotIn(f"{BASE}/new/", index)
+            self.assertEqual(index.sync(self.csv_path), 'current')
+
+    def test_unreadable_csv_is_an_error(self):
+        with open(self.csv_path, 'wb') as f:
+            f.write(b'\xff\xfe\x00broken"\n"')
+        with self.assertRaises(Exception):
+            UrlIndex.for_csv(self.csv_path)
+
+if __name__ == '__main__':
+    unittest.main()